@@ -0,0 +1,358 @@
+"""Micro-benchmarks for the hot paths of every game engine.
+
+Each benchmark times one operation, e.g. TicTacToeGame.process_move on a 16x16 board,
+and reports the best operations per second over a few runs. Results can be saved as
+JSON and compared against an earlier run, in which case any benchmark that got slower
+than the tolerance allows is reported and the exit status is 1:
+
+    python Benchmarks.py --output baseline.json
+    python Benchmarks.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+TTT_SIZES = (3, 5, 8, 12, 16, 32, 50)
+MASTERMIND_LENGTHS = (4, 6, 8)
+HANGMAN_WORD_LENGTHS = (5, 10, 20)
+HANGMAN_DICTIONARY_SIZES = (1_000, 10_000, 100_000)
+RPS_VARIANTS = ("classic", "lizard-spock")
+# Inputs are generated once per benchmark and cycled, so the timed loop does no setup.
+SAMPLES = 1000
+MIN_TIME = 0.2
+REPEAT = 3
+TOLERANCE = 0.2
+
+
+def _ttt_games(size, rng, count=8):
+    """Return move lists of whole random games, each ending in a win or a full board."""
+    from TicTacToe import Move, TicTacToeGame
+
+    games = []
+    for _ in range(count):
+        game = TicTacToeGame(board_size=size)
+        cells = [(row, col) for row in range(size) for col in range(size)]
+        rng.shuffle(cells)
+        moves = []
+        for index, (row, col) in enumerate(cells):
+            move = Move(row, col, "XO"[index % 2])
+            game.process_move(move)
+            moves.append(move)
+            if game.has_winner():
+                break
+        games.append(moves)
+    return games
+
+
+def bench_ttt_process_move(size, rng):
+    """Time process_move over whole games, leaving the resets between games untimed."""
+    from TicTacToe import TicTacToeGame
+
+    game = TicTacToeGame(board_size=size)
+    games = _ttt_games(size, rng)
+
+    def run(loops):
+        operations = 0
+        elapsed = 0.0
+        for loop in range(loops):
+            moves = games[loop % len(games)]
+            start = time.perf_counter()
+            for move in moves:
+                game.process_move(move)
+            elapsed += time.perf_counter() - start
+            operations += len(moves)
+            game.reset_game()
+        return operations, elapsed
+
+    return run
+
+
+def bench_ttt_is_tied(size, rng):
+    """Time is_tied on a half-full board, where it cannot stop early."""
+    from TicTacToe import TicTacToeGame
+
+    game = TicTacToeGame(board_size=size)
+    for move in _ttt_games(size, rng, count=1)[0][: size * size // 2]:
+        if not game.has_winner():
+            game.process_move(move)
+
+    def run(loops):
+        is_tied = game.is_tied
+        start = time.perf_counter()
+        for _ in range(loops * SAMPLES):
+            is_tied()
+        return loops * SAMPLES, time.perf_counter() - start
+
+    return run
+
+
+def bench_ttt_reset_game(size, rng):
+    """
+    Time reset_game after a whole game, leaving the game itself untimed.
+
+    Each loop resets a copy of a finished game rather than replaying it, so on big
+    boards the untimed work does not dwarf the reset.
+    """
+    from TicTacToe import TicTacToeGame
+
+    finished = []
+    for moves in _ttt_games(size, rng):
+        game = TicTacToeGame(board_size=size)
+        for move in moves:
+            game.process_move(move)
+        finished.append(game)
+
+    def run(loops):
+        elapsed = 0.0
+        for loop in range(loops):
+            game = finished[loop % len(finished)].clone()
+            start = time.perf_counter()
+            game.reset_game()
+            elapsed += time.perf_counter() - start
+        return loops, elapsed
+
+    return run
+
+
+def bench_mastermind_feedback(length, rng):
+    """Time provide_feedback on random secret and guess pairs."""
+    from Mastermind import SYMBOLS, provide_feedback
+
+    pairs = [
+        (
+            [rng.randrange(SYMBOLS) for _ in range(length)],
+            [rng.randrange(SYMBOLS) for _ in range(length)],
+        )
+        for _ in range(SAMPLES)
+    ]
+
+    def run(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for secret_code, guess in pairs:
+                provide_feedback(secret_code, guess)
+        return loops * len(pairs), time.perf_counter() - start
+
+    return run
+
+
+def _random_words(count, length, rng):
+    """Return count random lowercase words of the given length."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(length)) for _ in range(count)]
+
+
+def bench_hangman_guess(length, rng):
+    """Time HangmanEngine.step, which also redraws the blanks, over whole games."""
+    from Hangman import LETTERS, HangmanEngine
+
+    engine = HangmanEngine(_random_words(SAMPLES, length, rng))
+    orders = []
+    for _ in range(8):
+        order = list(LETTERS)
+        rng.shuffle(order)
+        orders.append(order)
+
+    def run(loops):
+        operations = 0
+        elapsed = 0.0
+        for loop in range(loops):
+            engine.reset(seed=loop)
+            order = iter(orders[loop % len(orders)])
+            step = engine.step
+            start = time.perf_counter()
+            while not engine.is_terminal():
+                step(next(order))
+                operations += 1
+            elapsed += time.perf_counter() - start
+        return operations, elapsed
+
+    return run
+
+
+def bench_hangman_hint(words, rng):
+    """Time the hint's candidate count and best letter for a board with one letter found."""
+    from Hangman import getBlanks
+    from HangmanSolver import WordIndex
+
+    index = WordIndex(_random_words(words, 8, rng))
+    boards = []
+    for _ in range(16):
+        secret = index[rng.randrange(len(index))]
+        unused = [letter for letter in "qxzjkv" if letter not in secret]
+        boards.append((getBlanks(secret[0], secret), "".join(unused[:2])))
+
+    def run(loops):
+        start = time.perf_counter()
+        for loop in range(loops):
+            blanks, missed = boards[loop % len(boards)]
+            index.count(blanks, missed)
+            index.best_letter(blanks, missed)
+        return loops, time.perf_counter() - start
+
+    return run
+
+
+def bench_rps_determine_winner(variant, rng):
+    """Time determine_winner on random rounds."""
+    from RPS import RULES, determine_winner
+
+    rules = RULES[variant]
+    rounds = [(rng.choice(rules.choices), rng.choice(rules.choices)) for _ in range(SAMPLES)]
+
+    def run(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for player_choice, computer_choice in rounds:
+                determine_winner(player_choice, computer_choice, rules)
+        return loops * len(rounds), time.perf_counter() - start
+
+    return run
+
+
+# (name, unit, setup, parameter name, parameter values)
+BENCHMARKS = (
+    ("tictactoe.process_move", "moves", bench_ttt_process_move, "size", TTT_SIZES),
+    ("tictactoe.is_tied", "calls", bench_ttt_is_tied, "size", TTT_SIZES),
+    ("tictactoe.reset_game", "resets", bench_ttt_reset_game, "size", TTT_SIZES),
+    (
+        "mastermind.provide_feedback",
+        "calls",
+        bench_mastermind_feedback,
+        "length",
+        MASTERMIND_LENGTHS,
+    ),
+    ("hangman.guess", "guesses", bench_hangman_guess, "length", HANGMAN_WORD_LENGTHS),
+    ("hangman.hint", "hints", bench_hangman_hint, "words", HANGMAN_DICTIONARY_SIZES),
+    ("rps.determine_winner", "rounds", bench_rps_determine_winner, "variant", RPS_VARIANTS),
+)
+
+
+def measure(run, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    Time a benchmark the way timeit does.
+
+    The number of loops is doubled until one run takes at least min_time, then the run
+    is repeated and the fastest rate is kept, since slower runs only add noise.
+
+    Parameters:
+        run (callable): Takes a number of loops and returns (operations, seconds).
+        min_time (float): The shortest run, in seconds, that counts as a measurement.
+        repeat (int): How many measured runs to take the best of.
+
+    Returns:
+        float: Operations per second.
+    """
+    loops = 1
+    while True:
+        operations, elapsed = run(loops)
+        if elapsed >= min_time:
+            break
+        loops *= 2
+    best = operations / elapsed
+    for _ in range(repeat - 1):
+        operations, elapsed = run(loops)
+        best = max(best, operations / elapsed)
+    return best
+
+
+def run_benchmarks(pattern="", min_time=MIN_TIME, repeat=REPEAT, seed=0, stream=sys.stdout):
+    """
+    Run every benchmark whose name contains pattern.
+
+    Parameters:
+        pattern (str): Only run benchmarks with this in their name, e.g. "tictactoe".
+        min_time (float): See measure.
+        repeat (int): See measure.
+        seed (int): Seeds the generated inputs, so every run times the same work.
+        stream: Where to print one line per result as it finishes, or None.
+
+    Returns:
+        dict: The results in the JSON format, with "meta" and "results" keys.
+    """
+    results = {}
+    for name, unit, setup, parameter, values in BENCHMARKS:
+        for value in values:
+            key = f"{name}[{parameter}={value}]"
+            if pattern not in key:
+                continue
+            rate = measure(setup(value, random.Random(f"{seed}:{key}")), min_time, repeat)
+            results[key] = {"unit": unit, "per_second": rate}
+            if stream is not None:
+                print(f"{key:<45} {rate:>14,.0f} {unit}/s", file=stream)
+    meta = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(baseline, current, tolerance=TOLERANCE, stream=sys.stdout):
+    """
+    Compare two sets of results and report every benchmark that slowed down.
+
+    Parameters:
+        baseline (dict): Earlier results, as returned by run_benchmarks.
+        current (dict): New results in the same format.
+        tolerance (float): The fraction a rate may drop by before it counts as a
+            regression, to allow for timing noise.
+        stream: Where to print the comparison.
+
+    Returns:
+        list: The names of the benchmarks that regressed.
+    """
+    regressions = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            print(f"{key:<45} new", file=stream)
+            continue
+        change = result["per_second"] / before["per_second"] - 1
+        regressed = change < -tolerance
+        if regressed:
+            regressions.append(key)
+        flag = "REGRESSION" if regressed else ""
+        print(f"{key:<45} {change:>+8.1%} {flag}", file=stream)
+    missing = len(baseline["results"].keys() - current["results"].keys())
+    if missing:
+        print(f"{missing} benchmark(s) in the baseline were not run", file=stream)
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks, then save and/or compare the results."""
+    parser = argparse.ArgumentParser(description="Benchmark the games' hot paths.")
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--min-time", type=float, default=MIN_TIME)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    current = run_benchmarks(args.filter, args.min_time, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}:")
+            for key in regressions:
+                print(f"  {key}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""The headless engine interface shared by every hub game.
+
+An engine holds one game's rules and state with no input(), print() or Tk calls, so
+agents, benchmarks and batch simulators can drive it directly:
+
+    engine = make_engine("hangman")
+    engine.reset(seed=1)
+    while not engine.is_terminal():
+        engine.step(random.choice(engine.legal_actions()))
+"""
+
+import argparse
+import importlib
+import random
+import time
+from typing import Any, NamedTuple
+
+
+class StepResult(NamedTuple):
+    observation: Any
+    reward: float
+    done: bool
+
+
+class GameEngine:
+    def reset(self, seed=None):
+        """
+        Start a new game.
+
+        Parameters:
+            seed (optional): Seed for the game's randomness. None draws from the game's
+                stream in RandomStreams, like the console games, e.g. stream("hangman"),
+                which GAMEHUB_SEED makes repeatable.
+
+        Returns:
+            The first observation.
+        """
+        raise NotImplementedError
+
+    def legal_actions(self):
+        """Return the actions step() accepts in the current state."""
+        raise NotImplementedError
+
+    def step(self, action):
+        """
+        Play one action.
+
+        Parameters:
+            action: One of legal_actions().
+
+        Returns:
+            StepResult: The new observation, the reward for the acting player and
+                whether the game is over.
+        """
+        raise NotImplementedError
+
+    def observation(self):
+        """Return what a player is allowed to see of the current state."""
+        raise NotImplementedError
+
+    def is_terminal(self):
+        """Return True if the game is over."""
+        raise NotImplementedError
+
+
+# Engines are imported on first use so loading this module stays cheap.
+ENGINES = {
+    "hangman": ("Hangman", "HangmanEngine"),
+    "mastermind": ("Mastermind", "MastermindEngine"),
+    "rps": ("RPS", "RPSEngine"),
+    "tictactoe": ("TicTacToe", "TicTacToeEngine"),
+}
+
+
+def make_engine(name, **options):
+    """
+    Create an engine by name.
+
+    Parameters:
+        name (str): One of the keys of ENGINES.
+        **options: Passed to the engine's constructor.
+
+    Returns:
+        GameEngine: The new engine.
+    """
+    module, class_name = ENGINES[name]
+    return getattr(importlib.import_module(module), class_name)(**options)
+
+
+def run_random_episodes(engine, episodes, seed=0):
+    """
+    Play whole games with uniformly random legal actions.
+
+    Parameters:
+        engine (GameEngine): The engine to drive.
+        episodes (int): The number of games to play.
+        seed (int): Seeds both the engine and the action choices.
+
+    Returns:
+        tuple: The total number of steps and the total reward.
+    """
+    rng = random.Random(seed)
+    steps = 0
+    total_reward = 0.0
+    for episode in range(episodes):
+        engine.reset(seed=f"{seed}:{episode}")
+        while not engine.is_terminal():
+            actions = engine.legal_actions()
+            if not hasattr(actions, "__getitem__"):
+                actions = list(actions)
+            total_reward += engine.step(rng.choice(actions)).reward
+            steps += 1
+    return steps, total_reward
+
+
+def main(argv=None):
+    """Drive an engine with random actions and report its speed."""
+    parser = argparse.ArgumentParser(description="Play random headless games.")
+    parser.add_argument("engine", choices=sorted(ENGINES))
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    # Cap the open-ended games so random play ends in a reasonable number of steps.
+    options = {"mastermind": {"max_guesses": 10}, "rps": {"rounds": 10}}.get(args.engine, {})
+    engine = make_engine(args.engine, **options)
+    start = time.perf_counter()
+    steps, total_reward = run_random_episodes(engine, args.episodes, args.seed)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.episodes} {args.engine} games, {steps} steps in {elapsed:.2f}s "
+        f"({steps / elapsed:,.0f} steps/s), mean reward {total_reward / args.episodes:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,152 @@
-from Hangman import Hangman_game as hg
-from Mastermind import play_mastermind as mm
-from RPS import rps
-from TicTacToe import ttt, tk
+import argparse
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import NamedTuple
 
-root = tk.Tk()
-root.title("Game Selector")
+_START = time.perf_counter()
 
-# Map game names to their corresponding functions
+
+class GameEntry(NamedTuple):
+    module: str
+    entry_point: str
+    options: dict = None
+    console: bool = True
+
+
+# Map game names to the module and function that run them. Each game is imported
+# in its own process when its button is pressed, so adding games does not slow
+# startup and a running game never blocks the selector.
 games = {
-    "Rock Paper Scissors": rps,
-    "Hangman": hg,
-    "Tic Tac Toe": ttt,
-    "Mastermind": mm,
+    "Rock Paper Scissors": GameEntry("RPS", "rps"),
+    "Rock Paper Scissors vs Adaptive AI": GameEntry("RPS", "rps", {"opponent": "adaptive"}),
+    "Hangman": GameEntry("Hangman", "Hangman_game"),
+    "Tic Tac Toe": GameEntry("TicTacToe", "ttt", console=False),
+    "Tic Tac Toe vs Computer": GameEntry(
+        "TicTacToe", "ttt", {"vs_computer": True}, console=False
+    ),
+    "Mastermind": GameEntry("Mastermind", "play_mastermind"),
+    "Mastermind Solver": GameEntry("Mastermind", "play_mastermind", {"solver": True}),
 }
 
-for _, (game_name, game_func) in enumerate(games.items()):
-    # Create a button for each game
-    btn = tk.Button(
-        root,
-        text=game_name,
-        command=lambda i=_, game_func=games[game_name]: game_func(),
+
+class StartupProfiler:
+    def __init__(self, enabled=False, stream=sys.stderr):
+        """
+        Initialize a profiler that reports import times and time to first window.
+
+        Parameters:
+            enabled (bool): If False, nothing is timed or printed.
+            stream: Where to write the report.
+
+        Returns:
+            None
+        """
+        self.enabled = enabled
+        self.stream = stream
+
+    def import_module(self, name):
+        """Import a module, reporting how long it took if it was not imported yet."""
+        if not self.enabled or name in sys.modules:
+            return importlib.import_module(name)
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        self.report(f"import {name}", time.perf_counter() - start)
+        return module
+
+    def first_window(self):
+        """Report the time from interpreter start of GameHub to the first drawn window."""
+        if self.enabled:
+            self.report("time to first window", time.perf_counter() - _START)
+
+    def report(self, label, seconds):
+        """Write one timing line."""
+        if self.enabled:
+            print(f"[startup] {label}: {seconds * 1000:.1f} ms", file=self.stream)
+
+
+def main(argv=None):
+    """Open the game selector window."""
+    parser = argparse.ArgumentParser(description="Pick a game to play.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report per-module import times and the time to the first window",
     )
-    btn.pack(pady=10)
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="instrument the games started from the hub and show their live rates; "
+        "their metric exports are kept in DIR if given",
+    )
+    parser.add_argument(
+        "--profile-games",
+        choices=("cprofile", "sample"),
+        help="profile every game started from the hub into profile-<n>-<module> files",
+    )
+    args = parser.parse_args(argv)
+    profiler = StartupProfiler(args.profile_startup)
+    tk = profiler.import_module("tkinter")
+    runner = profiler.import_module("GameRunner")
+    game_log = profiler.import_module("GameLog")
+
+    root = tk.Tk()
+    root.title("Game Selector")
+    status = tk.Label(root, text="No games running")
+    player_frame = tk.Frame(root)
+    player_frame.pack(pady=10)
+    tk.Label(player_frame, text="Player:").pack(side=tk.LEFT)
+    player = tk.StringVar(root, value=game_log.current_player())
+    tk.Entry(player_frame, textvariable=player, width=20).pack(side=tk.LEFT)
+
+    def show_running(count):
+        status["text"] = f"{count} game(s) running" if count else "No games running"
+
+    metrics_dir = args.metrics
+    if metrics_dir == "":
+        metrics_dir = tempfile.mkdtemp(prefix="gamehub-metrics-")
+    elif metrics_dir is not None:
+        os.makedirs(metrics_dir, exist_ok=True)
+    launcher = runner.GameLauncher(
+        root, args.profile_startup, show_running, metrics_dir, args.profile_games
+    )
+
+    def close():
+        launcher.stop_all()
+        root.destroy()
+        if args.metrics == "":
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+    def show_stats():
+        # SQLite and the statistics code are only loaded once they are asked for.
+        stats = profiler.import_module("GameStats")
+        stats.StatsWindow(root, player.get().strip() or game_log.current_player())
+
+    for game_name, entry in games.items():
+        # Create a button for each game
+        btn = tk.Button(
+            root,
+            text=game_name,
+            command=lambda name=game_name, entry=entry: launcher.launch(
+                name, entry, player.get().strip()
+            ),
+        )
+        btn.pack(pady=10)
+    tk.Button(root, text="Leaderboard", command=show_stats).pack(pady=10)
+    status.pack(pady=10)
+    if metrics_dir is not None:
+        runner.MetricsPanel(root, metrics_dir).pack(padx=10, pady=10, fill=tk.X)
+    root.protocol("WM_DELETE_WINDOW", close)
+
+    root.after_idle(profiler.first_window)
+    # Start the main loop
+    root.mainloop()
+
 
-# Start the main loop
-root.mainloop()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,503 @@
+"""An append-only binary log of finished games, with a streaming reader and replay.
+
+Every record is framed as a little-endian uint32 payload length and the payload's
+CRC-32, followed by the payload:
+
+    version, game, outcome (uint8 each), timestamp (float64), setup length and
+    step count (uint16 each), player name length (uint8), the setup bytes, the
+    player's name in UTF-8, then the step bytes.
+
+The setup holds what a game needs to be replayed (the secret word, the secret code,
+the RPS variant, the board size) and the steps are fixed-width per game. A record is
+written with a single os.write on a file opened with O_APPEND, under an exclusive
+lock where fcntl is available, so several processes can log to the same file
+without interleaving. A reader never holds more than one record in memory.
+
+    python GameLog.py stats
+    python GameLog.py replay --verbose
+"""
+
+import argparse
+import getpass
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import NamedTuple
+
+from Metrics import count
+
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND alone keeps single writes whole.
+    fcntl = None
+
+VERSION = 1
+FRAME = struct.Struct("<II")
+HEAD = struct.Struct("<BBBdHHB")
+READ_BUFFER = 1 << 20
+RPS_ROUNDS = struct.Struct("<H")
+# Where the console games record to; set GAMEHUB_LOG to another path, or to an empty
+# string to turn recording off.
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.log")
+
+HANGMAN, MASTERMIND, RPS, TICTACTOE = 1, 2, 3, 4
+GAME_NAMES = {
+    HANGMAN: "hangman",
+    MASTERMIND: "mastermind",
+    RPS: "rps",
+    TICTACTOE: "tictactoe",
+}
+# Outcomes are from the point of view of the (first) player. ABANDONED games were
+# reset or closed before they ended.
+WIN, LOSS, TIE, ABANDONED = 0, 1, 2, 3
+OUTCOME_NAMES = ("win", "loss", "tie", "abandoned")
+# Stands in for an RPS choice that was not valid, which loses the round.
+INVALID_CHOICE = 255
+# Logs opened by recorded(), one per path for the life of the process.
+_logs = {}
+
+
+class GameRecord(NamedTuple):
+    game: int
+    outcome: int
+    timestamp: float
+    setup: bytes
+    steps: int
+    moves: bytes
+    player: str = ""
+
+
+class HangmanCodec:
+    game = HANGMAN
+
+    def setup(self, engine):
+        """Store the miss limit and the secret word."""
+        return bytes([engine.maxMisses]) + engine.secretWord.encode("utf-8")
+
+    def encode_step(self, engine, action):
+        """Store a guessed letter as one byte."""
+        return action.encode("ascii")
+
+    def outcome(self, engine):
+        """Return WIN, LOSS or ABANDONED."""
+        return WIN if engine.won() else LOSS if engine.lost() else ABANDONED
+
+    def replay(self, record):
+        """Return a fresh engine for the record and the actions to play on it."""
+        from Hangman import HangmanEngine
+
+        engine = HangmanEngine([record.setup[1:].decode("utf-8")], record.setup[0])
+        return engine, [chr(byte) for byte in record.moves]
+
+
+class MastermindCodec:
+    game = MASTERMIND
+
+    def setup(self, engine):
+        """Store the code length, the symbols, the guess limit (0 for none) and the secret code."""
+        limits = [engine.length, engine.symbols, engine.max_guesses or 0]
+        return bytes(limits + engine.secret_code)
+
+    def encode_step(self, engine, action):
+        """Store a guess as one byte per digit."""
+        return bytes(action)
+
+    def outcome(self, engine):
+        """Return WIN, LOSS or ABANDONED."""
+        return WIN if engine.solved() else LOSS if engine.is_terminal() else ABANDONED
+
+    def replay(self, record):
+        """Return a fresh engine for the record and the actions to play on it."""
+        from Mastermind import MastermindEngine
+
+        length, symbols, max_guesses = record.setup[:3]
+        engine = MastermindEngine(length, symbols, max_guesses or None)
+        engine.secret_code = list(record.setup[3:])
+        moves = record.moves
+        return engine, [tuple(moves[i : i + length]) for i in range(0, len(moves), length)]
+
+
+class _ScriptedPlayer:
+    def __init__(self, choices):
+        """Initialize a computer player that repeats the recorded choices."""
+        self._choices = iter(choices)
+
+    def choose(self):
+        """Return the next recorded choice."""
+        return next(self._choices)
+
+    def update(self, player_choice):
+        """Ignore the player's choice."""
+
+
+class RPSCodec:
+    game = RPS
+
+    def setup(self, engine):
+        """Store the number of rounds (0 for no limit) and the variant's name."""
+        return RPS_ROUNDS.pack(engine.rounds or 0) + engine.rules.name.encode("ascii")
+
+    def encode_step(self, engine, action):
+        """Store the player's and the computer's choices as one byte each."""
+        choices = engine.rules.choices
+        player = choices.index(action) if action in choices else INVALID_CHOICE
+        return bytes([player, choices.index(engine.last_round.computer)])
+
+    def outcome(self, engine):
+        """Return the result of the match by rounds won and lost."""
+        wins, ties, losses = engine.tally
+        if not engine.is_terminal():
+            return ABANDONED
+        return WIN if wins > losses else LOSS if losses > wins else TIE
+
+    def replay(self, record):
+        """Return a fresh engine for the record and the actions to play on it."""
+        from RPS import RULES, RPSEngine
+
+        (rounds,) = RPS_ROUNDS.unpack_from(record.setup)
+        rules = RULES[record.setup[RPS_ROUNDS.size :].decode("ascii")]
+        moves = record.moves
+        computer = _ScriptedPlayer(rules.choices[index] for index in moves[1::2])
+        engine = RPSEngine(rules, rounds=rounds or None, computer=computer)
+        choices = rules.choices
+        actions = [choices[index] if index < len(choices) else "" for index in moves[::2]]
+        return engine, actions
+
+
+class TicTacToeCodec:
+    game = TICTACTOE
+
+    def setup(self, engine):
+        """Store the board size and the winning run length."""
+        return bytes([engine.game.board_size, engine.game.win_length])
+
+    def encode_step(self, engine, action):
+        """Store a move as its row and column."""
+        return bytes(action)
+
+    def outcome(self, engine):
+        """Return WIN if the first player won, LOSS if the second did, or TIE."""
+        if not engine.is_terminal():
+            return ABANDONED
+        if not engine.game.has_winner():
+            return TIE
+        return WIN if engine.game.current_player.label == engine.first_label else LOSS
+
+    def replay(self, record):
+        """Return a fresh engine for the record and the actions to play on it."""
+        from TicTacToe import TicTacToeEngine
+
+        size, win_length = record.setup
+        moves = record.moves
+        engine = TicTacToeEngine(size, win_length)
+        return engine, [(moves[i], moves[i + 1]) for i in range(0, len(moves), 2)]
+
+
+# Keyed by engine class name, so this module does not have to import the games.
+CODECS = {
+    "HangmanEngine": HangmanCodec(),
+    "MastermindEngine": MastermindCodec(),
+    "RPSEngine": RPSCodec(),
+    "TicTacToeEngine": TicTacToeCodec(),
+}
+CODECS_BY_GAME = {codec.game: codec for codec in CODECS.values()}
+
+
+def encode_record(record):
+    """Return the framed bytes of a record."""
+    player = record.player.encode("utf-8")[:255]
+    payload = b"".join(
+        (
+            HEAD.pack(
+                VERSION,
+                record.game,
+                record.outcome,
+                record.timestamp,
+                len(record.setup),
+                record.steps,
+                len(player),
+            ),
+            record.setup,
+            player,
+            record.moves,
+        )
+    )
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload):
+    """Return the GameRecord in a payload."""
+    version = payload[0]
+    if version != VERSION:
+        raise ValueError(f"unsupported game record version {version}")
+    _, game, outcome, timestamp, setup_length, steps, player_length = HEAD.unpack_from(payload)
+    start = HEAD.size + setup_length
+    end = start + player_length
+    setup = payload[HEAD.size : start]
+    player = payload[start:end].decode("utf-8", errors="replace")
+    return GameRecord(game, outcome, timestamp, setup, steps, payload[end:], player)
+
+
+def current_player():
+    """Return the name games are recorded under: $GAMEHUB_PLAYER, or the login name."""
+    name = os.environ.get("GAMEHUB_PLAYER")
+    if name:
+        return name
+    try:
+        return getpass.getuser()
+    except (ImportError, KeyError, OSError):
+        return "player"
+
+
+class GameLog:
+    def __init__(self, path=DEFAULT_LOG):
+        """
+        Open a log for appending, creating it if needed.
+
+        Parameters:
+            path (str): The log file.
+
+        Returns:
+            None
+        """
+        self.path = path
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(path, flags, 0o644)
+
+    def append(self, record):
+        """Write one record atomically with respect to other writers."""
+        data = encode_record(record)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            os.write(self._fd, data)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """Close the file."""
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingEngine:
+    def __init__(self, engine, log):
+        """
+        Wrap an engine so every game played on it is appended to a log.
+
+        Everything other than reset() and step() is passed straight to the wrapped
+        engine, so a UI can use the wrapper in its place.
+
+        Parameters:
+            engine (GameEngine): The engine to record.
+            log (GameLog): Where to write the records.
+
+        Returns:
+            None
+        """
+        self._engine = engine
+        self._log = log
+        self._codec = CODECS[type(engine).__name__]
+        self._player = current_player()
+        self._start()
+
+    def __getattr__(self, name):
+        return getattr(self._engine, name)
+
+    def _start(self):
+        """Begin recording a new game."""
+        self._setup = self._codec.setup(self._engine)
+        self._moves = []
+        self._saved = False
+
+    def _save(self):
+        """Append the game so far to the log, once."""
+        if self._saved:
+            return
+        self._saved = True
+        count(f"{GAME_NAMES[self._codec.game]}.games")
+        self._log.append(
+            GameRecord(
+                self._codec.game,
+                self._codec.outcome(self._engine),
+                time.time(),
+                self._setup,
+                len(self._moves),
+                b"".join(self._moves),
+                self._player,
+            )
+        )
+
+    def reset(self, seed=None):
+        """Record an unfinished game as abandoned, then start a new one."""
+        if self._moves:
+            self._save()
+        observation = self._engine.reset(seed)
+        self._start()
+        return observation
+
+    def step(self, action):
+        """Play an action, and append the game to the log once it ends."""
+        result = self._engine.step(action)
+        self._moves.append(self._codec.encode_step(self._engine, action))
+        if result.done:
+            self._save()
+        return result
+
+
+def recorded(engine):
+    """Return engine wrapped in a RecordingEngine, or as it is if recording is off."""
+    path = os.environ.get("GAMEHUB_LOG", DEFAULT_LOG)
+    if not path:
+        return engine
+    log = _logs.get(path)
+    if log is None:
+        try:
+            log = _logs[path] = GameLog(path)
+        except OSError as exc:
+            print(f"Not recording games: {exc}", file=sys.stderr)
+            return engine
+    return RecordingEngine(engine, log)
+
+
+def read_records(path=DEFAULT_LOG):
+    """
+    Yield every record in a log, in the order they were written.
+
+    Parameters:
+        path (str): The log file.
+
+    Yields:
+        GameRecord: One record at a time. See scan_records.
+    """
+    for _, record in scan_records(path):
+        yield record
+
+
+def scan_records(path=DEFAULT_LOG, start=0):
+    """
+    Yield the records in a log from a byte offset, with the offset just past each one.
+
+    The file is read in READ_BUFFER-sized chunks and records are cut out of each chunk,
+    so memory use stays flat however big the log is. A record cut short at the end of
+    the file, e.g. one still being written, ends the stream quietly. A record whose
+    checksum does not match raises ValueError.
+
+    Parameters:
+        path (str): The log file.
+        start (int): Where to start reading; must be the end of an earlier record.
+
+    Yields:
+        tuple: The (end offset, GameRecord) of each record.
+    """
+    offset = start
+    buffer = b""
+    with open(path, "rb", buffering=0) as file:
+        file.seek(start)
+        while True:
+            chunk = file.read(READ_BUFFER)
+            if not chunk:
+                return
+            buffer = buffer + chunk if buffer else chunk
+            position = 0
+            while len(buffer) - position >= FRAME.size:
+                length, checksum = FRAME.unpack_from(buffer, position)
+                end = position + FRAME.size + length
+                if end > len(buffer):
+                    break
+                payload = buffer[position + FRAME.size : end]
+                if zlib.crc32(payload) != checksum:
+                    raise ValueError(f"corrupt record at offset {offset + position}")
+                yield offset + end, decode_record(payload)
+                position = end
+            offset += position
+            buffer = buffer[position:]
+
+
+def replay(record):
+    """
+    Re-run a recorded game through its engine.
+
+    Parameters:
+        record (GameRecord): The game to replay.
+
+    Returns:
+        tuple: The engine after the last move and whether its outcome matches the record.
+    """
+    codec = CODECS_BY_GAME[record.game]
+    engine, actions = codec.replay(record)
+    for action in actions:
+        engine.step(action)
+    return engine, codec.outcome(engine) == record.outcome
+
+
+def collect_stats(records):
+    """
+    Aggregate records in constant memory.
+
+    Parameters:
+        records: An iterable of GameRecord, e.g. read_records(path).
+
+    Returns:
+        dict: Maps each game's name to a dict with "games", "moves" and a Counter of
+            outcome names.
+    """
+    stats = {}
+    for record in records:
+        entry = stats.get(record.game)
+        if entry is None:
+            entry = stats[record.game] = {"games": 0, "moves": 0, "outcomes": Counter()}
+        entry["games"] += 1
+        entry["moves"] += record.steps
+        entry["outcomes"][OUTCOME_NAMES[record.outcome]] += 1
+    return {GAME_NAMES[game]: entry for game, entry in sorted(stats.items())}
+
+
+def main(argv=None):
+    """Print statistics about a log, or replay every game in it."""
+    parser = argparse.ArgumentParser(description="Inspect the game log.")
+    parser.add_argument("command", choices=("stats", "replay"))
+    parser.add_argument(
+        "log", nargs="?", default=os.environ.get("GAMEHUB_LOG") or DEFAULT_LOG
+    )
+    parser.add_argument("--verbose", action="store_true", help="print every replayed game")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    if args.command == "stats":
+        for name, entry in collect_stats(read_records(args.log)).items():
+            outcomes = entry["outcomes"].items()
+            outcomes = ", ".join(f"{count} {outcome}" for outcome, count in outcomes)
+            print(
+                f"{name}: {entry['games']} games, {entry['moves'] / entry['games']:.1f} moves "
+                f"per game ({outcomes})"
+            )
+    else:
+        games = mismatches = 0
+        for record in read_records(args.log):
+            engine, matches = replay(record)
+            games += 1
+            mismatches += not matches
+            if args.verbose or not matches:
+                flag = "" if matches else "  MISMATCH"
+                print(
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp))} "
+                    f"{GAME_NAMES[record.game]} {OUTCOME_NAMES[record.outcome]} "
+                    f"in {record.steps} moves{flag}"
+                )
+        print(f"Replayed {games} games, {mismatches} mismatch(es).")
+        if mismatches:
+            sys.exit(1)
+    print(f"Read the log in {time.perf_counter() - start:.2f}s.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
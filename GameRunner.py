@@ -0,0 +1,364 @@
+"""Runs hub games in their own processes so the selector never blocks on a game.
+
+Each game runs in a child process started with this module as its script. Console
+games get a small Tk console window: the child's output is read on a worker thread
+and posted to a queue that the hub drains with root.after, and lines typed into the
+window are written to the child's stdin. Calls to exit() inside a game end only that
+game's process.
+"""
+
+import argparse
+import codecs
+import glob
+import importlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import tkinter as tk
+
+import Metrics
+
+POLL_MS = 50
+METRICS_REFRESH_MS = 1000
+# Messages handled per poll, so a chatty game cannot starve the hub's event loop.
+MAX_MESSAGES_PER_POLL = 200
+READ_SIZE = 4096
+
+
+def run_entry(module, entry_point, options=None, profile=False):
+    """
+    Import a game and run its entry point, turning in-game exits into a clean return.
+
+    The game runs inside Metrics.session(), so it exports metrics and is profiled if
+    GAMEHUB_METRICS or GAMEHUB_PROFILE say so.
+
+    Parameters:
+        module (str): The module that holds the game.
+        entry_point (str): The name of the function that runs the game.
+        options (dict, optional): Keyword arguments for the entry point.
+        profile (bool): If True, report how long the import took on stderr.
+
+    Returns:
+        int: The game's exit status, 0 if it returned normally.
+    """
+    start = time.perf_counter()
+    game = getattr(importlib.import_module(module), entry_point)
+    if profile:
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"[startup] import {module}: {elapsed:.1f} ms", file=sys.stderr)
+    try:
+        with Metrics.session():
+            game(**(options or {}))
+    except SystemExit as exc:
+        return exc.code if isinstance(exc.code, int) else 0
+    except (EOFError, KeyboardInterrupt):
+        # The console window was closed while the game was waiting for input.
+        return 0
+    return 0
+
+
+class GameProcess:
+    def __init__(
+        self, session, entry, messages, console=True, profile=False, player=None, env=None
+    ):
+        """
+        Start a game in a child process.
+
+        Parameters:
+            session (int): An id that tags every message from this game.
+            entry (GameEntry): The game to run.
+            messages (queue.Queue): Where ("output", text) and ("exit", status)
+                messages are posted, as (session, kind, payload) tuples.
+            console (bool): If True, the game's stdin and stdout are piped so they
+                can be shown in a console window.
+            profile (bool): If True, the child reports its import time.
+            player (str, optional): The name the game records its results under.
+            env (dict, optional): More environment variables for the game.
+
+        Returns:
+            None
+        """
+        self.session = session
+        env = dict(env or {})
+        if player:
+            env["GAMEHUB_PLAYER"] = player
+        self._messages = messages
+        command = [
+            sys.executable,
+            "-u",
+            os.path.abspath(__file__),
+            entry.module,
+            entry.entry_point,
+            json.dumps(entry.options or {}),
+        ]
+        if profile:
+            command.append("--profile")
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if console else subprocess.DEVNULL,
+            stdout=subprocess.PIPE if console else None,
+            stderr=subprocess.STDOUT if console else None,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=dict(os.environ, **env) if env else None,
+        )
+        target = self._read_output if console else self._wait
+        threading.Thread(target=target, daemon=True).start()
+
+    def _read_output(self):
+        """Post everything the game prints, then its exit status."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        fd = self._process.stdout.fileno()
+        while True:
+            # os.read returns as soon as anything is available, so prompts written
+            # without a newline by input() are shown straight away.
+            data = os.read(fd, READ_SIZE)
+            if not data:
+                break
+            self._messages.put((self.session, "output", decoder.decode(data)))
+        self._wait()
+
+    def _wait(self):
+        """Post the game's exit status once it ends."""
+        self._messages.put((self.session, "exit", self._process.wait()))
+
+    def send(self, line):
+        """Write one line to the game's stdin."""
+        try:
+            self._process.stdin.write(line.encode("utf-8") + b"\n")
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+
+    def stop(self):
+        """End the game if it is still running."""
+        if self._process.poll() is None:
+            self._process.terminate()
+
+
+class GameLauncher:
+    def __init__(
+        self, root, profile=False, on_change=None, metrics_dir=None, profiler=None
+    ):
+        """
+        Initialize a launcher that runs games alongside the hub.
+
+        Parameters:
+            root (tk.Tk): The hub window, used to poll for game messages.
+            profile (bool): If True, games report their import times.
+            on_change (callable, optional): Called with the number of running games
+                whenever a game starts or ends.
+            metrics_dir (str, optional): If given, games are instrumented and each
+                exports its metrics to session-<n>.json in this directory.
+            profiler (str, optional): "cprofile" or "sample" to profile every game,
+                writing profile-<n>-<module>.prof or .folded in the current directory.
+
+        Returns:
+            None
+        """
+        self._root = root
+        self._profile = profile
+        self._on_change = on_change
+        self._metrics_dir = metrics_dir
+        self._profiler = profiler
+        self._messages = queue.Queue()
+        self._games = {}
+        self._windows = {}
+        self._next_session = 0
+        self._polling = False
+
+    def running(self):
+        """Return the number of games that are still running."""
+        return len(self._games)
+
+    def launch(self, name, entry, player=None):
+        """
+        Start a game and, for console games, open its console window.
+
+        Parameters:
+            name (str): The game's name, used as the window title.
+            entry (GameEntry): The game to run.
+            player (str, optional): The name the game records its results under.
+
+        Returns:
+            None
+        """
+        session = self._next_session
+        self._next_session += 1
+        env = {}
+        if self._metrics_dir:
+            env["GAMEHUB_METRICS"] = os.path.join(self._metrics_dir, f"session-{session}.json")
+        if os.environ.get("GAMEHUB_SEED"):
+            from RandomStreams import RandomStreams
+
+            # Each session gets its own seed, so sessions are repeatable but not identical.
+            env["GAMEHUB_SEED"] = RandomStreams(os.environ["GAMEHUB_SEED"]).key("session", session)
+        if self._profiler:
+            extension = "prof" if self._profiler == "cprofile" else "folded"
+            path = os.path.abspath(f"profile-{session}-{entry.module}.{extension}")
+            env["GAMEHUB_PROFILE"] = f"{self._profiler}:{path}"
+        game = GameProcess(
+            session, entry, self._messages, entry.console, self._profile, player, env
+        )
+        self._games[session] = game
+        if entry.console:
+            self._windows[session] = ConsoleWindow(self._root, name, game)
+        self._changed()
+        if not self._polling:
+            self._polling = True
+            self._root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        """Hand queued game output to the console windows and notice finished games."""
+        for _ in range(MAX_MESSAGES_PER_POLL):
+            try:
+                session, kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            window = self._windows.get(session)
+            if kind == "output":
+                if window is not None:
+                    window.write(payload)
+            else:
+                self._games.pop(session, None)
+                if window is not None:
+                    window.finish(payload)
+                    del self._windows[session]
+                self._changed()
+        if self._games or not self._messages.empty():
+            self._root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _changed(self):
+        """Report the number of running games."""
+        if self._on_change is not None:
+            self._on_change(len(self._games))
+
+    def stop_all(self):
+        """End every running game, e.g. when the hub closes."""
+        for game in self._games.values():
+            game.stop()
+
+
+class ConsoleWindow(tk.Toplevel):
+    def __init__(self, root, title, game):
+        """
+        Open a window that shows a game's output and sends typed lines to it.
+
+        Parameters:
+            root (tk.Tk): The hub window.
+            title (str): The window title.
+            game (GameProcess): The game the window talks to.
+
+        Returns:
+            None
+        """
+        super().__init__(root)
+        self.title(title)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+        self._game = game
+        self._closed = False
+        self._text = tk.Text(master=self, width=80, height=24, state="disabled")
+        self._text.pack(fill=tk.BOTH, expand=True)
+        self._entry = tk.Entry(master=self)
+        self._entry.pack(fill=tk.X)
+        self._entry.bind("<Return>", self._submit)
+        self._entry.focus_set()
+
+    def write(self, text):
+        """Append game output to the window."""
+        if self._closed:
+            return
+        self._text.config(state="normal")
+        self._text.insert(tk.END, text)
+        self._text.see(tk.END)
+        self._text.config(state="disabled")
+
+    def _submit(self, event):
+        """Send the typed line to the game and echo it."""
+        line = self._entry.get()
+        self._entry.delete(0, tk.END)
+        self.write(line + "\n")
+        self._game.send(line)
+
+    def finish(self, status):
+        """Show that the game has ended and stop accepting input."""
+        self.write(f"\n[Game over, exit status {status}]\n")
+        if not self._closed:
+            self._entry.config(state="disabled")
+
+    def _close(self):
+        """Close the window and end its game."""
+        self._closed = True
+        self._game.stop()
+        self.destroy()
+
+
+class MetricsPanel(tk.LabelFrame):
+    def __init__(self, master, directory):
+        """
+        Show live rates and latencies from the metrics the hub's games export.
+
+        The exports of every session in the directory are added up once a second, so
+        the rates cover all running games and the totals include finished ones.
+
+        Parameters:
+            master: The widget to put the panel in.
+            directory (str): Where the games export their metrics.
+
+        Returns:
+            None
+        """
+        super().__init__(master, text="Metrics")
+        self._directory = directory
+        self._previous = None
+        self._text = tk.Label(
+            master=self, text="No measurements yet", font=("Courier", 10), justify=tk.LEFT
+        )
+        self._text.pack(padx=5, pady=5)
+        self.after(METRICS_REFRESH_MS, self._refresh)
+
+    def _refresh(self):
+        """Read the exports and show each metric's rate since the last refresh."""
+        snapshots = [
+            Metrics.read_export(path)
+            for path in glob.glob(os.path.join(self._directory, "session-*.json"))
+        ]
+        merged = Metrics.merge(snapshot for snapshot in snapshots if snapshot is not None)
+        now = time.monotonic()
+        previous, then = self._previous or ({}, now)
+        elapsed = now - then
+        totals = dict(merged["counters"])
+        totals.update((name, h["count"]) for name, h in merged["histograms"].items())
+        lines = []
+        for name in sorted(name for name, total in totals.items() if total):
+            rate = (totals[name] - previous.get(name, 0)) / elapsed if elapsed else 0.0
+            line = f"{name:<26} {rate:>9.1f}/s {totals[name]:>9}"
+            histogram = merged["histograms"].get(name)
+            if histogram is not None:
+                p50 = Metrics.percentile(histogram, 0.5) * 1000
+                p99 = Metrics.percentile(histogram, 0.99) * 1000
+                line += f"  p50 {p50:.3f} ms  p99 {p99:.3f} ms"
+            lines.append(line)
+        self._text["text"] = "\n".join(lines) or "No measurements yet"
+        self._previous = totals, now
+        self.after(METRICS_REFRESH_MS, self._refresh)
+
+
+def main(argv=None):
+    """Run one game in this process; used as the child process's entry point."""
+    parser = argparse.ArgumentParser(description="Run one hub game.")
+    parser.add_argument("module")
+    parser.add_argument("entry_point")
+    parser.add_argument("options", nargs="?", default="{}")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args(argv)
+    sys.exit(run_entry(args.module, args.entry_point, json.loads(args.options), args.profile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""Per-player statistics and leaderboards, stored in SQLite.
+
+Finished games are imported from the game log (see GameLog.py) in batches, one
+transaction per batch, and the byte offset reached is saved in the same transaction,
+so importing again only reads new records and several importers never count a game
+twice. Each batch also updates a per-player, per-game totals table, so leaderboards
+read a few indexed rows instead of scanning every game ever played.
+
+The database runs in WAL mode, so readers never block the importer. Query results
+are cached in-process and the cache is dropped whenever the database changes,
+whether by this process or by another one.
+
+    python GameStats.py import
+    python GameStats.py leaderboard hangman
+    python GameStats.py player alice
+"""
+
+import argparse
+import functools
+import os
+import queue
+import sqlite3
+import threading
+import tkinter as tk
+from collections import defaultdict
+from itertools import islice
+from typing import NamedTuple
+
+from GameLog import (
+    DEFAULT_LOG,
+    GAME_NAMES,
+    HANGMAN,
+    MASTERMIND,
+    WIN,
+    current_player,
+    scan_records,
+)
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats.db")
+BATCH_SIZE = 5000
+CACHE_SIZE = 256
+# How long a writer waits for another writer's transaction, in seconds.
+BUSY_TIMEOUT = 30
+POLL_MS = 100
+LEADERBOARD_SIZE = 5
+GAME_IDS = {name: game for game, name in GAME_NAMES.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    game INTEGER NOT NULL,
+    outcome INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    played REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_player ON games (player_id, played);
+CREATE TABLE IF NOT EXISTS totals (
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    game INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    abandoned INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    won_moves INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    PRIMARY KEY (player_id, game)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS totals_by_wins ON totals (game, wins DESC, games);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+UPSERT_TOTALS = """
+INSERT INTO totals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (player_id, game) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    losses = losses + excluded.losses,
+    ties = ties + excluded.ties,
+    abandoned = abandoned + excluded.abandoned,
+    moves = moves + excluded.moves,
+    won_moves = won_moves + excluded.won_moves,
+    hits = hits + excluded.hits
+"""
+
+
+class LeaderboardRow(NamedTuple):
+    name: str
+    games: int
+    wins: int
+    losses: int
+    ties: int
+
+
+class PlayerStats(NamedTuple):
+    game: str
+    games: int
+    wins: int
+    losses: int
+    ties: int
+    abandoned: int
+    # Guesses per solved code, for Mastermind; None for other games.
+    average_guesses: object
+    # The fraction of guessed letters that were in the word, for Hangman; None otherwise.
+    accuracy: object
+
+
+def count_hits(record):
+    """Return how many of a Hangman game's guesses were in the word, or 0 for other games."""
+    if record.game != HANGMAN:
+        return 0
+    secret = record.setup[1:]
+    return sum(1 for letter in record.moves if letter in secret)
+
+
+class StatsStore:
+    def __init__(self, path=DEFAULT_DB):
+        """
+        Open (and if needed create) a statistics database.
+
+        Parameters:
+            path (str): The SQLite database file.
+
+        Returns:
+            None
+        """
+        self.path = path
+        # Transactions are opened explicitly, so each batch is exactly one transaction.
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._player_ids = {}
+        self._data_version = None
+        self.leaderboard = functools.lru_cache(CACHE_SIZE)(self._leaderboard)
+        self.player_stats = functools.lru_cache(CACHE_SIZE)(self._player_stats)
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _player_id(self, name):
+        """Return a player's id, adding the player if needed. Call inside a transaction."""
+        player_id = self._player_ids.get(name)
+        if player_id is None:
+            self._db.execute("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+            (player_id,) = self._db.execute(
+                "SELECT id FROM players WHERE name = ?", (name,)
+            ).fetchone()
+            self._player_ids[name] = player_id
+        return player_id
+
+    def _add(self, records):
+        """Insert records and update the totals. Call inside a transaction."""
+        rows = []
+        totals = defaultdict(lambda: [0] * 8)
+        for record in records:
+            player_id = self._player_id(record.player or current_player())
+            hits = count_hits(record)
+            rows.append(
+                (player_id, record.game, record.outcome, record.steps, hits, record.timestamp)
+            )
+            total = totals[player_id, record.game]
+            total[0] += 1
+            total[1 + record.outcome] += 1
+            total[5] += record.steps
+            total[6] += record.steps if record.outcome == WIN else 0
+            total[7] += hits
+        self._db.executemany(
+            "INSERT INTO games (player_id, game, outcome, moves, hits, played) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._db.executemany(UPSERT_TOTALS, [key + tuple(row) for key, row in totals.items()])
+
+    def add_games(self, records):
+        """
+        Add finished games in one transaction.
+
+        Parameters:
+            records: An iterable of GameLog.GameRecord. Records without a player name
+                are counted for current_player().
+
+        Returns:
+            None
+        """
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._add(records)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self._player_ids.clear()
+            raise
+        self._db.execute("COMMIT")
+        self._invalidate()
+
+    def import_log(self, log_path=DEFAULT_LOG, batch_size=BATCH_SIZE):
+        """
+        Import the records added to a game log since the last import.
+
+        Parameters:
+            log_path (str): The game log.
+            batch_size (int): How many records to add per transaction.
+
+        Returns:
+            int: The number of records imported.
+        """
+        if not os.path.exists(log_path):
+            return 0
+        key = os.path.abspath(log_path)
+        imported = 0
+        while True:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Read the offset inside the transaction, so two importers never
+                # start from the same place.
+                row = self._db.execute("SELECT offset FROM imports WHERE path = ?", (key,))
+                row = row.fetchone()
+                offset = row[0] if row else 0
+                if offset > os.path.getsize(log_path):
+                    offset = 0  # The log was replaced by a new one.
+                batch = list(islice(scan_records(log_path, offset), batch_size))
+                if batch:
+                    self._add(record for _, record in batch)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO imports VALUES (?, ?)", (key, batch[-1][0])
+                    )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                self._player_ids.clear()
+                raise
+            self._db.execute("COMMIT")
+            if not batch:
+                break
+            imported += len(batch)
+        if imported:
+            self._invalidate()
+        return imported
+
+    def _invalidate(self):
+        """Drop every cached query result."""
+        self.leaderboard.cache_clear()
+        self.player_stats.cache_clear()
+
+    def _refresh(self):
+        """Drop the cache if any connection has changed the database since the last query."""
+        (version,) = self._db.execute("PRAGMA data_version").fetchone()
+        if version != self._data_version:
+            self._data_version = version
+            self._invalidate()
+
+    def top(self, game, limit=LEADERBOARD_SIZE):
+        """Return the leaderboard for a game, using the cache when it is still valid."""
+        self._refresh()
+        return self.leaderboard(game, limit)
+
+    def player(self, name):
+        """Return a player's statistics, using the cache when it is still valid."""
+        self._refresh()
+        return self.player_stats(name)
+
+    def _leaderboard(self, game, limit):
+        """
+        Return the players with the most wins at a game.
+
+        Parameters:
+            game (str): A name from GameLog.GAME_NAMES, e.g. "hangman".
+            limit (int): How many players to return.
+
+        Returns:
+            list: LeaderboardRow tuples, most wins first, fewer games breaking ties.
+        """
+        rows = self._db.execute(
+            "SELECT name, games, wins, losses, ties FROM totals "
+            "JOIN players ON players.id = totals.player_id "
+            "WHERE game = ? ORDER BY wins DESC, games LIMIT ?",
+            (GAME_IDS[game], limit),
+        )
+        return [LeaderboardRow(*row) for row in rows]
+
+    def _player_stats(self, name):
+        """
+        Return one player's statistics for every game they have played.
+
+        Parameters:
+            name (str): The player's name.
+
+        Returns:
+            list: PlayerStats tuples, one per game.
+        """
+        rows = self._db.execute(
+            "SELECT game, games, wins, losses, ties, abandoned, won_moves, moves, hits "
+            "FROM totals JOIN players ON players.id = totals.player_id "
+            "WHERE name = ? ORDER BY game",
+            (name,),
+        )
+        stats = []
+        for game, games, wins, losses, ties, abandoned, won_moves, moves, hits in rows:
+            average_guesses = won_moves / wins if game == MASTERMIND and wins else None
+            accuracy = hits / moves if game == HANGMAN and moves else None
+            counts = (games, wins, losses, ties, abandoned)
+            stats.append(PlayerStats(GAME_NAMES[game], *counts, average_guesses, accuracy))
+        return stats
+
+
+def format_player(stats):
+    """Return one line of text for a PlayerStats."""
+    line = f"{stats.game}: {stats.games} games, {stats.wins} won, {stats.losses} lost"
+    if stats.ties:
+        line += f", {stats.ties} tied"
+    if stats.average_guesses is not None:
+        line += f", {stats.average_guesses:.2f} guesses per code"
+    if stats.accuracy is not None:
+        line += f", {stats.accuracy:.0%} of letters right"
+    return line
+
+
+def format_report(store, player):
+    """Return the leaderboards and one player's statistics as text."""
+    lines = ["Leaderboards"]
+    for game in GAME_IDS:
+        rows = store.top(game)
+        if not rows:
+            continue
+        lines.append(f"  {game}")
+        for rank, row in enumerate(rows, 1):
+            lines.append(f"    {rank}. {row.name}: {row.wins} wins in {row.games} games")
+    lines.append("")
+    lines.append(f"Your statistics ({player})")
+    stats = store.player(player)
+    lines.extend("  " + format_player(entry) for entry in stats)
+    if not stats:
+        lines.append("  No games recorded yet.")
+    return "\n".join(lines)
+
+
+class StatsWindow(tk.Toplevel):
+    def __init__(self, root, player, db_path=DEFAULT_DB, log_path=DEFAULT_LOG):
+        """
+        Open a window with the leaderboards and the player's statistics.
+
+        New games are imported from the log on a worker thread, so a big first import
+        does not freeze the hub; the window is filled in when it is done. The thread keeps
+        one StatsStore open while the window is, so refreshes reuse its query cache.
+
+        Parameters:
+            root (tk.Tk): The hub window.
+            player (str): Whose statistics to show.
+            db_path (str): The statistics database.
+            log_path (str): The game log to import from.
+
+        Returns:
+            None
+        """
+        super().__init__(root)
+        self.title("Leaderboard")
+        self._player = player
+        self._db_path = db_path
+        self._log_path = log_path
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._text = tk.Text(master=self, width=70, height=24, state="disabled")
+        self._text.pack(fill=tk.BOTH, expand=True)
+        tk.Button(master=self, text="Refresh", command=self.refresh).pack(pady=5)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        threading.Thread(target=self._serve, daemon=True).start()
+        self.refresh()
+
+    def refresh(self):
+        """Import new games and redraw the window."""
+        self._show("Loading statistics...")
+        self._requests.put(True)
+        self.after(POLL_MS, self._poll)
+
+    def destroy(self):
+        """Close the window and let the worker close its connection."""
+        self._requests.put(None)
+        super().destroy()
+
+    def _serve(self):
+        """Import and query on the worker thread, which owns the connection, until closed."""
+        store = None
+        while self._requests.get():
+            try:
+                if store is None:
+                    store = StatsStore(self._db_path)
+                store.import_log(self._log_path)
+                self._results.put(format_report(store, self._player))
+            except (sqlite3.Error, OSError, ValueError) as exc:
+                self._results.put(f"Could not load statistics: {exc}")
+        if store is not None:
+            store.close()
+
+    def _poll(self):
+        """Show the report once the worker has finished."""
+        try:
+            report = self._results.get_nowait()
+        except queue.Empty:
+            self.after(POLL_MS, self._poll)
+            return
+        self._show(report)
+
+    def _show(self, text):
+        """Replace the window's text."""
+        self._text.config(state="normal")
+        self._text.delete("1.0", tk.END)
+        self._text.insert(tk.END, text)
+        self._text.config(state="disabled")
+
+
+def main(argv=None):
+    """Import games and print statistics from the command line."""
+    parser = argparse.ArgumentParser(description="Game statistics and leaderboards.")
+    parser.add_argument("command", choices=("import", "leaderboard", "player"))
+    parser.add_argument(
+        "name", nargs="?", help="the game for leaderboard, or the player for player"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--log", default=os.environ.get("GAMEHUB_LOG") or DEFAULT_LOG)
+    args = parser.parse_args(argv)
+    with StatsStore(args.db) as store:
+        if args.command == "import":
+            print(f"Imported {store.import_log(args.log)} games.")
+        elif args.command == "leaderboard":
+            games = [args.name] if args.name else list(GAME_IDS)
+            for game in games:
+                print(game)
+                for rank, row in enumerate(store.top(game, 10), 1):
+                    print(f"  {rank}. {row.name}: {row.wins} wins in {row.games} games")
+        else:
+            for stats in store.player(args.name or current_player()):
+                print(format_player(stats))
+
+
+if __name__ == "__main__":
+    main()
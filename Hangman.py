@@ -1,4 +1,12 @@
+import os
 import random
+from typing import NamedTuple
+
+from GameEngine import GameEngine, StepResult
+from GameLog import recorded
+from Metrics import timed
+from RandomStreams import stream
+from Terminal import get_screen
 
 HANGMAN_PICS = [
     r"""
@@ -45,28 +53,101 @@ HANGMAN_PICS = [
       ===""",
 ]
 
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+COMMANDS = ("exit()", "hint")
+HINT_WORDS_SHOWN = 10
+# A binary corpus (see WordCorpus.py) here replaces the built-in words when present.
+DEFAULT_WORD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.bin")
+_wordLists = {}
+
 words = "ant baboon badger bat bear beaver camel cat clam cobra cougar coyote crow deer dog donkey duck eagle ferret fox frog goat goose hawk lion lizard llama mole monkey moose mouse mule newt otter owl panda parrot pigeon python rabbit ram rat raven rhino salmon seal shark sheep skunk sloth snake spider stork swan tiger toad trout turkey turtle weasel whale wolf wombat zebra".split()
 
 
-def getRandomWord(wordList):
+def getRandomWord(wordList, rng=None):
     """
     Returns a random word from the given word list.
 
     Parameters:
         wordList (list): A list of words.
+        rng (random.Random, optional): The stream to draw from. Defaults to the
+            session's "hangman" stream.
 
     Returns:
         str: A randomly selected word from the word list.
     """
-    wordIndex = random.randint(0, len(wordList) - 1)
+    rng = stream("hangman") if rng is None else rng
+    wordIndex = rng.randint(0, len(wordList) - 1)
     return wordList[wordIndex]
 
 
-def displayBoard(missedLetters, correctLetters, secretWord):
+def getRandomWords(wordList, count, streams):
     """
-    Display the hangman game board with the missed letters, correctly guessed letters, and the secret word.
+    Returns many random words at once, e.g. the secret words of a batch of games.
+
+    Parameters:
+        wordList (list): A list of words.
+        count (int): How many words to pick.
+        streams (RandomStreams): The streams to draw from.
+
+    Returns:
+        list: count randomly selected words.
+    """
+    return [wordList[int(index)] for index in streams.integers(len(wordList), count, "hangman")]
+
+
+def getWordList(wordFile=None):
+    """
+    Returns the words to pick secret words from, opening the file only on first use.
+
+    Binary corpora are memory-mapped so no word is read until it is picked. Text files
+    with one word per line are loaded into a WordIndex. Either way the result is cached
+    for the rest of the session.
+
+    Parameters:
+        wordFile (str, optional): A corpus or text word file. Defaults to DEFAULT_WORD_FILE
+            if it exists, otherwise the built-in animal list.
+
+    Returns:
+        A sequence of words that supports len() and indexing.
+    """
+    if wordFile is None:
+        if not os.path.exists(DEFAULT_WORD_FILE):
+            return words
+        wordFile = DEFAULT_WORD_FILE
+    wordList = _wordLists.get(wordFile)
+    if wordList is None:
+        from WordCorpus import WordCorpus, is_corpus
+
+        if is_corpus(wordFile):
+            wordList = WordCorpus(wordFile)
+        else:
+            from HangmanSolver import WordIndex
+
+            wordList = WordIndex.from_file(wordFile)
+        _wordLists[wordFile] = wordList
+    return wordList
+
+
+def getBlanks(correctLetters, secretWord):
+    """
+    Returns the secret word as the player sees it, with "_" for letters not guessed yet.
+
+    Parameters:
+        correctLetters (str): A string of letters that have been guessed correctly.
+        secretWord (str): The secret word being guessed.
+
+    Returns:
+        str: The secret word with unguessed letters replaced by "_".
+    """
+    return "".join(letter if letter in correctLetters else "_" for letter in secretWord)
+
+
+def showHint(wordIndex, missedLetters, correctLetters, secretWord):
+    """
+    Prints how many words still fit the board and the letter that narrows them down most.
 
     Parameters:
+        wordIndex (WordIndex): The index of the words the secret word was picked from.
         missedLetters (str): A string of letters that have been guessed incorrectly.
         correctLetters (str): A string of letters that have been guessed correctly.
         secretWord (str): The secret word being guessed.
@@ -74,21 +155,55 @@ def displayBoard(missedLetters, correctLetters, secretWord):
     Returns:
         None
     """
-    print(HANGMAN_PICS[len(missedLetters)])
-    print()
-    print("Missed letters:", end=" ")
-    for letter in missedLetters:
-        print(letter, end=" ")
-    print()
-    blanks = "_" * len(secretWord)
+    blanks = getBlanks(correctLetters, secretWord)
+    candidates = wordIndex.count(blanks, missedLetters)
+    letter, gain = wordIndex.best_letter(blanks, missedLetters)
+    screen = get_screen()
+    screen.say(f"{candidates} possible words.")
+    if candidates <= HINT_WORDS_SHOWN:
+        screen.say("They are: " + ", ".join(wordIndex.candidates(blanks, missedLetters)))
+    if letter is not None:
+        screen.say(f'Try "{letter}" ({gain:.2f} bits of information).')
+
+
+def boardLines(missedLetters, correctLetters, secretWord):
+    """
+    Returns the hangman game board as a list of lines: the gallows, the missed letters and the secret word.
+
+    Parameters:
+        missedLetters (str): A string of letters that have been guessed incorrectly.
+        correctLetters (str): A string of letters that have been guessed correctly.
+        secretWord (str): The secret word being guessed.
+
+    Returns:
+        list: The lines of the board, without newlines.
+    """
+    blanks = getBlanks(correctLetters, secretWord)
+    return HANGMAN_PICS[len(missedLetters)].split("\n") + [
+        "",
+        "Missed letters: " + "".join(letter + " " for letter in missedLetters),
+        # Show the secret word with spaces in between each letter.
+        "".join(letter + " " for letter in blanks),
+    ]
+
+
+@timed("hangman.render")
+def displayBoard(missedLetters, correctLetters, secretWord):
+    """
+    Display the hangman game board with the missed letters, correctly guessed letters, and the secret word.
+
+    The board is drawn as one frame, so on a terminal only the lines that changed since the last
+    guess are redrawn.
 
-    for i in range(len(secretWord)):  # Replace blanks with correctly guessed letters.
-        if secretWord[i] in correctLetters:
-            blanks = blanks[:i] + secretWord[i] + blanks[i + 1 :]
+    Parameters:
+        missedLetters (str): A string of letters that have been guessed incorrectly.
+        correctLetters (str): A string of letters that have been guessed correctly.
+        secretWord (str): The secret word being guessed.
 
-    for letter in blanks:  # Show the secret word with spaces in between each letter.
-        print(letter, end=" ")
-    print()
+    Returns:
+        None
+    """
+    get_screen().render(boardLines(missedLetters, correctLetters, secretWord))
 
 
 def getGuess(alreadyGuessed):
@@ -99,7 +214,7 @@ def getGuess(alreadyGuessed):
         alreadyGuessed (str): A string of letters that have already been guessed.
 
     Returns:
-        str: A lowercase letter that the user has guessed.
+        str: A lowercase letter that the user has guessed, or one of COMMANDS.
 
     Raises:
         None
@@ -109,16 +224,19 @@ def getGuess(alreadyGuessed):
     letter that has not already been guessed. If the user enters a letter that is not a single lowercase letter,
     the function displays an error message and prompts the user again. The function returns the valid guessed letter.
     """
+    screen = get_screen()
     while True:
-        print("Guess a letter.")
-        guess = input()
+        screen.say("Guess a letter.")
+        guess = screen.ask()
         guess = guess.lower()
-        if len(guess) != 1:
-            print("Please enter a single letter.")
+        if guess in COMMANDS:
+            return guess
+        elif len(guess) != 1:
+            screen.say("Please enter a single letter.")
         elif guess in alreadyGuessed:
-            print("You have already guessed that letter. Choose again.")
-        elif guess not in "abcdefghijklmnopqrstuvwxyz":
-            print("Please enter a LETTER.")
+            screen.say("You have already guessed that letter. Choose again.")
+        elif guess not in LETTERS:
+            screen.say("Please enter a LETTER.")
         else:
             return guess
 
@@ -127,66 +245,141 @@ def playAgain():
     """
     Asks the user if they want to play again. Returns True if the user wants to play again, False otherwise.
     """
-    print("Do you want to play again? (yes or no)")
-    return input().lower().startswith("y")
+    screen = get_screen()
+    screen.say("Do you want to play again? (yes or no)")
+    return screen.ask().lower().startswith("y")
 
 
-def Hangman_game():
+class HangmanObservation(NamedTuple):
+    blanks: str
+    missedLetters: str
+    correctLetters: str
+    missesLeft: int
+
+
+class HangmanEngine(GameEngine):
+    def __init__(self, wordList=None, maxMisses=len(HANGMAN_PICS) - 1):
+        """
+        Initialize a headless Hangman game.
+
+        Parameters:
+            wordList (optional): The words to pick the secret word from. Defaults to
+                getWordList().
+            maxMisses (int): How many missed letters lose the game.
+
+        Returns:
+            None
+        """
+        self.wordList = getWordList() if wordList is None else wordList
+        self.maxMisses = maxMisses
+        self.reset()
+
+    def reset(self, seed=None):
+        """Pick a new secret word and clear the guessed letters."""
+        if seed is None:
+            self.secretWord = getRandomWord(self.wordList)
+        else:
+            rng = random.Random(seed)
+            self.secretWord = self.wordList[rng.randrange(len(self.wordList))]
+        self.missedLetters = ""
+        self.correctLetters = ""
+        return self.observation()
+
+    def legal_actions(self):
+        """Return the letters that have not been guessed yet."""
+        if self.is_terminal():
+            return []
+        guessed = self.missedLetters + self.correctLetters
+        return [letter for letter in LETTERS if letter not in guessed]
+
+    def step(self, action):
+        """Guess one letter. The reward is 1 for a win, -1 for a loss and 0 otherwise."""
+        guessed = self.missedLetters + self.correctLetters
+        if len(action) != 1 or action not in LETTERS or action in guessed:
+            raise ValueError(f"{action!r} is not a new lowercase letter")
+        if self.is_terminal():
+            raise ValueError("The game is over")
+        if action in self.secretWord:
+            self.correctLetters += action
+        else:
+            self.missedLetters += action
+        reward = 1.0 if self.won() else -1.0 if self.lost() else 0.0
+        return StepResult(self.observation(), reward, self.is_terminal())
+
+    def observation(self):
+        """Return the board as the player sees it."""
+        return HangmanObservation(
+            getBlanks(self.correctLetters, self.secretWord),
+            self.missedLetters,
+            self.correctLetters,
+            self.maxMisses - len(self.missedLetters),
+        )
+
+    def won(self):
+        """Return True if every letter of the secret word has been guessed."""
+        return all(letter in self.correctLetters for letter in self.secretWord)
+
+    def lost(self):
+        """Return True if the player has run out of guesses."""
+        return len(self.missedLetters) >= self.maxMisses
+
+    def is_terminal(self):
+        """Return True if the game is won or lost."""
+        return self.won() or self.lost()
+
+
+def Hangman_game(wordFile=None):
     """
     A simple Hangman game function that allows players to guess letters until they either win or lose.
-    It initializes the game settings, displays the board, takes guesses, checks for correct guesses, updates missed letters, and handles game outcomes.
+    It displays the board, takes guesses and reports the outcome, while HangmanEngine keeps the rules and state.
     The game continues until the player chooses to stop or finishes the game.
+
+    Parameters:
+        wordFile (str, optional): A binary corpus or a text file with one word per line to
+            pick secret words from. See getWordList.
     """
-    print("H A N G M A N")
-    missedLetters = ""
-    correctLetters = ""
-    secretWord = getRandomWord(words)
-    gameIsDone = False
-    print("To exit the game type 'exit()'")
+    screen = get_screen()
+    screen.say("H A N G M A N")
+    wordList = getWordList(wordFile)
+    wordIndex = None
+    game = recorded(HangmanEngine(wordList))
+    screen.say("To exit the game type 'exit()'", "For a hint type 'hint'")
 
     while True:
-        displayBoard(missedLetters, correctLetters, secretWord)
-        guess = getGuess(missedLetters + correctLetters)
+        displayBoard(game.missedLetters, game.correctLetters, game.secretWord)
+        guess = getGuess(game.missedLetters + game.correctLetters)
 
         if guess == "exit()":
-            print("Thanks for playing!")
+            screen.say("Thanks for playing!")
+            screen.flush()
             exit(0)
 
-        if guess in secretWord:
-            correctLetters += guess
-
-            # Check if the player has won.
-            foundAllLetters = True
-            for i in range(len(secretWord)):
-                if secretWord[i] not in correctLetters:
-                    foundAllLetters = False
-                    break
-            if foundAllLetters:
-                print('Yes! The secret word is "' + secretWord + '"! You have won!')
-                gameIsDone = True
-        else:
-            missedLetters += guess
-
-            # Check if player has guessed too many times and lost.
-            if len(missedLetters) == len(HANGMAN_PICS) - 1:
-                displayBoard(missedLetters, correctLetters, secretWord)
-                print(
-                    "You have run out of guesses!\nAfter "
-                    + str(len(missedLetters))
-                    + " missed guesses and "
-                    + str(len(correctLetters))
-                    + ' correct guesses, the word was "'
-                    + secretWord
-                    + '"'
-                )
-                gameIsDone = True
+        if guess == "hint":
+            if wordIndex is None:
+                from HangmanSolver import WordIndex
+
+                wordIndex = wordList if isinstance(wordList, WordIndex) else WordIndex(wordList)
+            showHint(wordIndex, game.missedLetters, game.correctLetters, game.secretWord)
+            continue
+
+        game.step(guess)
+        if game.won():
+            screen.say('Yes! The secret word is "' + game.secretWord + '"! You have won!')
+        elif game.lost():
+            displayBoard(game.missedLetters, game.correctLetters, game.secretWord)
+            screen.say(
+                "You have run out of guesses!\nAfter "
+                + str(len(game.missedLetters))
+                + " missed guesses and "
+                + str(len(game.correctLetters))
+                + ' correct guesses, the word was "'
+                + game.secretWord
+                + '"'
+            )
 
         # Ask the player if they want to play again (but only if the game is done).
-        if gameIsDone:
+        if game.is_terminal():
             if playAgain():
-                missedLetters = ""
-                correctLetters = ""
-                gameIsDone = False
-                secretWord = getRandomWord(words)
+                game.reset()
             else:
                 break
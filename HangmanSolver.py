@@ -0,0 +1,323 @@
+"""A word index for Hangman dictionaries and a solver that suggests the next letter."""
+
+import math
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, best_letter() counts patterns in Python.
+    np = None
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+LETTER_NUMBERS = {letter: number for number, letter in enumerate(LETTERS)}
+BLANK = "_"
+
+
+try:
+    _popcount = int.bit_count
+except AttributeError:  # Python 3.9 has no native popcount.
+
+    def _popcount(bits):
+        """Return the number of set bits in an integer."""
+        return bin(bits).count("1")
+
+
+class WordIndex:
+    def __init__(self, words):
+        """
+        Build the index from an iterable of words.
+
+        Words are grouped by length and each group is stored as one bytes blob of
+        fixed-width entries. For every group, position and letter there is an integer
+        bitset of the words with that letter at that position, plus one bitset per letter
+        of the words that contain it anywhere, so queries are a few bitwise ANDs.
+
+        Each letter of a word also gets a pattern id, naming the letter and the positions
+        it fills, since that is how a guess of the letter splits the words. A word's ids
+        are stored in one fixed-width row (id 0 pads words with repeated letters), and
+        best_letter() scores letters by counting the ids of the candidates.
+
+        Parameters:
+            words: An iterable of words. Anything that is not purely a-z is skipped.
+
+        Returns:
+            None
+        """
+        groups = {}
+        for word in words:
+            word = word.strip().lower()
+            if word and word.isascii() and word.isalpha():
+                groups.setdefault(len(word), set()).add(word)
+        self._lengths = sorted(groups)
+        self._blobs = {}
+        self._positions = {}
+        self._contains = {}
+        self._codes = {}
+        self._pattern_letters = {}
+        self._pattern_counts = {}
+        # Without NumPy, a bitset of the words with each pattern id, made on first use.
+        self._pattern_bits = {}
+        self._offsets = []
+        total = 0
+        for length in self._lengths:
+            group = sorted(groups[length])
+            self._offsets.append(total)
+            total += len(group)
+            self._blobs[length] = "".join(group).encode("ascii")
+            size = (len(group) + 7) // 8
+            at = [{letter: bytearray(size) for letter in LETTERS} for _ in range(length)]
+            anywhere = {letter: bytearray(size) for letter in LETTERS}
+            ids = {}
+            codes = array("I")
+            width = min(length, len(LETTERS))
+            for number, word in enumerate(group):
+                byte, offset = divmod(number, 8)
+                mask = 1 << offset
+                filled = {}
+                for position, letter in enumerate(word):
+                    at[position][letter][byte] |= mask
+                    anywhere[letter][byte] |= mask
+                    filled[letter] = filled.get(letter, 0) | 1 << position
+                for key in filled.items():
+                    code = ids.get(key)
+                    if code is None:
+                        code = ids[key] = len(ids) + 1
+                    codes.append(code)
+                codes.extend([0] * (width - len(filled)))
+            self._positions[length] = [
+                {letter: int.from_bytes(bits, "little") for letter, bits in row.items()}
+                for row in at
+            ]
+            self._contains[length] = {
+                letter: int.from_bytes(bits, "little") for letter, bits in anywhere.items()
+            }
+            # The letter number of each id; the padding id counts for no letter.
+            letters = [len(LETTERS)] + [LETTER_NUMBERS[letter] for letter, _ in ids]
+            counts = _count_ids(codes, len(letters))
+            if np is not None:
+                # Stored as intp, which is what bincount() counts without a copy.
+                codes = np.array(codes, dtype=np.intp).reshape(-1, width)
+                letters = np.array(letters)
+                counts = np.array(counts)
+            self._codes[length] = codes
+            self._pattern_letters[length] = letters
+            self._pattern_counts[length] = counts
+        self._size = total
+
+    @classmethod
+    def from_file(cls, path):
+        """Build an index from a text file with one word per line."""
+        with open(path, encoding="utf-8") as file:
+            return cls(file)
+
+    def __len__(self):
+        """Return the number of words in the index."""
+        return self._size
+
+    def __getitem__(self, index):
+        """Return a word by its position across all length groups, so getRandomWord works."""
+        if not 0 <= index < self._size:
+            raise IndexError("word index out of range")
+        group = bisect_right(self._offsets, index) - 1
+        return self._word(self._lengths[group], index - self._offsets[group])
+
+    def _word(self, length, number):
+        """Return word number of the given length group."""
+        start = number * length
+        return self._blobs[length][start : start + length].decode("ascii")
+
+    def _match(self, blanks, missedLetters):
+        """
+        Return the bitset of words consistent with the board.
+
+        Parameters:
+            blanks (str): The secret word as shown, with "_" for unknown letters.
+            missedLetters (str): The letters guessed that are not in the word.
+
+        Returns:
+            int: A bitset over the words of length len(blanks).
+        """
+        length = len(blanks)
+        positions = self._positions.get(length)
+        if positions is None:
+            return 0
+        contains = self._contains[length]
+        matches = (1 << (len(self._blobs[length]) // length)) - 1
+        for letter in missedLetters:
+            matches &= ~contains[letter]
+        revealed = set(blanks) - {BLANK}
+        for position, letter in enumerate(blanks):
+            if letter != BLANK:
+                matches &= positions[position][letter]
+            else:
+                # A revealed letter shows every copy of itself, so it is not under a blank.
+                for known in revealed:
+                    matches &= ~positions[position][known]
+        return matches
+
+    def candidates(self, blanks, missedLetters=""):
+        """
+        Return the words that are still possible.
+
+        Parameters:
+            blanks (str): The secret word as shown, with "_" for unknown letters.
+            missedLetters (str): The letters guessed that are not in the word.
+
+        Returns:
+            list: The matching words, in alphabetical order.
+        """
+        length = len(blanks)
+        matches = self._match(blanks, missedLetters)
+        words = []
+        while matches:
+            bit = matches & -matches
+            words.append(self._word(length, bit.bit_length() - 1))
+            matches ^= bit
+        return words
+
+    def count(self, blanks, missedLetters=""):
+        """Return how many words are still possible, without listing them."""
+        return _popcount(self._match(blanks, missedLetters))
+
+    def best_letter(self, blanks, missedLetters=""):
+        """
+        Pick the unguessed letter whose answer tells the most about the secret word.
+
+        Guessing a letter splits the candidates by where the letter appears (or that it
+        is missing). The letter whose split has the highest entropy is returned.
+
+        The split sizes are counts of the candidates' pattern ids: with NumPy a gather
+        and a bincount over the candidates' rows, without it an AND and popcount per id.
+        When most of the words still match, the ones that do not are counted instead
+        and taken off the counts over every word, which were made when the index was
+        built.
+
+        Parameters:
+            blanks (str): The secret word as shown, with "_" for unknown letters.
+            missedLetters (str): The letters guessed that are not in the word.
+
+        Returns:
+            tuple: The best letter and its information gain in bits, or (None, 0.0) if
+                no words match or no letter splits the candidates.
+        """
+        length = len(blanks)
+        matches = self._match(blanks, missedLetters)
+        total = _popcount(matches)
+        if not total:
+            return None, 0.0
+        counts = self._pattern_counts[length]
+        words = len(self._blobs[length]) // length
+        if total < words:
+            # Count whichever of the matching and the other words are fewer.
+            fewer = total * 2 <= words
+            if not fewer:
+                matches ^= (1 << words) - 1
+            tally = self._tally(length, matches)
+            if fewer:
+                counts = tally
+            elif np is not None:
+                counts = counts - tally
+            else:
+                counts = [every - other for every, other in zip(counts, tally)]
+        # Guessed letters split nothing (a revealed letter shows every copy of itself),
+        # so their gain is 0 and they are never picked.
+        best = (None, 0.0)
+        gains = _gains(counts, self._pattern_letters[length], total)
+        for letter, gain in zip(LETTERS, gains):
+            if gain > best[1]:
+                best = (letter, float(gain))
+        return best
+
+    def _tally(self, length, matches):
+        """Return how many of the words in a bitset have each pattern id."""
+        codes = self._codes[length]
+        size = len(self._pattern_letters[length])
+        if np is not None:
+            bits = matches.to_bytes((len(codes) + 7) // 8, "little")
+            bits = np.unpackbits(np.frombuffer(bits, np.uint8), count=len(codes), bitorder="little")
+            rows = np.compress(bits.view(bool), codes, axis=0)
+            return np.bincount(rows.ravel(), minlength=size)
+        # Counting word by word is too slow in Python; AND the words with each id's bitset.
+        if length not in self._pattern_bits:
+            self._pattern_bits[length] = self._build_pattern_bits(length)
+        pattern_bits, by_letter = self._pattern_bits[length]
+        contains = self._contains[length]
+        counts = [0] * size
+        for letter, codes in zip(LETTERS, by_letter):
+            left = _popcount(matches & contains[letter])
+            # Largest ids first, so the loop can stop once every hit is counted.
+            for code in codes:
+                if not left:
+                    break
+                counts[code] = _popcount(matches & pattern_bits[code])
+                left -= counts[code]
+        return counts
+
+    def _build_pattern_bits(self, length):
+        """
+        Return a bitset of the words with each pattern id, for counting without NumPy.
+
+        Returns:
+            tuple: The bitsets, by id, and each letter's ids, largest first.
+        """
+        codes = self._codes[length]
+        letters = self._pattern_letters[length]
+        counts = self._pattern_counts[length]
+        width = min(length, len(LETTERS))
+        size = (len(codes) // width + 7) // 8
+        bits = [bytearray(size) for _ in letters]
+        for index, code in enumerate(codes):
+            number = index // width
+            bits[code][number >> 3] |= 1 << (number & 7)
+        by_letter = [[] for _ in LETTERS]
+        for code in sorted(range(1, len(letters)), key=counts.__getitem__, reverse=True):
+            by_letter[letters[code]].append(code)
+        return [int.from_bytes(row, "little") for row in bits], by_letter
+
+
+def _count_ids(codes, size):
+    """Return a list of how many times each id below size occurs in codes."""
+    counts = [0] * size
+    for code, count in Counter(codes).items():
+        counts[code] = count
+    return counts
+
+
+def _gains(counts, letters, total):
+    """
+    Return the information gain of guessing each letter.
+
+    Parameters:
+        counts: How many candidates have each pattern id.
+        letters: The letter number of each pattern id, len(LETTERS) for the padding id.
+        total (int): The number of candidates.
+
+    Returns:
+        A sequence of the gains in bits, in the order of LETTERS.
+    """
+    if np is not None:
+        counts = counts.copy()
+        counts[0] = 0
+        # The candidates without a letter are one more group of its split.
+        hits = np.bincount(letters, weights=counts, minlength=len(LETTERS) + 1)
+        groups = np.concatenate((counts[1:], total - hits[: len(LETTERS)]))
+        owners = np.concatenate((letters[1:], np.arange(len(LETTERS))))
+        present = groups > 0
+        shares = groups[present] / total
+        return np.bincount(
+            owners[present], weights=-shares * np.log2(shares), minlength=len(LETTERS)
+        )
+    gains = [0.0] * len(LETTERS)
+    misses = [total] * len(LETTERS)
+    for code in range(1, len(counts)):
+        if counts[code]:
+            share = counts[code] / total
+            gains[letters[code]] -= share * math.log2(share)
+            misses[letters[code]] -= counts[code]
+    for number, count in enumerate(misses):
+        if count:
+            share = count / total
+            gains[number] -= share * math.log2(share)
+    return gains
@@ -1,28 +1,71 @@
 import random
+from itertools import product
+from typing import NamedTuple
 
+from GameEngine import GameEngine, StepResult
+from GameLog import recorded
+from Metrics import timed
+from RandomStreams import stream
+from Terminal import get_screen
 
-def generate_secret_code():
-    """Generates a random secret code."""
-    return [random.randint(0, 9) for _ in range(4)]
+try:
+    import numpy as np
+except ImportError:  # score_batch falls back to scoring one code at a time.
+    np = None
 
+CODE_LENGTH = 4
+SYMBOLS = 10
 
-def get_player_guess():
+
+def generate_secret_code(length=CODE_LENGTH, symbols=SYMBOLS, rng=None):
+    """Generates a random secret code of the given length, from the session's stream by default."""
+    rng = stream("mastermind") if rng is None else rng
+    return [rng.randint(0, symbols - 1) for _ in range(length)]
+
+
+def generate_secret_codes(count, streams, length=CODE_LENGTH, symbols=SYMBOLS):
+    """
+    Generates many secret codes at once, e.g. for a batch of games.
+
+    Parameters:
+        count (int): How many codes to generate.
+        streams (RandomStreams): The streams to draw from.
+        length (int): The number of digits in a code.
+        symbols (int): How many different digits can appear.
+
+    Returns:
+        A 2D NumPy array (a list of lists without NumPy) with one code per row, which
+        score_batch() accepts as it is.
+    """
+    digits = streams.integers(symbols, count * length, "mastermind")
+    if np is not None:
+        return digits.reshape(count, length)
+    return [digits[start : start + length] for start in range(0, count * length, length)]
+
+
+def get_player_guess(length=CODE_LENGTH, symbols=SYMBOLS):
     """Gets the player's guess as a list of integers."""
+    screen = get_screen()
     while True:
         try:
-            temp = input("Enter your 4-digit guess: ").strip()
+            temp = screen.ask(f"Enter your {length}-digit guess: ").strip()
             guess = list(map(int, temp))
-            if len(guess) == 4 and all(0 <= num < 10 for num in guess):
+            if len(guess) == length and all(0 <= num < symbols for num in guess):
                 return guess
             else:
-                print("Invalid guess. Please enter a 4-digit number.")
+                screen.say(
+                    f"Invalid guess. Please enter a {length}-digit number "
+                    f"using the digits 0-{symbols - 1}."
+                )
         except ValueError:
             if temp == "exit":
-                print("Thanks for playing!")
+                screen.say("Thanks for playing!")
+                screen.flush()
                 exit(0)
-            print("Invalid input. Please enter a 4-digit number.")
+            screen.say(f"Invalid input. Please enter a {length}-digit number.")
 
 
+@timed("mastermind.feedback")
 def provide_feedback(secret_code, guess):
     """Provides feedback on the player's guess."""
     correct_in_position = sum(a == b for a, b in zip(secret_code, guess))
@@ -32,26 +75,200 @@ def provide_feedback(secret_code, guess):
     return correct_in_position, correct_not_in_position - correct_in_position
 
 
-def play_mastermind():
+def score_batch(guess, codes):
+    """
+    Scores one guess against many codes at once.
+
+    With NumPy, the codes are compared column by column and the symbol counts are taken
+    once per symbol of the guess, so the work is a handful of array operations no matter
+    how many codes there are.
+
+    Parameters:
+        guess (list): The guessed code.
+        codes: A 2D array-like with one code per row, e.g. millions of candidate codes.
+
+    Returns:
+        tuple: Arrays (or lists without NumPy) of correct-in-position and
+            incorrect-but-present counts, one entry per code.
+    """
+    if np is None:
+        feedback = [provide_feedback(list(code), list(guess)) for code in codes]
+        return [black for black, _ in feedback], [white for _, white in feedback]
+    codes = np.asarray(codes)
+    guess = np.asarray(guess, dtype=codes.dtype)
+    black = (codes == guess).sum(axis=1, dtype=np.int8)
+    total = np.zeros(len(codes), dtype=np.int8)
+    symbols, guess_counts = np.unique(guess, return_counts=True)
+    for symbol, guess_count in zip(symbols, guess_counts):
+        code_counts = (codes == symbol).sum(axis=1, dtype=np.int8)
+        total += np.minimum(code_counts, guess_count).astype(np.int8)
+    return black, total - black
+
+
+def history_lines(history, length=CODE_LENGTH):
+    """
+    Returns the guesses so far as a table, one line per guess.
+
+    Parameters:
+        history (list): (guess, (correct, incorrect)) pairs, as kept by MastermindEngine.
+        length (int): The number of digits in a code.
+
+    Returns:
+        list: The table's lines, header first.
+    """
+    width = max(length, len("Guess"))
+    lines = [f"{'Guess':<{width}}  Correct in position  Incorrect but present"]
+    for guess, (correct, incorrect) in history:
+        lines.append(f"{''.join(map(str, guess)):<{width}}  {correct:>19}  {incorrect:>21}")
+    return lines
+
+
+class CodeSpace:
+    def __init__(self, length=CODE_LENGTH, symbols=SYMBOLS):
+        """
+        Initialize a read-only sequence of every possible code, in itertools.product order.
+
+        Code number i is decoded from the digits of i in base symbols, so nothing is
+        stored and picking a random code does not build a list of them all.
+
+        Parameters:
+            length (int): The number of digits in a code.
+            symbols (int): How many different digits can appear.
+
+        Returns:
+            None
+        """
+        self.length = length
+        self.symbols = symbols
+
+    def __len__(self):
+        """Return the number of possible codes."""
+        return self.symbols**self.length
+
+    def __getitem__(self, index):
+        """Return code number index as a tuple of digits."""
+        if not 0 <= index < len(self):
+            raise IndexError("code index out of range")
+        code = []
+        for _ in range(self.length):
+            index, digit = divmod(index, self.symbols)
+            code.append(digit)
+        return tuple(reversed(code))
+
+    def __iter__(self):
+        """Yield every code in order."""
+        return product(range(self.symbols), repeat=self.length)
+
+
+class MastermindObservation(NamedTuple):
+    history: tuple
+    guesses_left: object
+
+
+class MastermindEngine(GameEngine):
+    def __init__(self, length=CODE_LENGTH, symbols=SYMBOLS, max_guesses=None):
+        """
+        Initialize a headless Mastermind game.
+
+        Parameters:
+            length (int): The number of digits in the secret code.
+            symbols (int): How many different digits can appear, from 2 to 10.
+            max_guesses (int, optional): Lose after this many wrong guesses. None means
+                no limit, like the console game.
+
+        Returns:
+            None
+        """
+        if not 2 <= symbols <= 10:
+            raise ValueError("symbols must be between 2 and 10 so guesses can be typed as digits")
+        self.length = length
+        self.symbols = symbols
+        self.max_guesses = max_guesses
+        self.reset()
+
+    def reset(self, seed=None):
+        """Pick a new secret code and forget the previous guesses."""
+        rng = None if seed is None else random.Random(seed)
+        self.secret_code = generate_secret_code(self.length, self.symbols, rng)
+        self.history = []
+        return self.observation()
+
+    def legal_actions(self):
+        """Return every possible code as a CodeSpace, which does not list them up front."""
+        if self.is_terminal():
+            return []
+        return CodeSpace(self.length, self.symbols)
+
+    def step(self, action):
+        """Score one guess. The reward is 1 for cracking the code, -1 for running out of guesses."""
+        guess = list(action)
+        if len(guess) != self.length or not all(0 <= num < self.symbols for num in guess):
+            raise ValueError(f"{action!r} is not a {self.length}-digit code")
+        if self.is_terminal():
+            raise ValueError("The game is over")
+        self.history.append((tuple(guess), provide_feedback(self.secret_code, guess)))
+        reward = 1.0 if self.solved() else -1.0 if self.is_terminal() else 0.0
+        return StepResult(self.observation(), reward, self.is_terminal())
+
+    def observation(self):
+        """Return the guesses so far with their (correct, incorrect) feedback."""
+        left = None if self.max_guesses is None else self.max_guesses - len(self.history)
+        return MastermindObservation(tuple(self.history), left)
+
+    def solved(self):
+        """Return True if the last guess was the secret code."""
+        return bool(self.history) and self.history[-1][1][0] == self.length
+
+    def is_terminal(self):
+        """Return True if the code was cracked or no guesses are left."""
+        if self.solved():
+            return True
+        return self.max_guesses is not None and len(self.history) >= self.max_guesses
+
+
+def play_mastermind(solver=False, length=CODE_LENGTH, symbols=SYMBOLS):
     """
     Runs the Mastermind game.
 
-    This function prompts the player to enter a 4-digit guess and provides feedback on the guess.
+    This function prompts the player to enter a guess of length digits and provides feedback on the guess.
     The game continues until the player guesses the secret code.
 
+    Parameters:
+        solver (bool): If True, the computer makes the guesses using MastermindSolver.
+        length (int): The number of digits in the secret code.
+        symbols (int): How many different digits can appear, from 2 to 10.
+
     Returns:
         None
     """
-    print("To exit the game type 'exit'")
-    secret_code = generate_secret_code()
-    amount = 0
-    while True:
-        guess = get_player_guess()
-        correct, incorrect = provide_feedback(secret_code, guess)
-        print(f"Correct in position: {correct}")
-        print(f"Incorrect but present: {incorrect}")
-        amount += 1
-        if guess == secret_code:
-            print("Congratulations! You've guessed the code.")
-            print(f"It took you {amount} guesses.")
-            break
+    screen = get_screen()
+    if solver:
+        from MastermindSolver import MAX_TABLE_CODES, FeedbackTable, MastermindSolver, default_cache
+
+        if symbols**length > MAX_TABLE_CODES:
+            screen.say(
+                f"The solver can't play {length} digits from {symbols} symbols: that is "
+                f"{symbols**length} codes, more than the {MAX_TABLE_CODES} it supports."
+            )
+            screen.flush()
+            return
+    game = recorded(MastermindEngine(length, symbols))
+    if solver:
+        screen.say("Building the feedback table...")
+        screen.flush()
+        table = FeedbackTable(length, symbols, path=default_cache(length, symbols))
+        guesses = iter(MastermindSolver(table).solve(game.secret_code))
+    else:
+        screen.say("To exit the game type 'exit'")
+    screen.render(history_lines(game.history, length))
+    while not game.is_terminal():
+        if solver:
+            guess = next(guesses)
+        else:
+            guess = get_player_guess(length, symbols)
+        game.step(guess)
+        # Only the new row is drawn; on a terminal the prompt and any errors are cleared.
+        screen.render(history_lines(game.history, length))
+    screen.say("Congratulations! You've guessed the code.")
+    screen.say(f"It took you {len(game.history)} guesses.")
+    screen.flush()
@@ -0,0 +1,376 @@
+"""A Mastermind solver built on a precomputed table of every guess/secret feedback."""
+
+import argparse
+import math
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, rows of the table are computed on demand.
+    np = None
+
+from Mastermind import CODE_LENGTH, SYMBOLS
+
+# Above this many codes the full table no longer fits comfortably in memory.
+MAX_TABLE_CODES = 1 << 15
+# Rows computed per block while building the table, to bound temporary arrays.
+BLOCK_ROWS = 256
+# Without NumPy, only candidate sets this small are scored against each other.
+FALLBACK_POOL = 256
+STRATEGIES = ("minimax", "entropy")
+# Where play_mastermind caches its tables; GAMEHUB_FEEDBACK_CACHE names another directory.
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "gamehub")
+
+
+class FeedbackTable:
+    def __init__(self, pegs=CODE_LENGTH, symbols=SYMBOLS, path=None):
+        """
+        Initialize the feedback table for codes of the given length and alphabet.
+
+        Codes are numbered in base symbols, most significant peg first, so code 123 is
+        [0, 1, 2, 3]. Each feedback is stored as one byte, black * (pegs + 1) + white.
+
+        With NumPy the whole size x size table is built up front. If path is given it is
+        stored there as a .npy file and later runs memory-map it instead of rebuilding.
+        Without NumPy, rows are computed the first time they are needed.
+
+        Parameters:
+            pegs (int): The number of positions in a code.
+            symbols (int): The number of different symbols per position.
+            path (str, optional): Where to cache the table on disk.
+
+        Returns:
+            None
+        """
+        self.pegs = pegs
+        self.symbols = symbols
+        self.size = symbols**pegs
+        if self.size > MAX_TABLE_CODES:
+            raise ValueError(
+                f"{pegs} pegs x {symbols} symbols gives {self.size} codes, "
+                f"more than the {MAX_TABLE_CODES} a full table supports"
+            )
+        self.outcomes = (pegs + 1) ** 2
+        self.win = self.encode(pegs, 0)
+        self.codes = [self.code_at(index) for index in range(self.size)]
+        self._rows = {}
+        self._counts = None
+        self.matrix = None
+        if np is not None:
+            self.matrix = self._load_or_build(path)
+        else:
+            self._counts = [Counter(code) for code in self.codes]
+
+    def encode(self, black, white):
+        """Pack a (black, white) feedback into its one-byte code."""
+        return black * (self.pegs + 1) + white
+
+    def decode(self, feedback):
+        """Unpack a one-byte feedback code into (black, white)."""
+        return divmod(feedback, self.pegs + 1)
+
+    def code_at(self, index):
+        """Return the list of symbols for a code number."""
+        code = []
+        for _ in range(self.pegs):
+            index, symbol = divmod(index, self.symbols)
+            code.append(symbol)
+        return code[::-1]
+
+    def index_of(self, code):
+        """Return the code number of a list of symbols."""
+        index = 0
+        for symbol in code:
+            index = index * self.symbols + symbol
+        return index
+
+    def row(self, guess):
+        """Return the feedback of guess against every code, indexed by code number."""
+        if self.matrix is not None:
+            return self.matrix[guess]
+        row = self._rows.get(guess)
+        if row is None:
+            row = self._rows[guess] = self._compute_row(guess)
+        return row
+
+    def feedback(self, guess, secret):
+        """Return the feedback code for one guess and secret, by code number."""
+        return int(self.row(guess)[secret])
+
+    def compute(self, guess, secret):
+        """Compute the feedback code for one pair directly, without touching the table."""
+        black = sum(a == b for a, b in zip(self.codes[guess], self.codes[secret]))
+        secret_counts = self._counts[secret]
+        total = sum(
+            min(count, secret_counts[symbol])
+            for symbol, count in self._counts[guess].items()
+        )
+        return self.encode(black, total - black)
+
+    def _compute_row(self, guess):
+        """Compute one row of the table without NumPy."""
+        return array("B", [self.compute(guess, secret) for secret in range(self.size)])
+
+    def _load_or_build(self, path):
+        """
+        Memory-map a cached table from path, or build it (and cache it if asked).
+
+        The cache is optional: if it cannot be written, the table is built in memory.
+        """
+        shape = (self.size, self.size)
+        if path is not None and os.path.exists(path):
+            matrix = np.load(path, mmap_mode="r")
+            if matrix.shape == shape and matrix.dtype == np.uint8:
+                return matrix
+        if path is not None:
+            try:
+                return self._write_cache(path, shape)
+            except OSError as exc:
+                print(f"Not caching the feedback table: {exc}", file=sys.stderr)
+        matrix = np.empty(shape, dtype=np.uint8)
+        self._fill(matrix)
+        return matrix
+
+    def _write_cache(self, path, shape):
+        """
+        Build the table into a cache file and memory-map it.
+
+        The table is built in a temporary file and moved into place only once it is
+        complete, so an interrupted build never leaves a table that looks valid.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        matrix = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.uint8, shape=shape)
+        try:
+            self._fill(matrix)
+            matrix.flush()
+            # Drop the mapping before the rename, which Windows refuses on a mapped file.
+            del matrix
+            os.replace(temporary, path)
+        except BaseException:
+            matrix = None
+            with contextlib.suppress(OSError):
+                os.remove(temporary)
+            raise
+        return np.load(path, mmap_mode="r")
+
+    def _fill(self, matrix):
+        """Compute every feedback into a size x size matrix, a block of rows at a time."""
+        digits = np.array(self.codes, dtype=np.int8)
+        counts = np.zeros((self.size, self.symbols), dtype=np.int8)
+        for peg in range(self.pegs):
+            np.add.at(counts, (np.arange(self.size), digits[:, peg]), 1)
+        for start in range(0, self.size, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, self.size)
+            black = (digits[start:stop, None, :] == digits[None, :, :]).sum(axis=2)
+            total = np.minimum(counts[start:stop, None, :], counts[None, :, :]).sum(axis=2)
+            matrix[start:stop] = black * (self.pegs + 1) + (total - black)
+
+
+class MastermindSolver:
+    def __init__(self, table=None, strategy="minimax"):
+        """
+        Initialize a solver that picks guesses by Knuth's minimax or by maximum entropy.
+
+        The guess chosen after a given history of answers is always the same, so nodes of
+        the decision tree are memoized and a batch of solves shares all of the work.
+
+        Parameters:
+            table (FeedbackTable, optional): The table to use. Defaults to 4 pegs x 10 symbols.
+            strategy (str): "minimax" to minimise the worst case, "entropy" to maximise
+                the expected information of each guess.
+
+        Returns:
+            None
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, choose from {STRATEGIES}")
+        self.table = table or FeedbackTable()
+        self.strategy = strategy
+        if np is not None:
+            everything = np.arange(self.table.size)
+        else:
+            everything = list(range(self.table.size))
+        self._tree = {(): (None, everything)}
+
+    def candidates(self, history):
+        """
+        Return the code numbers still consistent with a history of answers.
+
+        Parameters:
+            history (tuple): Pairs of (guess, feedback) code numbers, oldest first.
+
+        Returns:
+            The candidate code numbers, as a NumPy array or a list.
+        """
+        return self._node(history)[1]
+
+    def next_guess(self, history):
+        """Return the code number to guess after the given history of answers."""
+        guess, candidates = self._node(history)
+        if guess is None:
+            guess = self._choose(candidates)
+            self._tree[history] = (guess, candidates)
+        return guess
+
+    def solve(self, secret):
+        """
+        Solve one secret code.
+
+        Parameters:
+            secret (list): The secret code as a list of symbols.
+
+        Returns:
+            list: The guesses made, as lists of symbols. The last one is the secret.
+        """
+        secret_index = self.table.index_of(secret)
+        history = ()
+        guesses = []
+        while True:
+            guess = self.next_guess(history)
+            guesses.append(self.table.code_at(guess))
+            feedback = self.table.feedback(guess, secret_index)
+            if feedback == self.table.win:
+                return guesses
+            history += ((guess, feedback),)
+
+    def solve_all(self):
+        """Solve every possible secret and return a Counter of guesses needed per secret."""
+        histogram = Counter()
+        for secret in self.table.codes:
+            histogram[len(self.solve(secret))] += 1
+        return histogram
+
+    def _node(self, history):
+        """Return the memoized (guess, candidates) for a history, filtering as needed."""
+        node = self._tree.get(history)
+        if node is None:
+            guess, feedback = history[-1]
+            parent = self._node(history[:-1])[1]
+            row = self.table.row(guess)
+            if np is not None:
+                candidates = parent[row[parent] == feedback]
+            else:
+                candidates = [code for code in parent if row[code] == feedback]
+            node = self._tree[history] = (None, candidates)
+        return node
+
+    def _first_guesses(self):
+        """
+        Return the codes worth trying as the opening guess.
+
+        Before any answer every code is still possible, so renaming symbols cannot change
+        how good a guess is. Only codes that use symbols in first-appearance order (0000,
+        0001, 0010, ..., 0123) need to be scored.
+
+        Returns:
+            list: The code numbers of the distinct opening guesses.
+        """
+        guesses = []
+        for index, code in enumerate(self.table.codes):
+            next_symbol = 0
+            for symbol in code:
+                if symbol > next_symbol:
+                    break
+                next_symbol = max(next_symbol, symbol + 1)
+            else:
+                guesses.append(index)
+        return guesses
+
+    def _choose(self, candidates):
+        """Pick the best guess for a set of candidates."""
+        if len(candidates) <= 2:
+            return int(candidates[0])
+        pool = None
+        if len(candidates) == self.table.size:
+            pool = self._first_guesses()
+        if np is not None:
+            return self._choose_vectorized(candidates, pool)
+        if pool is None:
+            if len(candidates) > FALLBACK_POOL:
+                return candidates[0]
+            pool = candidates
+        best = None
+        for guess in pool:
+            sizes = Counter(self.table.compute(guess, code) for code in candidates).values()
+            score = self._score(sizes, len(candidates))
+            if best is None or score < best[0]:
+                best = (score, guess)
+        return best[1]
+
+    def _score(self, sizes, total):
+        """Return a score to minimise for the partition sizes a guess produces."""
+        if self.strategy == "minimax":
+            return max(sizes)
+        return sum(size * math.log2(size) for size in sizes if size) / total
+
+    def _choose_vectorized(self, candidates, pool=None):
+        """Score every code in pool (default: all codes) against the candidates."""
+        table = self.table
+        outcomes = table.outcomes
+        pool = np.arange(table.size) if pool is None else np.asarray(pool)
+        block = max(1, (1 << 22) // len(candidates))
+        scores = np.empty(len(pool))
+        for start in range(0, len(pool), block):
+            stop = min(start + block, len(pool))
+            if len(pool) == table.size:
+                # Slicing keeps a view of the rows, so only the candidate columns are copied.
+                rows = table.matrix[start:stop]
+            else:
+                rows = table.matrix[pool[start:stop]]
+            feedback = rows[:, candidates].astype(np.int64)
+            feedback += np.arange(stop - start)[:, None] * outcomes
+            sizes = np.bincount(feedback.ravel(), minlength=(stop - start) * outcomes)
+            sizes = sizes.reshape(stop - start, outcomes)
+            if self.strategy == "minimax":
+                scores[start:stop] = sizes.max(axis=1)
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    logs = np.where(sizes > 0, np.log2(sizes), 0.0)
+                scores[start:stop] = (sizes * logs).sum(axis=1) / len(candidates)
+        # Among equally good guesses, prefer one that could be the secret itself.
+        best_guesses = pool[np.isclose(scores, scores.min())]
+        possible = best_guesses[np.isin(best_guesses, candidates)]
+        if len(possible):
+            return int(possible[0])
+        return int(best_guesses[0])
+
+
+def default_cache(pegs=CODE_LENGTH, symbols=SYMBOLS):
+    """Return the cache file for a pegs x symbols table, e.g. feedback-4x6.npy."""
+    directory = os.environ.get("GAMEHUB_FEEDBACK_CACHE") or DEFAULT_CACHE_DIR
+    return os.path.join(directory, f"feedback-{pegs}x{symbols}.npy")
+
+
+def main(argv=None):
+    """Parse the command line and solve one secret or every secret."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("secret", nargs="?", help="the secret to solve, e.g. 1234")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="minimax")
+    parser.add_argument("--cache", help="a .npy file to memory-map the table from")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    solver = MastermindSolver(FeedbackTable(path=args.cache), args.strategy)
+    print(f"Feedback table ready in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    if args.secret:
+        for guess in solver.solve(list(map(int, args.secret))):
+            print("".join(map(str, guess)))
+    else:
+        histogram = solver.solve_all()
+        solved = sum(histogram.values())
+        average = sum(guesses * count for guesses, count in histogram.items()) / solved
+        for guesses in sorted(histogram):
+            print(f"{guesses} guesses: {histogram[guesses]}")
+        print(f"Average {average:.4f}, worst {max(histogram)} guesses")
+    print(f"Solved in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
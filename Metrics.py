@@ -0,0 +1,407 @@
+"""Counters and latency histograms for the games' hot paths, off unless asked for.
+
+Instrumentation is switched on by setting GAMEHUB_METRICS to the file a game session
+exports to. It has to be set before the games are imported: timed() decides at import
+time whether to wrap a function, and when metrics are off it returns the function
+itself, so an uninstrumented run pays nothing at all.
+
+The export is JSON, or Prometheus text if the file name ends in ".prom", and is
+rewritten every EXPORT_SECONDS while a session runs (see session()). The hub's metrics
+panel reads the JSON exports of the games it launched to show live rates.
+
+GAMEHUB_PROFILE="cprofile:path" or "sample:path" also profiles a session, with
+cProfile or with a sampling profiler that writes collapsed stacks for flame graphs.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+
+ENABLED = bool(os.environ.get("GAMEHUB_METRICS"))
+EXPORT_SECONDS = 1.0
+SAMPLE_SECONDS = 0.005
+# Upper bounds of the latency buckets, in seconds: 1 µs to 1 s, in 1-2.5-5 steps.
+LATENCY_BUCKETS = tuple(
+    float(f"{step}e{exponent}") for exponent in range(-6, 0) for step in (1, 2.5, 5)
+) + (1.0,)
+
+
+class Counter:
+    __slots__ = ("name", "value")
+
+    def __init__(self, name):
+        """Initialize a counter at zero."""
+        self.name = name
+        self.value = 0
+
+    def inc(self, amount=1):
+        """Add to the counter."""
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ("name", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name, bounds=LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram.
+
+        Parameters:
+            name (str): The metric's name.
+            bounds (tuple): The ascending upper bounds of the buckets; larger values go
+                in one more bucket at the end.
+
+        Returns:
+            None
+        """
+        self.name = name
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Count one value."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextlib.contextmanager
+    def time(self):
+        """Observe how long the with block takes, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Registry:
+    def __init__(self):
+        """Initialize an empty set of metrics."""
+        self.counters = {}
+        self.histograms = {}
+
+    def counter(self, name):
+        """Return the counter with the given name, creating it if needed."""
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = Counter(name)
+        return counter
+
+    def histogram(self, name, bounds=LATENCY_BUCKETS):
+        """Return the histogram with the given name, creating it if needed."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(name, bounds)
+        return histogram
+
+    def snapshot(self):
+        """
+        Return every metric as plain data, the format of the JSON export.
+
+        Safe to call from the exporter thread while a game adds metrics: list() copies
+        each dict in one step under the GIL, so iteration never sees it change size.
+        """
+        counters = list(self.counters.items())
+        histograms = list(self.histograms.items())
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "counters": {name: counter.value for name, counter in counters},
+            "histograms": {
+                name: {
+                    "bounds": list(histogram.bounds),
+                    "counts": list(histogram.counts),
+                    "sum": histogram.sum,
+                    "count": histogram.count,
+                }
+                for name, histogram in histograms
+            },
+        }
+
+
+REGISTRY = Registry()
+
+
+def timed(name):
+    """
+    Decorate a function so the latency of every call goes into a histogram.
+
+    When metrics are off this returns the function unchanged.
+
+    Parameters:
+        name (str): The histogram's name, e.g. "tictactoe.process_move".
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorate(function):
+        if not ENABLED:
+            return function
+        histogram = REGISTRY.histogram(name)
+        observe = histogram.observe
+        clock = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(clock() - start)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name, amount=1):
+    """Add to a counter; a single flag check when metrics are off."""
+    if ENABLED:
+        REGISTRY.counter(name).inc(amount)
+
+
+def percentile(histogram, fraction):
+    """
+    Estimate a percentile from a histogram in snapshot form.
+
+    Parameters:
+        histogram (dict): A histogram from Registry.snapshot().
+        fraction (float): The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The upper bound of the bucket the percentile falls in, or 0.0 if the
+            histogram is empty. Values above the last bound report that bound.
+    """
+    target = fraction * histogram["count"]
+    seen = 0
+    for bound, bucket in zip(histogram["bounds"], histogram["counts"]):
+        seen += bucket
+        if seen >= target and seen:
+            return bound
+    return histogram["bounds"][-1] if histogram["count"] else 0.0
+
+
+def merge(snapshots):
+    """Return one snapshot adding up the counters and histograms of several."""
+    merged = {"counters": Tally(), "histograms": {}}
+    for snapshot in snapshots:
+        merged["counters"].update(snapshot["counters"])
+        for name, histogram in snapshot["histograms"].items():
+            total = merged["histograms"].get(name)
+            if total is None:
+                total = merged["histograms"][name] = {
+                    "bounds": histogram["bounds"],
+                    "counts": [0] * len(histogram["counts"]),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            total["counts"] = [a + b for a, b in zip(total["counts"], histogram["counts"])]
+            total["sum"] += histogram["sum"]
+            total["count"] += histogram["count"]
+    merged["counters"] = dict(merged["counters"])
+    return merged
+
+
+def _metric_name(name):
+    """Return a metric name made safe for Prometheus."""
+    return "gamehub_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def to_prometheus(snapshot):
+    """Return a snapshot in the Prometheus text exposition format."""
+    lines = []
+    for name, value in sorted(snapshot["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, histogram in sorted(snapshot["histograms"].items()):
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, bucket in zip(histogram["bounds"], histogram["counts"]):
+            cumulative += bucket
+            lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram["count"]}')
+        lines.append(f"{metric}_sum {histogram['sum']!r}")
+        lines.append(f"{metric}_count {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def export(path, registry=REGISTRY):
+    """
+    Write the registry to a file, replacing it in one step so readers never see half.
+
+    Parameters:
+        path (str): The file; Prometheus text if it ends in ".prom", JSON otherwise.
+        registry (Registry): The metrics to write.
+
+    Returns:
+        None
+    """
+    snapshot = registry.snapshot()
+    if path.endswith(".prom"):
+        text = to_prometheus(snapshot)
+    else:
+        text = json.dumps(snapshot)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+def read_export(path):
+    """Return the snapshot in a JSON export, or None if it cannot be read yet."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+class SamplingProfiler:
+    def __init__(self, interval=SAMPLE_SECONDS):
+        """
+        Initialize a profiler that samples the calling thread's stack from a helper thread.
+
+        Unlike cProfile it does not slow every call down, so it can stay on for a whole
+        session; the cost is one stack walk per interval.
+
+        Parameters:
+            interval (float): Seconds between samples.
+
+        Returns:
+            None
+        """
+        self.interval = interval
+        self.stacks = Tally()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start sampling the thread that created the profiler."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        """Count the sampled thread's stack every interval."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        """Write the samples as collapsed stacks, one "frame;frame count" line each."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, samples in self.stacks.most_common():
+                file.write(f"{stack} {samples}\n")
+
+
+@contextlib.contextmanager
+def profiled(spec):
+    """
+    Profile the with block.
+
+    Parameters:
+        spec (str): "cprofile:path" to write cProfile statistics (read them with
+            pstats), or "sample:path" to write collapsed stacks.
+
+    Returns:
+        None
+    """
+    kind, _, path = spec.partition(":")
+    if kind not in ("cprofile", "sample") or not path:
+        raise ValueError(f'Profile spec must be "cprofile:path" or "sample:path", not {spec!r}')
+    profiler = cProfile.Profile() if kind == "cprofile" else SamplingProfiler()
+    if kind == "cprofile":
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        yield
+    finally:
+        if kind == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            profiler.write(path)
+
+
+def _export_reporting(path, failure=None):
+    """
+    Export, reporting an error on stderr instead of raising it.
+
+    A failed export must not stop the exporter thread or the game, and an error that
+    repeats every interval is only reported once.
+
+    Parameters:
+        path (str): The file to export to.
+        failure (str, optional): The previous export's error, which is not reported again.
+
+    Returns:
+        str: This export's error, or None if it succeeded.
+    """
+    try:
+        export(path)
+    except Exception as exc:
+        if repr(exc) != failure:
+            print(f"Could not export metrics: {exc}", file=sys.stderr)
+        return repr(exc)
+    return None
+
+
+@contextlib.contextmanager
+def session(path=None, profile=None):
+    """
+    Export metrics, and optionally profile, while a game session runs.
+
+    Parameters:
+        path (str, optional): Where to export metrics. Defaults to $GAMEHUB_METRICS;
+            with neither, or with metrics off, nothing is exported.
+        profile (str, optional): A profile spec for profiled(). Defaults to
+            $GAMEHUB_PROFILE; with neither, nothing is profiled.
+
+    Returns:
+        None
+    """
+    path = path or os.environ.get("GAMEHUB_METRICS")
+    profile = profile or os.environ.get("GAMEHUB_PROFILE")
+    stop = threading.Event()
+    exporter = None
+    failure = None
+    if ENABLED and path:
+
+        def run():
+            nonlocal failure
+            while not stop.wait(EXPORT_SECONDS):
+                failure = _export_reporting(path, failure)
+
+        exporter = threading.Thread(target=run, daemon=True)
+        exporter.start()
+    try:
+        with profiled(profile) if profile else contextlib.nullcontext():
+            yield
+    finally:
+        if exporter is not None:
+            stop.set()
+            exporter.join()
+            _export_reporting(path, failure)
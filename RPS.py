@@ -1,53 +1,410 @@
+import argparse
 import random
+from collections import deque
+from typing import NamedTuple
 
+from GameEngine import GameEngine, StepResult
+from GameLog import recorded
+from Metrics import timed
+from RandomStreams import RandomStreams, stream
+from Terminal import get_screen
 
-def print_rules():
+TIE, FIRST_WINS, SECOND_WINS = 0, 1, 2
+RESULTS = ("It's a tie!", "Player wins!", "Computer wins!")
+
+
+class Rules(NamedTuple):
+    name: str
+    choices: tuple
+    # outcomes[first * len(choices) + second] is TIE, FIRST_WINS or SECOND_WINS.
+    outcomes: bytes
+
+
+def make_rules(name, beats):
+    """
+    Build the outcome table for a game variant.
+
+    Parameters:
+        name (str): The variant's name.
+        beats (dict): Maps each choice to the choices it beats. The order of the keys
+            gives the choices their integer codes.
+
+    Returns:
+        Rules: The variant with its outcome table.
+    """
+    choices = tuple(beats)
+    outcomes = bytearray(len(choices) ** 2)
+    for first, first_choice in enumerate(choices):
+        for second, second_choice in enumerate(choices):
+            if second_choice in beats[first_choice]:
+                outcomes[first * len(choices) + second] = FIRST_WINS
+            elif first_choice in beats[second_choice]:
+                outcomes[first * len(choices) + second] = SECOND_WINS
+    return Rules(name, choices, bytes(outcomes))
+
+
+CLASSIC = make_rules(
+    "classic",
+    {"rock": ("scissors",), "paper": ("rock",), "scissors": ("paper",)},
+)
+LIZARD_SPOCK = make_rules(
+    "lizard-spock",
+    {
+        "rock": ("scissors", "lizard"),
+        "paper": ("rock", "spock"),
+        "scissors": ("paper", "lizard"),
+        "lizard": ("spock", "paper"),
+        "spock": ("scissors", "rock"),
+    },
+)
+RULES = {rules.name: rules for rules in (CLASSIC, LIZARD_SPOCK)}
+CHOICES = list(CLASSIC.choices)
+
+
+def resolve(first, second, rules=CLASSIC):
+    """Return TIE, FIRST_WINS or SECOND_WINS for two integer-coded choices."""
+    return rules.outcomes[first * len(rules.choices) + second]
+
+
+class AdaptivePlayer:
+    def __init__(self, order=2, window=200, rng=None, rules=CLASSIC):
+        """
+        Initialize a computer player that learns the player's habits.
+
+        For every context of the player's last k moves (k = 0..order) it counts which
+        move came next, and plays whatever beats the most likely next move. Counts only
+        cover the last window rounds: the oldest round is subtracted when a new one is
+        added, so every update and prediction is O(order) and memory never grows.
+
+        Parameters:
+            order (int): The longest history of player moves used as context.
+            window (int): How many recent rounds the counts cover.
+            rng (random.Random, optional): The random number generator used to break
+                ties. Defaults to the session's "rps" stream.
+            rules (Rules): The game variant being played.
+
+        Returns:
+            None
+        """
+        self.order = order
+        self._rng = stream("rps") if rng is None else rng
+        self._choices = rules.choices
+        size = len(rules.choices)
+        self._size = size
+        # _counters[move] is a choice that beats move.
+        self._counters = [
+            next(c for c in range(size) if resolve(c, move, rules) == FIRST_WINS)
+            for move in range(size)
+        ]
+        # _counts[k][context * size + move] counts move after the k-move context.
+        self._counts = [[0] * (size ** (k + 1)) for k in range(order + 1)]
+        self._history = deque(maxlen=order)
+        self._recent = deque(maxlen=window)
+
+    def _contexts(self):
+        """Return the index of the current context for every order that has one."""
+        contexts = [0]
+        context = 0
+        for k, move in enumerate(reversed(self._history)):
+            context += move * self._size**k
+            contexts.append(context)
+        return contexts
+
+    def choose(self):
+        """Return the computer's choice for the next round."""
+        size = self._size
+        for k, context in reversed(list(enumerate(self._contexts()))):
+            row = self._counts[k][context * size : context * size + size]
+            best = max(row)
+            if best:
+                likely = [move for move in range(size) if row[move] == best]
+                return self._choices[self._counters[self._rng.choice(likely)]]
+        return self._rng.choice(self._choices)
+
+    def update(self, player_choice):
+        """Learn from the player's choice in the round just played."""
+        if player_choice not in self._choices:
+            return
+        move = self._choices.index(player_choice)
+        if len(self._recent) == self._recent.maxlen:
+            for k, slot in enumerate(self._recent[0]):
+                self._counts[k][slot] -= 1
+        slots = tuple(context * self._size + move for context in self._contexts())
+        for k, slot in enumerate(slots):
+            self._counts[k][slot] += 1
+        self._recent.append(slots)
+        self._history.append(move)
+
+
+class RandomPlayer:
+    def __init__(self, rules=CLASSIC, rng=None):
+        """Initialize a computer player that picks at random, like the original one."""
+        self._rules = rules
+        self._rng = stream("rps") if rng is None else rng
+
+    def choose(self):
+        """Return a random choice."""
+        return get_computer_choice(self._rules, self._rng)
+
+    def update(self, player_choice):
+        """Ignore the player's choice; this player does not learn."""
+
+
+OPPONENTS = {"random": RandomPlayer, "adaptive": AdaptivePlayer}
+
+
+def rules_lines(rules=CLASSIC):
+    """Returns the rules of the RPS game as a list of lines."""
+    *others, last = (f"'{choice}'" for choice in rules.choices)
+    return ["Welcome to Rock-Paper-Scissors!", f"Choose one: {', '.join(others)}, or {last}."]
+
+
+def print_rules(rules=CLASSIC):
     """Prints the rules of the RPS game."""
-    print("Welcome to Rock-Paper-Scissors!")
-    print("Choose one: 'rock', 'paper', or 'scissors'.")
+    get_screen().say(*rules_lines(rules))
 
 
-def get_player_choice():
+def get_player_choice(rules=CLASSIC):
     """Asks the player for their choice."""
-    choice = input("Enter your choice (rock/paper/scissors): ").lower()
+    choice = get_screen().ask(f"Enter your choice ({'/'.join(rules.choices)}): ").lower()
     return choice
 
 
-def get_computer_choice():
-    """Generates a random choice for the computer."""
-    choices = ["rock", "paper", "scissors"]
-    computer_choice = random.choice(choices)
+def get_computer_choice(rules=CLASSIC, rng=None):
+    """Generates a random choice for the computer, from the session's stream by default."""
+    rng = stream("rps") if rng is None else rng
+    computer_choice = rng.choice(rules.choices)
     return computer_choice
 
 
-def determine_winner(player_choice, computer_choice):
+@timed("rps.determine_winner")
+def determine_winner(player_choice, computer_choice, rules=CLASSIC):
     """Determines the winner based on the rules of RPS."""
-    if player_choice == computer_choice:
-        return "It's a tie!"
-    elif (
-        (player_choice == "rock" and computer_choice == "scissors")
-        or (player_choice == "paper" and computer_choice == "rock")
-        or (player_choice == "scissors" and computer_choice == "paper")
-    ):
-        return "Player wins!"
-    else:
-        return "Computer wins!"
-
-
-def play_game():
-    """Plays a single round of RPS."""
-    print_rules()
-    player_choice = get_player_choice()
-    computer_choice = get_computer_choice()
-    result = determine_winner(player_choice, computer_choice)
-    print(f"Computer chose {computer_choice}.")
-    print(result)
-
-
-def rps():
-    """Main function to run the game."""
+    if player_choice not in rules.choices:
+        # Anything that is not a valid choice loses, as it always has.
+        return RESULTS[SECOND_WINS]
+    player = rules.choices.index(player_choice)
+    computer = rules.choices.index(computer_choice)
+    return RESULTS[resolve(player, computer, rules)]
+
+
+class RPSRound(NamedTuple):
+    player: str
+    computer: str
+    outcome: int
+
+
+class RPSObservation(NamedTuple):
+    last_round: RPSRound
+    # The player's (wins, ties, losses) so far.
+    tally: tuple
+    rounds_left: object
+
+
+class RPSEngine(GameEngine):
+    def __init__(self, rules=CLASSIC, opponent="random", rounds=1, computer=None):
+        """
+        Initialize a headless match against a computer player.
+
+        Parameters:
+            rules (Rules): The game variant to play.
+            opponent (str): A key of OPPONENTS, used to create a fresh computer player
+                on every reset.
+            rounds (int, optional): The number of rounds in a match. None means the
+                match never ends on its own.
+            computer (optional): A computer player to keep across resets instead, so
+                an adaptive player goes on learning between games.
+
+        Returns:
+            None
+        """
+        self.rules = rules
+        self.opponent = opponent
+        self.rounds = rounds
+        self.computer = computer
+        self._keep_computer = computer is not None
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a new match, with a new computer player unless one was given."""
+        if not self._keep_computer:
+            rng = None if seed is None else random.Random(seed)
+            self.computer = OPPONENTS[self.opponent](rules=self.rules, rng=rng)
+        self.last_round = None
+        self.tally = [0, 0, 0]
+        return self.observation()
+
+    def legal_actions(self):
+        """Return the choices of the variant being played."""
+        return [] if self.is_terminal() else list(self.rules.choices)
+
+    def step(self, action):
+        """
+        Play one round.
+
+        Parameters:
+            action (str): The player's choice. Anything that is not a valid choice
+                loses the round, as it does in the console game.
+
+        Returns:
+            StepResult: The reward is 1 for a win, 0 for a tie and -1 for a loss.
+        """
+        if self.is_terminal():
+            raise ValueError("The match is over")
+        computer_choice = self.computer.choose()
+        self.computer.update(action)
+        if action in self.rules.choices:
+            player = self.rules.choices.index(action)
+            computer = self.rules.choices.index(computer_choice)
+            outcome = resolve(player, computer, self.rules)
+        else:
+            outcome = SECOND_WINS
+        self.last_round = RPSRound(action, computer_choice, outcome)
+        # tally is (wins, ties, losses); outcomes are TIE, FIRST_WINS, SECOND_WINS.
+        self.tally[(1, 0, 2)[outcome]] += 1
+        reward = (0.0, 1.0, -1.0)[outcome]
+        return StepResult(self.observation(), reward, self.is_terminal())
+
+    def observation(self):
+        """Return the last round and the running score."""
+        left = None if self.rounds is None else self.rounds - sum(self.tally)
+        return RPSObservation(self.last_round, tuple(self.tally), left)
+
+    def is_terminal(self):
+        """Return True once every round of the match has been played."""
+        return self.rounds is not None and sum(self.tally) >= self.rounds
+
+
+def play_game(computer=None, rules=CLASSIC):
+    """
+    Plays a single round of RPS.
+
+    Parameters:
+        computer (optional): A computer player such as AdaptivePlayer. Defaults to
+            picking at random with get_computer_choice.
+        rules (Rules): The game variant to play.
+
+    Returns:
+        None
+    """
+    game = recorded(RPSEngine(rules, computer=computer))
+    screen = get_screen()
+    # The rules are the frame, so they are written once rather than before every round.
+    screen.render(rules_lines(rules))
+    game.step(get_player_choice(rules))
+    screen.say(f"Computer chose {game.last_round.computer}.", RESULTS[game.last_round.outcome])
+
+
+def rps(opponent="random", variant="classic"):
+    """
+    Main function to run the game.
+
+    Parameters:
+        opponent (str): "random" for the original computer player, or "adaptive" for
+            one that learns from the player's previous choices.
+        variant (str): "classic", or "lizard-spock" for Rock-Paper-Scissors-Lizard-Spock.
+
+    Returns:
+        None
+    """
+    rules = RULES[variant]
+    computer = OPPONENTS[opponent](rules=rules)
     while True:
-        play_game()
-        repeat = input("Play again? (y/n): ")
+        play_game(computer, rules)
+        repeat = get_screen().ask("Play again? (y/n): ")
         if repeat.lower() != "y":
             break
+
+
+def _biased(rng):
+    """A player who favours rock."""
+    return lambda history: rng.choices(CHOICES, weights=(5, 3, 2))[0]
+
+
+def _cycler(rng):
+    """A player who plays rock, paper, scissors in order with the odd slip."""
+    state = {"next": 0}
+
+    def choose(history):
+        state["next"] = (state["next"] + (1 if rng.random() < 0.9 else 2)) % 3
+        return CHOICES[state["next"]]
+
+    return choose
+
+
+def _repeat_winner(rng):
+    """A player who repeats a winning choice and otherwise copies the computer's."""
+
+    def choose(history):
+        if not history:
+            return rng.choice(CHOICES)
+        player_choice, computer_choice = history[-1]
+        if determine_winner(player_choice, computer_choice) == "Player wins!":
+            return player_choice
+        return computer_choice
+
+    return choose
+
+
+PLAYER_STRATEGIES = {
+    "uniform": lambda rng: lambda history: rng.choice(CHOICES),
+    "biased": _biased,
+    "cycler": _cycler,
+    "repeat-winner": _repeat_winner,
+}
+
+
+def benchmark_strategies(rounds=100_000, seed=0):
+    """
+    Plays every computer player against every simulated player strategy.
+
+    Parameters:
+        rounds (int): The number of rounds per pairing.
+        seed (int): Seed for all random choices, so runs are repeatable.
+
+    Returns:
+        dict: Maps (opponent, strategy) to the computer's (wins, ties, losses).
+    """
+    results = {}
+    for opponent_name, opponent in OPPONENTS.items():
+        # Fresh streams per opponent, so every opponent faces the same player moves.
+        streams = RandomStreams(seed)
+        for strategy_name, strategy in PLAYER_STRATEGIES.items():
+            # The two sides draw from separate streams, so neither can predict the other.
+            computer = opponent(rng=streams.stream(opponent_name, strategy_name))
+            player = strategy(streams.stream(strategy_name))
+            history = deque(maxlen=1)
+            tally = {"Computer wins!": 0, "It's a tie!": 0, "Player wins!": 0}
+            for _ in range(rounds):
+                player_choice = player(history)
+                computer_choice = computer.choose()
+                computer.update(player_choice)
+                tally[determine_winner(player_choice, computer_choice)] += 1
+                history.append((player_choice, computer_choice))
+            results[opponent_name, strategy_name] = (
+                tally["Computer wins!"],
+                tally["It's a tie!"],
+                tally["Player wins!"],
+            )
+    return results
+
+
+def main(argv=None):
+    """Play the game, or benchmark the computer players with --benchmark."""
+    parser = argparse.ArgumentParser(description="Rock-Paper-Scissors.")
+    parser.add_argument("--opponent", choices=sorted(OPPONENTS), default="random")
+    parser.add_argument("--variant", choices=sorted(RULES), default="classic")
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--rounds", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    if not args.benchmark:
+        rps(args.opponent, args.variant)
+        return
+    print(f"{'computer':<10}{'player':<15}{'win %':>8}{'tie %':>8}{'loss %':>8}")
+    for (opponent, strategy), outcome in benchmark_strategies(args.rounds).items():
+        wins, ties, losses = (100 * count / args.rounds for count in outcome)
+        print(f"{opponent:<10}{strategy:<15}{wins:>8.1f}{ties:>8.1f}{losses:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
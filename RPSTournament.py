@@ -0,0 +1,158 @@
+"""A vectorized Rock-Paper-Scissors tournament between fixed strategies.
+
+Each strategy produces a whole block of moves as one integer array, and every round
+of a block is resolved at once by indexing the rules' outcome table with
+first * len(choices) + second. Needs NumPy.
+"""
+
+import argparse
+import math
+import time
+from itertools import combinations
+
+import numpy as np
+
+from RPS import FIRST_WINS, RULES, SECOND_WINS, TIE
+
+# Rounds resolved per block, to bound the size of the temporary arrays.
+BLOCK_ROUNDS = 1 << 20
+# z-score for a 95% confidence interval.
+Z_95 = 1.959963984540054
+
+
+def uniform(rng, size, count):
+    """Every choice equally often."""
+    return rng.integers(0, size, count, dtype=np.int8)
+
+
+def biased(rng, size, count):
+    """The first choice (rock) half the time, the others evenly."""
+    weights = np.full(size, 0.5 / (size - 1))
+    weights[0] = 0.5
+    return rng.choice(size, count, p=weights).astype(np.int8)
+
+
+def cycle(rng, size, count):
+    """Every choice in turn, starting from a random one."""
+    return ((np.arange(count) + rng.integers(size)) % size).astype(np.int8)
+
+
+def constant(rng, size, count):
+    """Always the first choice (rock)."""
+    return np.zeros(count, dtype=np.int8)
+
+
+def paper(rng, size, count):
+    """Always the second choice (paper), which beats the constant strategy."""
+    return np.ones(count, dtype=np.int8)
+
+
+STRATEGIES = {
+    "uniform": uniform,
+    "biased": biased,
+    "cycle": cycle,
+    "constant": constant,
+    "paper": paper,
+}
+
+
+def resolve_rounds(first, second, rules):
+    """
+    Resolve many rounds at once.
+
+    Parameters:
+        first: An integer array of the first strategy's choices.
+        second: An integer array of the second strategy's choices, the same length.
+        rules (Rules): The game variant.
+
+    Returns:
+        numpy.ndarray: TIE, FIRST_WINS or SECOND_WINS per round.
+    """
+    table = np.frombuffer(rules.outcomes, dtype=np.uint8)
+    return table[first.astype(np.intp) * len(rules.choices) + second]
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Return the Wilson score interval (low, high) for a proportion."""
+    if not trials:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials))
+    return centre - margin / denominator, centre + margin / denominator
+
+
+def play_match(first, second, rounds, rules, rng):
+    """
+    Play two strategies against each other.
+
+    Parameters:
+        first (str): The first strategy's name.
+        second (str): The second strategy's name.
+        rounds (int): The number of rounds to play.
+        rules (Rules): The game variant.
+        rng (numpy.random.Generator): The source of randomness.
+
+    Returns:
+        tuple: The first strategy's (wins, ties, losses).
+    """
+    size = len(rules.choices)
+    totals = np.zeros(3, dtype=np.int64)
+    for start in range(0, rounds, BLOCK_ROUNDS):
+        count = min(BLOCK_ROUNDS, rounds - start)
+        outcomes = resolve_rounds(
+            STRATEGIES[first](rng, size, count),
+            STRATEGIES[second](rng, size, count),
+            rules,
+        )
+        totals += np.bincount(outcomes, minlength=3)
+    return int(totals[FIRST_WINS]), int(totals[TIE]), int(totals[SECOND_WINS])
+
+
+def run_tournament(strategies, rounds, rules, seed=0):
+    """
+    Play a round robin between strategies.
+
+    Parameters:
+        strategies (list): The names of the strategies to enter.
+        rounds (int): The number of rounds per pairing.
+        rules (Rules): The game variant.
+        seed (int): Seed for the random generator, so runs are repeatable.
+
+    Returns:
+        dict: Maps (first, second) to the first strategy's (wins, ties, losses).
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        (first, second): play_match(first, second, rounds, rules, rng)
+        for first, second in combinations(strategies, 2)
+    }
+
+
+def main(argv=None):
+    """Run a tournament and print win rates with 95% confidence intervals."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", choices=sorted(RULES), default="classic")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES)
+    )
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    results = run_tournament(args.strategies, args.rounds, RULES[args.rules], args.seed)
+    elapsed = time.perf_counter() - start
+    for (first, second), (wins, ties, losses) in results.items():
+        low, high = wilson_interval(wins, args.rounds)
+        print(
+            f"{first:>9} vs {second:<9} win {wins / args.rounds:6.2%} "
+            f"[{low:6.2%}, {high:6.2%}]  tie {ties / args.rounds:6.2%}  "
+            f"loss {losses / args.rounds:6.2%}"
+        )
+    total = args.rounds * len(results)
+    print(f"{total} rounds in {elapsed:.2f}s ({total / elapsed:,.0f} rounds/s)")
+
+
+if __name__ == "__main__":
+    main()
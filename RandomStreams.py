@@ -0,0 +1,142 @@
+"""Seedable random streams shared by the games.
+
+Every game draws from its own stream instead of the global random module, so games
+running side by side do not disturb each other's sequences. A stream is named by a key
+and derived from one base seed: stream "hangman" of seed 7 is random.Random("7:hangman"),
+the same "seed:key" convention the self-play and benchmark runs already used, so their
+results are unchanged.
+
+Set GAMEHUB_SEED to make a session reproducible. Without it each process picks a fresh
+base seed, so games are as random as before. A forked process gets the streams of
+child("fork", n) of its parent's for its nth fork, so forked workers never repeat each
+other yet stay repeatable; batch workers should still prefer child() or stream(index)
+with keys of their own, which do not depend on the order processes were started in.
+"""
+
+import os
+import random
+
+_shared = None
+_forks = 0
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        """
+        Initialize a set of random streams derived from one base seed.
+
+        Parameters:
+            seed (optional): The base seed, an int or a string. None picks one from the
+                operating system's entropy; it is kept in the seed attribute so the run
+                can be repeated.
+
+        Returns:
+            None
+        """
+        self.seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+        self._streams = {}
+
+    def key(self, *key):
+        """Return the seed string of the stream with the given key, e.g. "7:hangman"."""
+        return ":".join(map(str, (self.seed, *key)))
+
+    def stream(self, *key):
+        """
+        Return the stream with the given key, creating it on first use.
+
+        Asking for the same key again returns the same random.Random, which carries on
+        where it left off.
+
+        Parameters:
+            *key: Parts of the stream's name, e.g. ("hangman",) or ("worker", 3).
+
+        Returns:
+            random.Random: The stream.
+        """
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = random.Random(self.key(*key))
+        return stream
+
+    def child(self, *key):
+        """Return an independent set of streams, e.g. for a worker process."""
+        return RandomStreams(self.key(*key))
+
+    def generator(self, *key):
+        """
+        Return a new NumPy generator for the given key.
+
+        Parameters:
+            *key: Parts of the generator's name.
+
+        Returns:
+            numpy.random.Generator: A generator seeded from the key through a
+                SeedSequence, independent of every other key.
+        """
+        np = _numpy()
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        entropy = int.from_bytes(self.key(*key).encode("utf-8"), "big")
+        return np.random.default_rng(np.random.SeedSequence(entropy))
+
+    def integers(self, high, count, *key):
+        """
+        Draw many integers at once, e.g. to pre-generate the secrets of a batch of games.
+
+        With NumPy the draw is a single array operation. Batches are repeatable for a
+        given seed, but differ depending on whether NumPy is installed.
+
+        Parameters:
+            high (int): Draw from range(high).
+            count (int): How many integers to draw.
+            *key: Parts of the name of the stream to draw from.
+
+        Returns:
+            A NumPy array, or a list without NumPy, of count integers.
+        """
+        if _numpy() is not None:
+            return self.generator(*key).integers(0, high, count)
+        randrange = self.stream(*key).randrange
+        return [randrange(high) for _ in range(count)]
+
+    def __reduce__(self):
+        """Pickle as the base seed alone; streams are recreated on first use."""
+        return RandomStreams, (self.seed,)
+
+
+def _numpy():
+    """Import NumPy on first use, so importing this module stays cheap; None without it."""
+    try:
+        import numpy
+    except ImportError:  # integers() falls back to random.Random.
+        return None
+    return numpy
+
+
+def shared():
+    """Return the process's streams, seeded from GAMEHUB_SEED if it is set."""
+    global _shared
+    if _shared is None:
+        _shared = RandomStreams(os.environ.get("GAMEHUB_SEED") or None)
+    return _shared
+
+
+def stream(*key):
+    """Return the process's stream with the given key, e.g. stream("hangman")."""
+    return shared().stream(*key)
+
+
+def _count_fork():
+    """Number the process's forks, so each child can be given different streams."""
+    global _forks
+    _forks += 1
+
+
+def _reseed_child():
+    """Give a forked child its own streams, derived from its parent's seed and fork number."""
+    global _shared
+    _shared = shared().child("fork", _forks)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_count_fork, after_in_child=_reseed_child)
@@ -0,0 +1,281 @@
+"""Headless batch self-play for tic-tac-toe agents, spread over worker processes."""
+
+import argparse
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple
+
+from RandomStreams import RandomStreams
+from TicTacToe import (
+    BOARD_SIZE,
+    DEFAULT_PLAYERS,
+    BitboardTicTacToeGame,
+    Move,
+    TicTacToeGame,
+)
+from TicTacToeAI import TicTacToeAI
+
+CHUNK_SIZE = 10_000
+
+
+def classic_game(board_size, win_length):
+    """Return a classic engine, which ignores win_length: a full row always wins."""
+    return TicTacToeGame(board_size=board_size)
+
+
+# Engine factories, called as factory(board_size=..., win_length=...).
+ENGINES = {"classic": classic_game, "bitboard": BitboardTicTacToeGame}
+
+
+class RandomAgent:
+    def __init__(self, board_size, win_length, rng):
+        """Initialize an agent that plays uniformly random legal moves."""
+        self._rng = rng
+
+    def select_move(self, game):
+        """Return the (row, col) of a random legal move."""
+        return self._rng.choice(game.legal_moves())
+
+
+class HeuristicAgent:
+    def __init__(self, board_size, win_length, rng):
+        """Initialize an agent that wins, blocks, takes the centre, or plays randomly."""
+        self._rng = rng
+        self._centre = (board_size // 2, board_size // 2)
+
+    def select_move(self, game):
+        """Return the (row, col) of the first move that matches the heuristic."""
+        moves = game.legal_moves()
+        label = game.current_player.label
+        for row, col in moves:
+            if game.is_winning_move(Move(row, col, label)):
+                return row, col
+        for player in DEFAULT_PLAYERS:
+            if player.label != label:
+                for row, col in moves:
+                    if game.is_winning_move(Move(row, col, player.label)):
+                        return row, col
+        if self._centre in moves:
+            return self._centre
+        return self._rng.choice(moves)
+
+
+class SearchAgent:
+    def __init__(self, board_size, win_length, rng, max_depth=None, time_limit=None):
+        """Initialize an agent backed by the negamax TicTacToeAI."""
+        self._ai = TicTacToeAI(
+            board_size,
+            win_length,
+            max_depth=max_depth,
+            time_limit=time_limit,
+            seed=rng.getrandbits(32),
+        )
+
+    def select_move(self, game):
+        """Return the (row, col) chosen by the search."""
+        return self._ai.choose_move(game)
+
+
+AGENTS = {"random": RandomAgent, "heuristic": HeuristicAgent, "search": SearchAgent}
+
+
+class SelfPlayConfig(NamedTuple):
+    agents: tuple = ("random", "random")
+    games: int = 1000
+    board_size: int = BOARD_SIZE
+    win_length: int = None
+    engine: str = "bitboard"
+    seed: int = 0
+    chunk_size: int = CHUNK_SIZE
+    swap_sides: bool = True
+    cross_check: bool = False
+
+
+class SelfPlayResult(NamedTuple):
+    wins: Counter
+    lengths: Counter
+
+    def merge(self, other):
+        """Add the counts of another result to this one."""
+        self.wins.update(other.wins)
+        self.lengths.update(other.lengths)
+        return self
+
+
+def play_game(game, seats, check_game=None):
+    """
+    Play one game to the end.
+
+    Parameters:
+        game: The engine to play on. It is reset before the game starts.
+        seats (dict): Maps each player label to the agent that plays it.
+        check_game: A second engine fed the same moves, used to cross-check the rules.
+
+    Returns:
+        tuple: The label of the winner (or None for a draw) and the number of moves.
+    """
+    first = DEFAULT_PLAYERS[0].label
+    engines = (game,) if check_game is None else (game, check_game)
+    for engine in engines:
+        engine.reset_game()
+        while engine.current_player.label != first:
+            engine.toggle_player()
+    moves = 0
+    while True:
+        label = game.current_player.label
+        row, col = seats[label].select_move(game)
+        move = Move(row, col, label)
+        if not game.is_valid_move(move):
+            raise RuntimeError(f"Agent for {label} played an invalid move {move}")
+        game.process_move(move)
+        moves += 1
+        if check_game is not None:
+            check_game.process_move(move)
+            if (game.has_winner(), game.is_tied()) != (
+                check_game.has_winner(),
+                check_game.is_tied(),
+            ):
+                raise AssertionError(f"Engines disagree after move {moves}: {move}")
+        if game.has_winner():
+            return label, moves
+        if game.is_tied():
+            return None, moves
+        for engine in engines:
+            engine.toggle_player()
+
+
+def run_chunk(config, chunk_index):
+    """
+    Play one chunk of games in a worker and return only the aggregated counts.
+
+    The chunk's random stream is seeded from the base seed and the chunk index, so the
+    totals are the same whatever the number of workers or the order chunks finish in.
+
+    Parameters:
+        config (SelfPlayConfig): The run configuration.
+        chunk_index (int): The index of the chunk to play.
+
+    Returns:
+        SelfPlayResult: Win/draw counts keyed by agent slot and a game-length histogram.
+    """
+    rng = RandomStreams(config.seed).stream(chunk_index)
+    win_length = config.win_length or config.board_size
+    agents = [
+        AGENTS[name](config.board_size, win_length, rng) for name in config.agents
+    ]
+    game = ENGINES[config.engine](board_size=config.board_size, win_length=win_length)
+    check_game = None
+    if config.cross_check:
+        check_game = TicTacToeGame(board_size=config.board_size)
+    labels = [player.label for player in DEFAULT_PLAYERS]
+    slot_names = [f"{name}#{slot}" for slot, name in enumerate(config.agents)]
+    result = SelfPlayResult(Counter(), Counter())
+    first_game = chunk_index * config.chunk_size
+    last_game = min(first_game + config.chunk_size, config.games)
+    for game_index in range(first_game, last_game):
+        order = (1, 0) if config.swap_sides and game_index % 2 else (0, 1)
+        seats = {labels[0]: agents[order[0]], labels[1]: agents[order[1]]}
+        winner, moves = play_game(game, seats, check_game)
+        if winner is None:
+            result.wins["draw"] += 1
+        else:
+            result.wins[slot_names[order[labels.index(winner)]]] += 1
+        result.lengths[moves] += 1
+    return result
+
+
+def run_self_play(config, workers=None):
+    """
+    Play config.games games across a process pool and merge the results.
+
+    Only a bounded number of chunks is in flight at once and each chunk returns counts
+    rather than games, so the main process never holds per-game state.
+
+    Parameters:
+        config (SelfPlayConfig): The run configuration.
+        workers (int, optional): The number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        SelfPlayResult: The merged results of every chunk.
+    """
+    if config.win_length is not None and config.win_length != config.board_size:
+        if config.engine == "classic" or config.cross_check:
+            raise ValueError("The classic engine only supports win_length == board_size")
+    if config.engine not in ENGINES:
+        raise ValueError(f"Unknown engine {config.engine!r}, choose from {sorted(ENGINES)}")
+    for name in config.agents:
+        if name not in AGENTS:
+            raise ValueError(f"Unknown agent {name!r}, choose from {sorted(AGENTS)}")
+    workers = workers or os.cpu_count() or 1
+    chunks = range(-(-config.games // config.chunk_size))
+    total = SelfPlayResult(Counter(), Counter())
+    if workers == 1:
+        for chunk_index in chunks:
+            total.merge(run_chunk(config, chunk_index))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        chunk_iter = iter(chunks)
+        for chunk_index in chunk_iter:
+            pending.add(executor.submit(run_chunk, config, chunk_index))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+        for future in pending:
+            total.merge(future.result())
+    return total
+
+
+def format_result(config, result):
+    """Return a printable summary of a self-play run."""
+    first, second = (f"{name}#{slot}" for slot, name in enumerate(config.agents))
+    games = sum(result.wins.values())
+    lines = [
+        f"{games} games of {first} vs {second} on "
+        f"{config.board_size}x{config.board_size} ({config.engine} engine)",
+        f"  {first} wins: {result.wins[first]}",
+        f"  {second} wins: {result.wins[second]}",
+        f"  draws: {result.wins['draw']}",
+        "  game lengths:",
+    ]
+    for length in sorted(result.lengths):
+        lines.append(f"    {length:>4} moves: {result.lengths[length]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Parse the command line and run a batch of self-play games."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("agents", nargs=2, choices=sorted(AGENTS))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--board-size", type=int, default=BOARD_SIZE)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="bitboard")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-swap", action="store_true", help="never swap who starts")
+    parser.add_argument(
+        "--cross-check",
+        action="store_true",
+        help="replay every move on the classic engine and fail on any disagreement",
+    )
+    args = parser.parse_args(argv)
+    config = SelfPlayConfig(
+        agents=tuple(args.agents),
+        games=args.games,
+        board_size=args.board_size,
+        win_length=args.win_length,
+        engine=args.engine,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        swap_sides=not args.no_swap,
+        cross_check=args.cross_check,
+    )
+    print(format_result(config, run_self_play(config, args.workers)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Buffered terminal output for the console games.
+
+A game draws its board as a frame, a list of lines, and writes messages and prompts
+below it. Everything is collected in one buffer and written with a single write when
+the game next waits for input, or when it is flushed.
+
+On an ANSI terminal a new frame is drawn over the previous one: the cursor goes back
+to the frame's first line, only the lines that changed are rewritten, and whatever
+was written below the old frame is cleared. Elsewhere (pipes, logs, "dumb" terminals)
+frames are written out in full, except that a frame which only adds lines to the
+previous one writes just the new lines.
+
+Answers come from an input source: the keyboard by default, or a script of answers
+(a move file, a list or generator, or a stdin pipe), chosen with GAMEHUB_INPUT or
+scripted(). A scripted screen reads the next answer without writing the prompt, so
+many scripted sessions can run one after another in a single process.
+"""
+
+import atexit
+import contextlib
+import os
+import shutil
+import sys
+
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+
+_screens = {}
+# The screen installed by scripted(), used instead of the shared ones while it lasts.
+_active = None
+
+
+def supports_ansi(stream):
+    """Return True if stream is a terminal that understands ANSI cursor movement."""
+    try:
+        if not stream.isatty():
+            return False
+    except (AttributeError, ValueError):
+        return False
+    if os.environ.get("TERM") == "dumb":
+        return False
+    # The Windows console only understands ANSI when a modern terminal hosts it.
+    return os.name != "nt" or "WT_SESSION" in os.environ or "ANSICON" in os.environ
+
+
+class ConsoleInput:
+    interactive = True
+
+    def readline(self):
+        """Read a line typed at the keyboard, without its newline."""
+        return input()
+
+
+class ScriptedInput:
+    interactive = False
+
+    def __init__(self, lines):
+        """
+        Initialize an input source that answers from a script.
+
+        Parameters:
+            lines: An iterable of answers, e.g. a list, a generator or an open file.
+                Trailing newlines are removed.
+
+        Returns:
+            None
+        """
+        self._lines = iter(lines)
+        self.consumed = 0
+
+    def readline(self):
+        """Return the next answer, raising EOFError when the script runs out like input() does."""
+        try:
+            line = next(self._lines)
+        except StopIteration:
+            raise EOFError("the script has no more answers") from None
+        self.consumed += 1
+        return line.rstrip("\r\n")
+
+
+def open_input(spec=None):
+    """
+    Return the input source a spec names.
+
+    Parameters:
+        spec (optional): None or "" for the keyboard, "-" for the lines piped into
+            stdin, a path for a move file with one answer per line, or an iterable of
+            answers.
+
+    Returns:
+        ConsoleInput or ScriptedInput: The input source.
+    """
+    if spec is None or spec == "":
+        return ConsoleInput()
+    if spec == "-":
+        return ScriptedInput(sys.stdin)
+    if isinstance(spec, str):
+        with open(spec, encoding="utf-8") as file:
+            return ScriptedInput(file.read().splitlines())
+    return ScriptedInput(spec)
+
+
+class Screen:
+    def __init__(self, stream=None, ansi=None, source=None):
+        """
+        Initialize a screen that writes to a stream.
+
+        Parameters:
+            stream: A text stream. Defaults to sys.stdout.
+            ansi (bool, optional): Whether to redraw in place with ANSI escapes.
+                Defaults to supports_ansi(stream).
+            source (optional): Where answers come from, e.g. a ScriptedInput.
+                Defaults to the keyboard.
+
+        Returns:
+            None
+        """
+        self.stream = sys.stdout if stream is None else stream
+        self.ansi = supports_ansi(self.stream) if ansi is None else ansi
+        self.source = ConsoleInput() if source is None else source
+        self._buffer = []
+        self._frame = None
+        # Terminal rows written since the top of the current frame, and the terminal's
+        # size when the frame was drawn; only tracked on ANSI terminals.
+        self._rows = 0
+        self._size = shutil.get_terminal_size() if self.ansi else None
+
+    def _count_rows(self, text):
+        """Return how many terminal rows a line of text takes up, counting wrapping."""
+        return max(1, -(-len(text) // self._size.columns)) if self.ansi else 1
+
+    def render(self, lines):
+        """
+        Draw a frame, replacing the previous one.
+
+        Parameters:
+            lines (list): The frame's lines, without newlines.
+
+        Returns:
+            None
+        """
+        lines = list(lines)
+        previous = self._frame
+        self._frame = lines
+        if previous == lines:
+            return
+        buffer = self._buffer
+        if self.ansi:
+            self._size = shutil.get_terminal_size()
+        if self.ansi and previous is not None and 0 < self._rows < self._size.lines:
+            buffer.append(f"\x1b[{self._rows}A\r")
+            skipped = 0
+            for index, line in enumerate(lines):
+                if index < len(previous) and previous[index] == line:
+                    skipped += self._count_rows(line)
+                    continue
+                if skipped:
+                    buffer.append(f"\x1b[{skipped}B")
+                    skipped = 0
+                buffer.append(f"{CLEAR_LINE}{line}\n")
+            if skipped:
+                buffer.append(f"\x1b[{skipped}B")
+            buffer.append(CLEAR_BELOW)
+        elif previous is not None and lines[: len(previous)] == previous:
+            buffer.extend(line + "\n" for line in lines[len(previous) :])
+        else:
+            buffer.extend(line + "\n" for line in lines)
+        self._rows = sum(self._count_rows(line) for line in lines)
+
+    def say(self, *lines):
+        """Write lines below the frame."""
+        for line in lines:
+            self._buffer.append(line + "\n")
+            self._rows += self._count_rows(line)
+
+    def ask(self, prompt=""):
+        """
+        Write everything buffered and the prompt in one go, then read a line of input.
+
+        A scripted source is not prompted: the buffer is written without the prompt and
+        the next answer is read straight away.
+
+        Parameters:
+            prompt (str): The prompt, written without a newline.
+
+        Returns:
+            str: The line typed, without its newline.
+        """
+        if not self.source.interactive:
+            self.flush()
+            return self.source.readline()
+        self._buffer.append(prompt)
+        self.flush()
+        answer = self.source.readline()
+        self._rows += self._count_rows(prompt + answer)
+        return answer
+
+    def flush(self):
+        """Write everything buffered with a single write."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer = []
+        self.stream.flush()
+
+
+class NullScreen(Screen):
+    """A screen that shows nothing, for scripted sessions whose output nobody reads."""
+
+    def __init__(self, source=None):
+        """Initialize a screen that discards its output and answers from source."""
+        super().__init__(sys.stdout, ansi=False, source=source)
+
+    def render(self, lines):
+        """Discard a frame."""
+
+    def say(self, *lines):
+        """Discard messages."""
+
+    def flush(self):
+        """Do nothing; nothing is buffered."""
+
+
+def get_screen(stream=None):
+    """
+    Return the screen shared by everything writing to a stream.
+
+    Parameters:
+        stream: A text stream. Defaults to the current sys.stdout, or to the screen
+            installed by scripted() while one is.
+
+    Returns:
+        Screen: The stream's screen. Anything still buffered is written at exit. The
+            first screen for a stream reads answers from the source GAMEHUB_INPUT
+            names (see open_input()), the keyboard if it is not set.
+    """
+    if stream is None and _active is not None:
+        return _active
+    stream = sys.stdout if stream is None else stream
+    screen = _screens.get(stream)
+    if screen is None:
+        source = open_input(os.environ.get("GAMEHUB_INPUT"))
+        screen = _screens[stream] = Screen(stream, source=source)
+    return screen
+
+
+@contextlib.contextmanager
+def scripted(answers, stream=None, log=""):
+    """
+    Answer the console games from a script while the with block runs.
+
+    The games' validation is unchanged: a rejected answer just moves on to the next
+    one in the script.
+
+    Parameters:
+        answers: A ScriptedInput, or anything open_input() accepts for one.
+        stream (optional): Where to write the games' output. By default it is
+            discarded.
+        log (str, optional): The game log to record the games in, as GAMEHUB_LOG. By
+            default nothing is recorded, so scripted games stay out of the players'
+            statistics; None records them wherever unscripted games go.
+
+    Returns:
+        ScriptedInput: The source, whose consumed attribute counts the answers read.
+    """
+    global _active
+    source = answers if isinstance(answers, ScriptedInput) else open_input(answers)
+    if source.interactive:
+        raise ValueError("scripted() needs a script of answers, not the keyboard")
+    screen = NullScreen(source) if stream is None else Screen(stream, ansi=False, source=source)
+    previous, _active = _active, screen
+    previous_log = os.environ.get("GAMEHUB_LOG")
+    if log is not None:
+        os.environ["GAMEHUB_LOG"] = log
+    try:
+        yield source
+    finally:
+        _active = previous
+        if previous_log is None:
+            os.environ.pop("GAMEHUB_LOG", None)
+        else:
+            os.environ["GAMEHUB_LOG"] = previous_log
+        screen.flush()
+
+
+def run_script(play, answers, *args, stream=None, log="", **kwargs):
+    """
+    Play one console game session from a script.
+
+    Parameters:
+        play (callable): The game's entry point, e.g. Hangman.Hangman_game.
+        answers: The answers, as for scripted().
+        *args, **kwargs: Passed on to play.
+        stream (optional): Where to write the game's output; discarded by default.
+        log (str, optional): Where to record the game, as for scripted(); by default
+            it is not recorded.
+
+    Returns:
+        int: How many answers the session read. Running out of answers or typing the
+            game's exit command ends the session rather than raising.
+    """
+    with scripted(answers, stream, log) as source:
+        try:
+            play(*args, **kwargs)
+        except (EOFError, SystemExit):
+            pass
+    return source.consumed
+
+
+@atexit.register
+def _flush_screens():
+    """Write out whatever the shared screens still hold when the program ends."""
+    for screen in _screens.values():
+        try:
+            screen.flush()
+        except (OSError, ValueError):
+            pass
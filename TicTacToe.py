@@ -1,10 +1,22 @@
 """A tic-tac-toe game built with Python and Tkinter."""
 
+import functools
+import queue
+import sys
+import threading
 import tkinter as tk
+from array import array
 from itertools import cycle
 from tkinter import font
 from typing import NamedTuple
 
+from GameEngine import GameEngine, StepResult
+from GameLog import recorded
+from Metrics import timed
+from RandomStreams import stream
+from TicTacToeAI import TicTacToeAI
+from TicTacToeSolver import describe_value, load_solution
+
 
 class Player(NamedTuple):
     label: str
@@ -18,17 +30,155 @@ class Move(NamedTuple):
 
 
 BOARD_SIZE = 3
+AI_TIME_LIMIT = 1.0
+AI_POLL_MS = 50
+# Boards at least this big are drawn on one canvas instead of a grid of buttons.
+CANVAS_MIN_SIZE = 10
+# The canvas is at most this many pixels across; cells shrink to fit, down to MIN_CELL_PIXELS.
+CANVAS_PIXELS = 800
+MIN_CELL_PIXELS = 12
 DEFAULT_PLAYERS = (
     Player(label="X", color="blue"),
     Player(label="O", color="green"),
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _line_tables(board_size):
+    """
+    Return the winning lines of a board size, shared by every game of that size.
+
+    Line indices run over the rows first, then the columns, then the main diagonal and
+    finally the anti-diagonal.
+
+    Parameters:
+        board_size (int): The size of the game board.
+
+    Returns:
+        tuple: (lines, lines_through), where lines[line] is the list of (row, col) cells on
+            that line and lines_through[cell] is an array of the lines through a flat cell.
+    """
+    size = board_size
+    rows = [[(row, col) for col in range(size)] for row in range(size)]
+    columns = [[(row, col) for row in range(size)] for col in range(size)]
+    diagonal = [(row, row) for row in range(size)]
+    anti_diagonal = [(row, size - 1 - row) for row in range(size)]
+    lines = tuple(rows + columns + [diagonal, anti_diagonal])
+    through = [array("H") for _ in range(size * size)]
+    for index, line in enumerate(lines):
+        for row, col in line:
+            through[row * size + col].append(index)
+    return lines, tuple(through)
+
+
+@functools.lru_cache(maxsize=None)
+def _player_tables(players):
+    """Return ("", labels...) and a label -> player id map, shared by games with these players."""
+    labels = ("",) + tuple(player.label for player in players)
+    return labels, {label: index for index, label in enumerate(labels) if index}
+
+
+class BoardState:
+    """A board as a flat bytearray of player ids (0 for empty) plus per-line counters."""
+
+    __slots__ = ("board_size", "cells", "counts", "move_count", "_lines", "_lines_through")
+
+    def __init__(self, board_size, players=2):
+        """
+        Initialize an empty board.
+
+        The cells take board_size ** 2 bytes and the line counters a few more per player;
+        the tables of which cells make up each line are shared by every board of the
+        same size.
+
+        Parameters:
+            board_size (int): The size of the game board, at most 255.
+            players (int): The number of players.
+
+        Returns:
+            None
+        """
+        self.board_size = board_size
+        self.cells = bytearray(board_size * board_size)
+        self.counts = bytearray(players * (2 * board_size + 2))
+        self.move_count = 0
+        self._lines, self._lines_through = _line_tables(board_size)
+
+    def play(self, index, player_id):
+        """
+        Put a player's stone on a cell and count it on every line through the cell.
+
+        Parameters:
+            index (int): The cell, row * board_size + col.
+            player_id (int): The player, counting from 1.
+
+        Returns:
+            int: The index of the first line the move completed, or -1.
+        """
+        self.cells[index] = player_id
+        self.move_count += 1
+        counts = self.counts
+        base = (player_id - 1) * (2 * self.board_size + 2)
+        winning_line = -1
+        for line in self._lines_through[index]:
+            counts[base + line] += 1
+            if counts[base + line] == self.board_size and winning_line < 0:
+                winning_line = line
+        return winning_line
+
+    def completes_line(self, index, player_id):
+        """Return True if the player taking the cell would complete a line."""
+        base = (player_id - 1) * (2 * self.board_size + 2)
+        target = self.board_size - 1
+        return any(self.counts[base + line] == target for line in self._lines_through[index])
+
+    def line(self, line):
+        """Return the (row, col) cells on a line; the list is shared, so do not modify it."""
+        return self._lines[line]
+
+    def is_full(self):
+        """Return True if every cell of the board has been played."""
+        return self.move_count == len(self.cells)
+
+    def clone(self):
+        """Return an independent copy; only the two small buffers are copied."""
+        state = BoardState.__new__(BoardState)
+        state.board_size = self.board_size
+        state.cells = self.cells[:]
+        state.counts = self.counts[:]
+        state.move_count = self.move_count
+        state._lines = self._lines
+        state._lines_through = self._lines_through
+        return state
+
+    def reset(self):
+        """Clear the board for a new round."""
+        self.cells = bytearray(len(self.cells))
+        self.counts = bytearray(len(self.counts))
+        self.move_count = 0
+
+
 class TicTacToeGame:
+    __slots__ = (
+        "board_size",
+        "win_length",
+        "current_player",
+        "winner_combo",
+        "_players",
+        "_turn",
+        "_labels",
+        "_player_ids",
+        "_state",
+        "_has_winner",
+    )
+
     def __init__(self, players=DEFAULT_PLAYERS, board_size=BOARD_SIZE):
         """
         Initialize the TicTacToeGame with the specified players and board size.
 
+        The board is a BoardState, so a game in progress takes about board_size ** 2
+        bytes plus a fixed overhead, and clone() copies it cheaply for search.
+
         Parameters:
             players (tuple): A tuple of Player objects representing the players of the game.
             board_size (int): The size of the game board.
@@ -36,87 +186,203 @@ class TicTacToeGame:
         Returns:
             None
         """
-        self._players = cycle(players)
+        self._players = tuple(players)
+        self._turn = 0
         self.board_size = board_size
-        self.current_player = next(self._players)
+        self.win_length = board_size
+        self.current_player = self._players[0]
         self.winner_combo = []
-        self._current_moves = []
+        self._labels, self._player_ids = _player_tables(self._players)
+        self._state = BoardState(board_size, len(self._players))
         self._has_winner = False
-        self._winning_combos = []
-        self._setup_board()
 
-    def _setup_board(self):
-        """
-        Initializes the game board by creating a 2D list of Move objects representing the current moves
-        and a list of winning combinations.
+    def is_valid_move(self, move):
+        """Return True if move is valid, and False otherwise."""
+        index = move.row * self.board_size + move.col
+        return not self._has_winner and not self._state.cells[index]
+
+    @timed("tictactoe.process_move")
+    def process_move(self, move):
+        """Process the current move and check if it's a win."""
+        index = move.row * self.board_size + move.col
+        winning_line = self._state.play(index, self._player_ids[move.label])
+        if winning_line >= 0:
+            self._has_winner = True
+            self.winner_combo = self._state.line(winning_line)
+
+    def is_winning_move(self, move):
+        """Return True if playing move would win the game, without playing it."""
+        return self.is_valid_move(move) and self._state.completes_line(
+            move.row * self.board_size + move.col, self._player_ids[move.label]
+        )
+
+    def has_winner(self):
+        """Return True if the game has a winner, and False otherwise."""
+        return self._has_winner
+
+    def snapshot(self):
+        """Return the cell labels in row-major order, with "" for empty cells."""
+        labels = self._labels
+        return tuple(labels[cell] for cell in self._state.cells)
 
-        This function creates a 2D list of Move objects, where each Move object represents a cell on the
-        game board. The Move object has three attributes: row, col, and label. The row and col attributes
-        represent the position of the cell on the board, and the label attribute represents the label
-        of the player who made the move.
+    def legal_moves(self):
+        """Return the (row, col) of every cell that can still be played."""
+        if self._has_winner:
+            return []
+        size = self.board_size
+        return [divmod(index, size) for index, cell in enumerate(self._state.cells) if not cell]
+
+    def is_tied(self):
+        """Return True if the game is tied, and False otherwise."""
+        return not self._has_winner and self._state.is_full()
+
+    def toggle_player(self):
+        """Return a toggled player."""
+        self._turn = (self._turn + 1) % len(self._players)
+        self.current_player = self._players[self._turn]
+
+    def clone(self):
+        """Return an independent copy of the game, e.g. to try moves on during a search."""
+        game = TicTacToeGame.__new__(TicTacToeGame)
+        for name in TicTacToeGame.__slots__:
+            setattr(game, name, getattr(self, name))
+        game.winner_combo = list(self.winner_combo)
+        game._state = self._state.clone()
+        return game
+
+    def reset_game(self):
+        """Reset the game state to play again."""
+        self._state.reset()
+        self._has_winner = False
+        self.winner_combo = []
+
+
+class BitboardTicTacToeGame:
+    def __init__(self, players=DEFAULT_PLAYERS, board_size=BOARD_SIZE, win_length=None):
+        """
+        Initialize a bitboard engine with the same API as TicTacToeGame.
 
-        The function also calls the _get_winning_combos() method to get a list of winning combinations.
-        These combinations are used to check if a player has won the game.
+        Each player's stones are kept in one integer, one bit per cell. Rows are laid out
+        with a stride of board_size + 1 so the spare bit at the end of every row stops
+        horizontal and diagonal shifts from wrapping onto the next row.
 
         Parameters:
-            self (TicTacToeGame): The TicTacToeGame object.
+            players (tuple): A tuple of Player objects representing the players of the game.
+            board_size (int): The size of the game board.
+            win_length (int): How many stones in a row win the game. Defaults to board_size,
+                which gives the classic rules; smaller values give gomoku-style rules.
 
         Returns:
             None
         """
-        self._current_moves = [
-            [Move(row, col) for col in range(self.board_size)]
-            for row in range(self.board_size)
-        ]
-        self._winning_combos = self._get_winning_combos()
-
-    def _get_winning_combos(self):
+        if win_length is None:
+            win_length = board_size
+        if not 1 <= win_length <= board_size:
+            raise ValueError(f"win_length must be between 1 and {board_size}")
+        self._players = cycle(players)
+        self.board_size = board_size
+        self.win_length = win_length
+        self.current_player = next(self._players)
+        self.winner_combo = []
+        self._labels = tuple(player.label for player in players)
+        self._player_index = {label: index for index, label in enumerate(self._labels)}
+        self._boards = [0] * len(players)
+        self._occupied = 0
+        self._has_winner = False
+        self._stride = board_size + 1
+        row_mask = (1 << board_size) - 1
+        self._full_mask = 0
+        for row in range(board_size):
+            self._full_mask |= row_mask << (row * self._stride)
+        # Horizontal, vertical, diagonal and anti-diagonal bit distances.
+        self._directions = (1, self._stride, self._stride + 1, self._stride - 1)
+
+    def _bit(self, row, col):
+        """Return the bit that represents the cell at (row, col)."""
+        return 1 << (row * self._stride + col)
+
+    def _find_run(self, board):
         """
-        Generate a list of winning combinations for the Tic-Tac-Toe game.
+        Look for win_length stones in a row on a single player's bitboard.
 
-        This function creates winning combinations by combining rows, columns, and diagonals of the current game board.
-        The winning combinations are used to determine if a player has won the game.
+        The board is ANDed with shifted copies of itself, doubling the covered run each
+        time, so a bit survives only if it starts a full run in that direction.
 
         Parameters:
-            self (TicTacToeGame): The TicTacToeGame object.
+            board (int): The bitboard of one player.
 
         Returns:
-            list: A list of winning combinations.
+            tuple: The (runs, direction) of the first direction with a run, or (0, 0).
         """
-        rows = [[(move.row, move.col) for move in row] for row in self._current_moves]
-        columns = [list(col) for col in zip(*rows)]
-        first_diagonal = [row[i] for i, row in enumerate(rows)]
-        second_diagonal = [col[j] for j, col in enumerate(reversed(columns))]
-        return rows + columns + [first_diagonal, second_diagonal]
+        for direction in self._directions:
+            runs = board
+            covered = 1
+            while covered < self.win_length and runs:
+                step = min(covered, self.win_length - covered)
+                runs &= runs >> (step * direction)
+                covered += step
+            if runs:
+                return runs, direction
+        return 0, 0
 
     def is_valid_move(self, move):
         """Return True if move is valid, and False otherwise."""
-        row, col = move.row, move.col
-        move_was_not_played = self._current_moves[row][col].label == ""
-        no_winner = not self._has_winner
-        return no_winner and move_was_not_played
+        return not self._has_winner and not self._occupied & self._bit(move.row, move.col)
 
+    @timed("tictactoe.process_move")
     def process_move(self, move):
         """Process the current move and check if it's a win."""
-        row, col = move.row, move.col
-        self._current_moves[row][col] = move
-        for combo in self._winning_combos:
-            results = set(self._current_moves[n][m].label for n, m in combo)
-            is_win = (len(results) == 1) and ("" not in results)
-            if is_win:
-                self._has_winner = True
-                self.winner_combo = combo
-                break
+        bit = self._bit(move.row, move.col)
+        index = self._player_index[move.label]
+        self._boards[index] |= bit
+        self._occupied |= bit
+        runs, direction = self._find_run(self._boards[index])
+        if runs:
+            self._has_winner = True
+            start = (runs & -runs).bit_length() - 1
+            self.winner_combo = [
+                divmod(start + step * direction, self._stride)
+                for step in range(self.win_length)
+            ]
+
+    def is_winning_move(self, move):
+        """Return True if playing move would win the game, without playing it."""
+        if not self.is_valid_move(move):
+            return False
+        board = self._boards[self._player_index[move.label]]
+        runs, _ = self._find_run(board | self._bit(move.row, move.col))
+        return bool(runs)
 
     def has_winner(self):
         """Return True if the game has a winner, and False otherwise."""
         return self._has_winner
 
+    def snapshot(self):
+        """Return the cell labels in row-major order, with "" for empty cells."""
+        cells = [""] * (self.board_size * self.board_size)
+        for label, board in zip(self._labels, self._boards):
+            while board:
+                bit = board & -board
+                row, col = divmod(bit.bit_length() - 1, self._stride)
+                cells[row * self.board_size + col] = label
+                board ^= bit
+        return tuple(cells)
+
+    def legal_moves(self):
+        """Return the (row, col) of every cell that can still be played."""
+        if self._has_winner:
+            return []
+        moves = []
+        free = self._full_mask & ~self._occupied
+        while free:
+            bit = free & -free
+            moves.append(divmod(bit.bit_length() - 1, self._stride))
+            free ^= bit
+        return moves
+
     def is_tied(self):
         """Return True if the game is tied, and False otherwise."""
-        no_winner = not self._has_winner
-        played_moves = (move.label for row in self._current_moves for move in row)
-        return no_winner and all(played_moves)
+        return not self._has_winner and self._occupied == self._full_mask
 
     def toggle_player(self):
         """Return a toggled player."""
@@ -124,20 +390,95 @@ class TicTacToeGame:
 
     def reset_game(self):
         """Reset the game state to play again."""
-        for row, row_content in enumerate(self._current_moves):
-            for col, _ in enumerate(row_content):
-                row_content[col] = Move(row, col)
+        for index in range(len(self._boards)):
+            self._boards[index] = 0
+        self._occupied = 0
         self._has_winner = False
         self.winner_combo = []
 
 
+class TicTacToeObservation(NamedTuple):
+    cells: tuple
+    current_player: str
+
+
+class TicTacToeEngine(GameEngine):
+    def __init__(self, board_size=BOARD_SIZE, win_length=None, game=None):
+        """
+        Initialize a headless Tic-Tac-Toe game where step() plays for whoever is on move.
+
+        Parameters:
+            board_size (int): The size of the game board.
+            win_length (int, optional): How many in a row win. Defaults to board_size.
+            game (optional): A TicTacToeGame or BitboardTicTacToeGame to drive instead
+                of creating one, e.g. the game a TicTacToeBoard shows.
+
+        Returns:
+            None
+        """
+        if game is None:
+            if win_length is None or win_length == board_size:
+                game = TicTacToeGame(board_size=board_size)
+            else:
+                game = BitboardTicTacToeGame(board_size=board_size, win_length=win_length)
+        self.game = game
+        self.first_label = game.current_player.label
+
+    def reset(self, seed=None):
+        """Clear the board and give the first player the move. The game has no randomness, so seed is unused."""
+        self.game.reset_game()
+        while self.game.current_player.label != self.first_label:
+            self.game.toggle_player()
+        return self.observation()
+
+    def legal_actions(self):
+        """Return the (row, col) of every cell the player on move can take."""
+        return self.game.legal_moves()
+
+    def step(self, action):
+        """
+        Play the current player's move and pass the turn on if the game goes on.
+
+        Parameters:
+            action (tuple): The (row, col) of the cell to take.
+
+        Returns:
+            StepResult: The reward is 1 if the move won the game, 0 otherwise.
+        """
+        row, col = action
+        size = self.game.board_size
+        move = Move(row, col, self.game.current_player.label)
+        if not (0 <= row < size and 0 <= col < size and self.game.is_valid_move(move)):
+            raise ValueError(f"{action!r} is not a free cell")
+        self.game.process_move(move)
+        done = self.is_terminal()
+        if not done:
+            self.game.toggle_player()
+        return StepResult(self.observation(), 1.0 if self.game.has_winner() else 0.0, done)
+
+    def observation(self):
+        """Return the cell labels in row-major order and the label of the player on move."""
+        return TicTacToeObservation(self.game.snapshot(), self.game.current_player.label)
+
+    def is_terminal(self):
+        """Return True if the game is won or tied."""
+        return self.game.has_winner() or self.game.is_tied()
+
+
 class TicTacToeBoard(tk.Tk):
-    def __init__(self, game):
+    def __init__(self, game, ai=None, ai_label=None, canvas=None, solution=None):
         """
         Initialize the TicTacToeBoard with the specified game object.
 
         Parameters:
             game: The game object associated with the board.
+            ai (TicTacToeAI, optional): A computer player. Defaults to None for two humans.
+            ai_label (str, optional): The label of the player the computer plays as.
+            canvas (bool, optional): If True, draw the board on a single canvas, which
+                stays fast on large boards; if False, use one button per cell. Defaults
+                to a canvas for boards of CANVAS_MIN_SIZE and up.
+            solution (Solution, optional): A solved variant from TicTacToeSolver, which
+                adds a Hint command to the menu.
 
         Returns:
             None
@@ -145,10 +486,27 @@ class TicTacToeBoard(tk.Tk):
         super().__init__()
         self.title("Tic-Tac-Toe Game")
         self._cells = {}
+        self._buttons = {}
+        # Cells drawn since the last reset, so a reset only has to touch those.
+        self._dirty = []
         self._game = game
+        self._engine = recorded(TicTacToeEngine(game=game))
+        self._ai = ai
+        self._ai_label = ai_label
+        self._ai_results = queue.Queue()
+        self._ai_thread = None
+        self._ai_round = 0
+        self._solution = solution
+        if canvas is None:
+            canvas = game.board_size >= CANVAS_MIN_SIZE
+        self._canvas = None
         self._create_menu()
         self._create_board_display()
-        self._create_board_grid()
+        if canvas:
+            self._create_board_canvas()
+        else:
+            self._create_board_grid()
+        self._start_ai_turn()
 
     def _create_menu(self):
         """
@@ -158,6 +516,8 @@ class TicTacToeBoard(tk.Tk):
         self.config(menu=menu_bar)
         file_menu = tk.Menu(master=menu_bar)
         file_menu.add_command(label="Play Again", command=self.reset_board)
+        if self._solution is not None:
+            file_menu.add_command(label="Hint", command=self._show_hint)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=quit)
         menu_bar.add_cascade(label="File", menu=file_menu)
@@ -201,6 +561,7 @@ class TicTacToeBoard(tk.Tk):
         """
         grid_frame = tk.Frame(master=self)
         grid_frame.pack()
+        cell_font = font.Font(size=36, weight="bold")
         for row in range(self._game.board_size):
             self.rowconfigure(row, weight=1, minsize=50)
             self.columnconfigure(row, weight=1, minsize=75)
@@ -208,49 +569,183 @@ class TicTacToeBoard(tk.Tk):
                 button = tk.Button(
                     master=grid_frame,
                     text="",
-                    font=font.Font(size=36, weight="bold"),
+                    font=cell_font,
                     fg="black",
                     width=3,
                     height=2,
                     highlightbackground="lightblue",
                 )
                 self._cells[button] = (row, col)
+                self._buttons[row, col] = button
                 button.bind("<ButtonPress-1>", self.play)
                 button.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
 
+    def _create_board_canvas(self):
+        """
+        Draw an empty board on a single canvas.
+
+        Only the grid lines are drawn up front, 2 * (board_size + 1) items however big the
+        board is. Marks and highlights are added per cell as the game goes on, and all
+        cells share one font.
+
+        Returns:
+            None
+        """
+        size = self._game.board_size
+        self._cell_pixels = max(MIN_CELL_PIXELS, CANVAS_PIXELS // size)
+        pixels = self._cell_pixels * size
+        # A negative font size is in pixels, so the marks scale with the cells.
+        self._cell_font = font.Font(size=-max(8, self._cell_pixels * 2 // 3), weight="bold")
+        self._canvas = tk.Canvas(
+            master=self, width=pixels + 1, height=pixels + 1, background="white"
+        )
+        self._canvas.pack(padx=5, pady=5)
+        for index in range(size + 1):
+            offset = index * self._cell_pixels
+            self._canvas.create_line(0, offset, pixels, offset, fill="lightblue")
+            self._canvas.create_line(offset, 0, offset, pixels, fill="lightblue")
+        self._canvas.bind("<ButtonPress-1>", self._click)
+
     def play(self, event):
         """Handle a player's move."""
-        clicked_btn = event.widget
-        row, col = self._cells[clicked_btn]
-        move = Move(row, col, self._game.current_player.label)
-        if self._game.is_valid_move(move):
-            self._update_button(clicked_btn)
-            self._game.process_move(move)
-            if self._game.is_tied():
-                self._update_display(msg="Tied game!", color="red")
-            elif self._game.has_winner():
-                self._highlight_cells()
-                msg = f'Player "{self._game.current_player.label}" won!'
-                color = self._game.current_player.color
-                self._update_display(msg, color)
-            else:
-                self._game.toggle_player()
-                msg = f"{self._game.current_player.label}'s turn"
-                self._update_display(msg)
+        if self._is_ai_turn():
+            return
+        row, col = self._cells[event.widget]
+        self._play_cell(row, col)
+
+    def _click(self, event):
+        """Handle a click on the canvas by working out which cell it landed in."""
+        if self._is_ai_turn():
+            return
+        row = event.y // self._cell_pixels
+        col = event.x // self._cell_pixels
+        if 0 <= row < self._game.board_size and 0 <= col < self._game.board_size:
+            self._play_cell(row, col)
+
+    def _play_cell(self, row, col):
+        """
+        Play the current player's move at (row, col) and update the board.
+
+        Parameters:
+            row (int): The row of the move.
+            col (int): The column of the move.
 
-    def _update_button(self, clicked_btn):
+        Returns:
+            None
+        """
+        player = self._game.current_player
+        try:
+            result = self._engine.step((row, col))
+        except ValueError:
+            return
+        self._draw_move(row, col, player)
+        if not result.done:
+            self._update_display(f"{self._game.current_player.label}'s turn")
+            self._start_ai_turn()
+        elif self._game.is_tied():
+            self._update_display(msg="Tied game!", color="red")
+        else:
+            self._highlight_cells()
+            self._update_display(f'Player "{player.label}" won!', player.color)
+
+    def _is_ai_turn(self):
+        """Return True if the computer plays the current player."""
+        return self._ai is not None and self._game.current_player.label == self._ai_label
+
+    def _start_ai_turn(self):
         """
-        Update the appearance of the clicked button with the current player's label and color.
+        Start the computer's search on a worker thread if it is the computer's turn.
+
+        The worker only sees a snapshot of the board and posts its move to a queue,
+        which the Tk event loop polls with after(), so the window stays responsive.
+
+        Returns:
+            None
+        """
+        if not self._is_ai_turn() or self._engine.is_terminal() or self._ai_thread is not None:
+            return
+        self._update_display(f"{self._ai_label} is thinking...")
+        self._ai_thread = threading.Thread(
+            target=self._think,
+            args=(self._game.snapshot(), self._ai_label, self._ai_round),
+            daemon=True,
+        )
+        self._ai_thread.start()
+        self.after(AI_POLL_MS, self._poll_ai)
+
+    def _think(self, labels, label, ai_round):
+        """Run the computer's search off the UI thread and post the chosen move, or the error."""
+        try:
+            move = self._ai.best_move(labels, label)
+        except Exception as exc:
+            move = exc
+        self._ai_results.put((ai_round, move))
+
+    def _poll_ai(self):
+        """Play the computer's move once its search has finished."""
+        try:
+            ai_round, move = self._ai_results.get_nowait()
+        except queue.Empty:
+            self.after(AI_POLL_MS, self._poll_ai)
+            return
+        self._ai_thread = None
+        if ai_round != self._ai_round:
+            # The board was reset while the computer was thinking.
+            self._start_ai_turn()
+            return
+        if isinstance(move, Exception):
+            # A failed search must not leave the board thinking forever; play any free cell.
+            print(f"The computer's search failed: {move!r}", file=sys.stderr)
+            move = stream("tictactoe").choice(self._game.legal_moves())
+        self._play_cell(*move)
+
+    def _show_hint(self):
+        """Show the best move for the player to move, looked up in the solved positions."""
+        if self._engine.is_terminal() or self._is_ai_turn():
+            return
+        labels = self._game.snapshot()
+        label = self._game.current_player.label
+        move = self._solution.best_move(labels, label)
+        if move is None:
+            self._update_display("No hint for this position")
+            return
+        row, col = move
+        hint = f"Hint: row {row + 1}, column {col + 1}"
+        value = self._solution.value(labels, label)
+        if value is not None:
+            hint += f" ({label} {describe_value(value)})"
+        self._update_display(hint)
+
+    @timed("tictactoe.render")
+    def _draw_move(self, row, col, player):
+        """Show player's mark in the cell at (row, col)."""
+        self._dirty.append((row, col))
+        if self._canvas is None:
+            self._update_button(self._buttons[row, col], player)
+            return
+        self._canvas.create_text(
+            (col + 0.5) * self._cell_pixels,
+            (row + 0.5) * self._cell_pixels,
+            text=player.label,
+            fill=player.color,
+            font=self._cell_font,
+            tags="mark",
+        )
+
+    def _update_button(self, clicked_btn, player):
+        """
+        Update the appearance of the clicked button with the label and color of the player who took it.
 
         Parameters:
             self (TicTacToeBoard): The instance of the TicTacToeBoard class.
             clicked_btn (Button): The button that was clicked and needs to be updated.
+            player (Player): The player who made the move.
 
         Returns:
             None
         """
-        clicked_btn.config(text=self._game.current_player.label)
-        clicked_btn.config(fg=self._game.current_player.color)
+        clicked_btn.config(text=player.label)
+        clicked_btn.config(fg=player.color)
 
     def _update_display(self, msg, color="black"):
         """
@@ -276,22 +771,66 @@ class TicTacToeBoard(tk.Tk):
         Returns:
             None
         """
-        for button, coordinates in self._cells.items():
-            if coordinates in self._game.winner_combo:
-                button.config(highlightbackground="red")
+        for row, col in self._game.winner_combo:
+            if self._canvas is None:
+                self._buttons[row, col].config(highlightbackground="red")
+            else:
+                self._canvas.create_rectangle(
+                    col * self._cell_pixels + 1,
+                    row * self._cell_pixels + 1,
+                    (col + 1) * self._cell_pixels - 1,
+                    (row + 1) * self._cell_pixels - 1,
+                    outline="red",
+                    width=2,
+                    tags="highlight",
+                )
 
     def reset_board(self):
-        """Reset the game's board to play again."""
-        self._game.reset_game()
+        """Reset the game's board to play again, redrawing only the cells that were played."""
+        self._engine.reset()
+        self._ai_round += 1
         self._update_display(msg="Ready?")
-        for button in self._cells.keys():
-            button.config(highlightbackground="lightblue")
-            button.config(text="")
-            button.config(fg="black")
-
-
-def ttt():
-    """Create the game's board and run its main loop."""
-    game = TicTacToeGame()
-    board = TicTacToeBoard(game)
+        if self._canvas is None:
+            for cell in self._dirty:
+                button = self._buttons[cell]
+                button.config(highlightbackground="lightblue")
+                button.config(text="")
+                button.config(fg="black")
+        else:
+            self._canvas.delete("mark", "highlight")
+        self._dirty = []
+        self._start_ai_turn()
+
+
+def ttt(vs_computer=False, board_size=BOARD_SIZE, win_length=None, canvas=None):
+    """
+    Create the game's board and run its main loop.
+
+    If the variant has been solved with TicTacToeSolver, the computer player and the
+    Hint command look moves up in the cached solution instead of searching.
+
+    Parameters:
+        vs_computer (bool): If True, the second player is played by the computer.
+        board_size (int): The size of the game board.
+        win_length (int, optional): How many in a row win. Defaults to board_size.
+        canvas (bool, optional): See TicTacToeBoard.
+
+    Returns:
+        None
+    """
+    game = TicTacToeEngine(board_size, win_length).game
+    solution = load_solution(board_size, game.win_length)
+    if vs_computer:
+        ai = TicTacToeAI(
+            board_size, game.win_length, time_limit=AI_TIME_LIMIT, solution=solution
+        )
+        board = TicTacToeBoard(
+            game,
+            ai=ai,
+            ai_label=DEFAULT_PLAYERS[1].label,
+            canvas=canvas,
+            solution=solution,
+        )
+    else:
+        board = TicTacToeBoard(game, canvas=canvas, solution=solution)
     board.mainloop()
@@ -0,0 +1,387 @@
+"""A computer player for tic-tac-toe using negamax search with alpha-beta pruning."""
+
+import random
+import time
+
+WIN_SCORE = 1 << 30
+# Scores above this are forced wins, the distance to the win is folded into the value.
+WIN_THRESHOLD = WIN_SCORE - 10_000
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+# Boards up to this size search every empty cell; larger ones only search near stones.
+FULL_WIDTH_SIZE = 4
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
+
+def get_symmetries(board_size):
+    """
+    Build the 8 symmetries of a square board as cell permutations.
+
+    Parameters:
+        board_size (int): The size of the game board.
+
+    Returns:
+        list: Eight lists mapping a row-major cell index to its index after the
+            rotation or reflection.
+    """
+    last = board_size - 1
+    transforms = (
+        lambda row, col: (row, col),
+        lambda row, col: (col, last - row),
+        lambda row, col: (last - row, last - col),
+        lambda row, col: (last - col, row),
+        lambda row, col: (row, last - col),
+        lambda row, col: (last - row, col),
+        lambda row, col: (col, row),
+        lambda row, col: (last - col, last - row),
+    )
+    symmetries = []
+    for transform in transforms:
+        permutation = []
+        for cell in range(board_size * board_size):
+            row, col = transform(*divmod(cell, board_size))
+            permutation.append(row * board_size + col)
+        symmetries.append(permutation)
+    return symmetries
+
+
+def get_windows(board_size, win_length):
+    """
+    List every run of win_length cells in a row, column or diagonal.
+
+    Parameters:
+        board_size (int): The size of the game board.
+        win_length (int): How many stones in a row win the game.
+
+    Returns:
+        list: Tuples of row-major cell indices, one per window.
+    """
+    windows = []
+    for row in range(board_size):
+        for col in range(board_size):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row = row + d_row * (win_length - 1)
+                end_col = col + d_col * (win_length - 1)
+                if 0 <= end_row < board_size and 0 <= end_col < board_size:
+                    windows.append(
+                        tuple(
+                            (row + d_row * step) * board_size + col + d_col * step
+                            for step in range(win_length)
+                        )
+                    )
+    return windows
+
+
+class TicTacToeAI:
+    def __init__(
+        self,
+        board_size=3,
+        win_length=None,
+        max_depth=None,
+        time_limit=1.0,
+        seed=0,
+        solution=None,
+    ):
+        """
+        Initialize the computer player for a board of the given size.
+
+        Positions are hashed with Zobrist keys. The hash is kept for all 8 symmetries of
+        the board at once and the smallest one is used as the transposition table key, so
+        rotated and mirrored positions share one entry.
+
+        Parameters:
+            board_size (int): The size of the game board.
+            win_length (int): How many stones in a row win. Defaults to board_size.
+            max_depth (int): The deepest search to try, or None to search to the end.
+            time_limit (float): Seconds allowed per move, or None for no limit.
+            seed (int): Seed for the Zobrist keys and for breaking ties between moves.
+            solution (Solution, optional): A solved variant from TicTacToeSolver; moves
+                are looked up in it, and only searched for if it has no answer.
+
+        Returns:
+            None
+        """
+        self.board_size = board_size
+        self.win_length = board_size if win_length is None else win_length
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.solution = solution
+        self.nodes = 0
+        self.table = {}
+        self._rng = random.Random(seed)
+        cell_count = board_size * board_size
+        self._symmetries = get_symmetries(board_size)
+        self._inverse_symmetries = []
+        for permutation in self._symmetries:
+            inverse = [0] * cell_count
+            for cell, image in enumerate(permutation):
+                inverse[image] = cell
+            self._inverse_symmetries.append(inverse)
+        self._zobrist = [
+            (0, self._rng.getrandbits(64), self._rng.getrandbits(64))
+            for _ in range(cell_count)
+        ]
+        self._side_keys = (0, self._rng.getrandbits(64), self._rng.getrandbits(64))
+        self._windows = get_windows(board_size, self.win_length)
+        self._cell_windows = [[] for _ in range(cell_count)]
+        for index, window in enumerate(self._windows):
+            for cell in window:
+                self._cell_windows[cell].append(index)
+        self._neighbours = []
+        for cell in range(cell_count):
+            row, col = divmod(cell, board_size)
+            self._neighbours.append(
+                [
+                    r * board_size + c
+                    for r in range(max(row - 1, 0), min(row + 2, board_size))
+                    for c in range(max(col - 1, 0), min(col + 2, board_size))
+                    if (r, c) != (row, col)
+                ]
+            )
+        self._weights = [0] + [4**count for count in range(1, self.win_length)] + [0]
+        self._cells = bytearray(cell_count)
+        self._counts = (None, [0] * len(self._windows), [0] * len(self._windows))
+        self._near = [0] * cell_count
+        self._hashes = [0] * 8
+        self._score = 0
+        self._deadline = None
+
+    def clear(self):
+        """Forget every cached position, e.g. when the rules or players change."""
+        self.table.clear()
+
+    def choose_move(self, game):
+        """
+        Pick a move for the game's current player.
+
+        Parameters:
+            game: A TicTacToeGame or BitboardTicTacToeGame.
+
+        Returns:
+            tuple: The (row, col) of the chosen move.
+        """
+        return self.best_move(game.snapshot(), game.current_player.label)
+
+    def best_move(self, labels, label):
+        """
+        Search a position and return the best move for the player with the given label.
+
+        This only reads its arguments, so it is safe to run off the UI thread on a
+        snapshot taken from the game.
+
+        Parameters:
+            labels (tuple): The cell labels in row-major order, "" for empty cells.
+            label (str): The label of the player to move.
+
+        Returns:
+            tuple: The (row, col) of the chosen move.
+        """
+        if self.solution is not None:
+            move = self.solution.best_move(labels, label, self._rng)
+            if move is not None:
+                return move
+        self._load(labels, label)
+        empty_cells = self._cells.count(0)
+        if not empty_cells:
+            raise ValueError("There are no moves left on the board")
+        max_depth = empty_cells
+        if self.max_depth is not None:
+            max_depth = min(self.max_depth, empty_cells)
+        self._deadline = None
+        start = time.perf_counter()
+        self.nodes = 0
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                value, move = self._search_root(depth)
+            except SearchTimeout:
+                break
+            best = move
+            if abs(value) > WIN_THRESHOLD:
+                break
+            if self.time_limit is not None:
+                # Only the first iteration is allowed to run over the budget.
+                self._deadline = start + self.time_limit
+                if time.perf_counter() >= self._deadline:
+                    break
+        return divmod(best, self.board_size)
+
+    def _load(self, labels, label):
+        """Set up the search state from a snapshot, with the player to move as player 1."""
+        for window_counts in self._counts[1:]:
+            for index in range(len(window_counts)):
+                window_counts[index] = 0
+        self._cells[:] = bytes(len(self._cells))
+        self._near = [0] * len(self._cells)
+        self._hashes = [0] * 8
+        self._score = 0
+        for cell, cell_label in enumerate(labels):
+            if cell_label:
+                self._play(cell, 1 if cell_label == label else 2)
+
+    def _window_value(self, window):
+        """Return the heuristic value of a window from player 1's point of view."""
+        mine = self._counts[1][window]
+        theirs = self._counts[2][window]
+        if theirs == 0:
+            return self._weights[mine]
+        if mine == 0:
+            return -self._weights[theirs]
+        return 0
+
+    def _play(self, cell, player):
+        """Place a stone and return True if it completes a window."""
+        self._cells[cell] = player
+        for symmetry, permutation in enumerate(self._symmetries):
+            self._hashes[symmetry] ^= self._zobrist[permutation[cell]][player]
+        for neighbour in self._neighbours[cell]:
+            self._near[neighbour] += 1
+        counts = self._counts[player]
+        won = False
+        for window in self._cell_windows[cell]:
+            self._score -= self._window_value(window)
+            counts[window] += 1
+            self._score += self._window_value(window)
+            if counts[window] == self.win_length:
+                won = True
+        return won
+
+    def _undo(self, cell, player):
+        """Remove a stone placed by _play."""
+        self._cells[cell] = 0
+        for symmetry, permutation in enumerate(self._symmetries):
+            self._hashes[symmetry] ^= self._zobrist[permutation[cell]][player]
+        for neighbour in self._neighbours[cell]:
+            self._near[neighbour] -= 1
+        counts = self._counts[player]
+        for window in self._cell_windows[cell]:
+            self._score -= self._window_value(window)
+            counts[window] -= 1
+            self._score += self._window_value(window)
+
+    def _candidates(self, first=None):
+        """Return the empty cells worth searching, best guesses first."""
+        cells = self._cells
+        if self.board_size <= FULL_WIDTH_SIZE:
+            moves = [cell for cell in range(len(cells)) if not cells[cell]]
+        else:
+            moves = [
+                cell for cell in range(len(cells)) if not cells[cell] and self._near[cell]
+            ]
+            if not moves:
+                moves = [cell for cell in range(len(cells)) if not cells[cell]]
+        moves.sort(key=lambda cell: -self._near[cell] - len(self._cell_windows[cell]))
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _canonical(self, player):
+        """Return the transposition key and the symmetry that produced it."""
+        key = min(self._hashes)
+        return key ^ self._side_keys[player], self._hashes.index(key)
+
+    def _search_root(self, depth):
+        """Search every root move to the given depth and return (value, move)."""
+        alpha = -WIN_SCORE
+        best_move = None
+        key, symmetry = self._canonical(1)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None and entry[3] is not None:
+            first = self._inverse_symmetries[symmetry][entry[3]]
+        moves = self._candidates(first)
+        if first is None:
+            # Shuffle equal moves so repeated games do not always open the same way.
+            self._rng.shuffle(moves)
+            moves.sort(key=lambda cell: -self._near[cell] - len(self._cell_windows[cell]))
+        for move in moves:
+            if self._play(move, 1):
+                value = WIN_SCORE - 1
+            else:
+                value = -self._negamax(depth - 1, -WIN_SCORE, -alpha, 2, 1)
+            self._undo(move, 1)
+            if best_move is None or value > alpha:
+                alpha = value
+                best_move = move
+        self.table[key] = (depth, alpha, EXACT, self._symmetries[symmetry][best_move])
+        return alpha, best_move
+
+    def _negamax(self, depth, alpha, beta, player, ply):
+        """
+        Return the value of the position for the player to move.
+
+        Parameters:
+            depth (int): The remaining search depth.
+            alpha (int): The lower bound of the search window.
+            beta (int): The upper bound of the search window.
+            player (int): 1 for the player the search is for, 2 for the opponent.
+            ply (int): The distance from the root, used to prefer faster wins.
+
+        Returns:
+            int: The value of the position.
+        """
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes & 1023:
+            if time.perf_counter() >= self._deadline:
+                raise SearchTimeout
+        key, symmetry = self._canonical(player)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, value, flag, stored_move = entry
+            if stored_move is not None:
+                first = self._inverse_symmetries[symmetry][stored_move]
+            if entry_depth >= depth:
+                if value > WIN_THRESHOLD:
+                    value -= ply
+                elif value < -WIN_THRESHOLD:
+                    value += ply
+                if flag == EXACT:
+                    return value
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+        if depth == 0:
+            return self._score if player == 1 else -self._score
+        moves = self._candidates(first)
+        if not moves:
+            return 0
+        original_alpha = alpha
+        best_value = -WIN_SCORE
+        best_move = None
+        for move in moves:
+            if self._play(move, player):
+                value = WIN_SCORE - ply - 1
+            else:
+                value = -self._negamax(depth - 1, -beta, -alpha, 3 - player, ply + 1)
+            self._undo(move, player)
+            if value > best_value:
+                best_value = value
+                best_move = move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        if best_value <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        stored_value = best_value
+        if stored_value > WIN_THRESHOLD:
+            stored_value += ply
+        elif stored_value < -WIN_THRESHOLD:
+            stored_value -= ply
+        self.table[key] = (
+            depth,
+            stored_value,
+            flag,
+            self._symmetries[symmetry][best_move],
+        )
+        return best_value
@@ -0,0 +1,134 @@
+"""A console client for TicTacToeServer.
+
+    python TicTacToeServer.py &
+    python TicTacToeClient.py --size 3
+
+Run two clients to play each other. Moves are typed as "row col", counting from 0.
+"""
+
+import argparse
+import asyncio
+
+from TicTacToe import BOARD_SIZE
+from TicTacToeServer import HOST, PORT
+
+
+class GameClient:
+    def __init__(self, reader, writer):
+        """Wrap an open connection to the server; use GameClient.connect to open one."""
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host=HOST, port=PORT):
+        """Open a connection to the server."""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    def send(self, *words):
+        """Send one protocol line."""
+        self._writer.write(" ".join(map(str, words)).encode("ascii") + b"\n")
+
+    async def receive(self):
+        """Return the next line from the server as a list of words, or None once it hangs up."""
+        line = await self._reader.readline()
+        if not line:
+            return None
+        return line.decode("ascii").split()
+
+    async def close(self):
+        """Say goodbye and close the connection."""
+        try:
+            self.send("QUIT")
+            self._writer.close()
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def format_board(cells, size):
+    """Return the board as text, one row per line."""
+    return "\n".join(
+        " ".join(cells[row * size + col] or "." for col in range(size)) for row in range(size)
+    )
+
+
+async def read_move(size):
+    """Ask the player for a move without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        text = await loop.run_in_executor(None, input, "Your move (row col): ")
+        try:
+            row, col = map(int, text.split())
+        except ValueError:
+            print(f"Please enter two numbers from 0 to {size - 1}.")
+            continue
+        return row, col
+
+
+async def play(host=HOST, port=PORT, size=BOARD_SIZE):
+    """
+    Play games on the server from the console until the player stops.
+
+    Parameters:
+        host (str): The server's address.
+        port (int): The server's port.
+        size (int): The board size to ask for.
+
+    Returns:
+        None
+    """
+    client = await GameClient.connect(host, port)
+    client.send("PLAY", size)
+    cells = []
+    while True:
+        message = await client.receive()
+        if message is None:
+            print("The server closed the connection.")
+            return
+        kind, args = message[0], message[1:]
+        if kind == "WAIT":
+            print("Waiting for an opponent...")
+        elif kind == "START":
+            cells = [""] * (size * size)
+            print(f"Game started. You are {args[0]}.")
+        elif kind == "TURN":
+            print(format_board(cells, size))
+            client.send("MOVE", *await read_move(size))
+        elif kind == "MOVED":
+            label, row, col = args[0], int(args[1]), int(args[2])
+            cells[row * size + col] = label
+        elif kind == "ERROR":
+            print("Error: " + " ".join(args))
+            if not cells:
+                await client.close()
+                return
+            client.send("MOVE", *await read_move(size))
+        elif kind in ("WIN", "TIE", "LEFT"):
+            print(format_board(cells, size))
+            if kind == "WIN":
+                print(f'Player "{args[0]}" won!')
+            else:
+                print("Tied game!" if kind == "TIE" else "Your opponent left.")
+            cells = []
+            again = await asyncio.get_running_loop().run_in_executor(
+                None, input, "Play again? (y/n): "
+            )
+            if again.lower() != "y":
+                await client.close()
+                return
+            client.send("PLAY", size)
+
+
+def main(argv=None):
+    """Connect to a server and play from the console."""
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe on a game server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    args = parser.parse_args(argv)
+    asyncio.run(play(args.host, args.port, args.size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""A load generator for TicTacToeServer.
+
+Opens pairs of bot clients that play random legal moves as fast as the server answers,
+then reports moves per second and the latency of a move: the time from sending MOVE
+to receiving the server's MOVED for it. With --local the server runs in the same
+process on a free port, so the numbers include the bots' own CPU time.
+
+    python TicTacToeLoad.py --local --clients 1000 --games 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from RandomStreams import RandomStreams
+from TicTacToe import BOARD_SIZE
+from TicTacToeClient import GameClient
+from TicTacToeServer import HOST, PORT, GameServer
+
+
+async def bot(host, port, size, games, rng, latencies):
+    """
+    Play games with random legal moves, recording the latency of every move.
+
+    Parameters:
+        host (str): The server's address.
+        port (int): The server's port.
+        size (int): The board size to ask for.
+        games (int): How many games to finish before disconnecting.
+        rng (random.Random): Picks the moves.
+        latencies (list): Each move's latency in seconds is appended here.
+
+    Returns:
+        None
+    """
+    client = await GameClient.connect(host, port)
+    free = []
+    sent = None
+    client.send("PLAY", size)
+    while games:
+        message = await client.receive()
+        if message is None:
+            break
+        kind = message[0]
+        if kind == "START":
+            free = [(row, col) for row in range(size) for col in range(size)]
+        elif kind == "TURN":
+            row, col = free[rng.randrange(len(free))]
+            sent = time.perf_counter()
+            client.send("MOVE", row, col)
+        elif kind == "MOVED":
+            if sent is not None:
+                latencies.append(time.perf_counter() - sent)
+                sent = None
+            free.remove((int(message[2]), int(message[3])))
+        elif kind in ("WIN", "TIE", "LEFT"):
+            games -= 1
+            if games:
+                client.send("PLAY", size)
+        elif kind == "ERROR":
+            raise RuntimeError("server rejected a move: " + " ".join(message[1:]))
+    await client.close()
+
+
+def percentile(values, fraction):
+    """Return the value below which the given fraction of sorted values fall."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(
+    host=HOST, port=PORT, clients=200, games=10, size=BOARD_SIZE, seed=0, local=False
+):
+    """
+    Run bots against a server and measure it.
+
+    Parameters:
+        host (str): The server's address.
+        port (int): The server's port.
+        clients (int): How many bots play at once; they pair up, so use an even number.
+        games (int): How many games each bot plays.
+        size (int): The board size.
+        seed (int): Seeds the bots' moves.
+        local (bool): If True, start a server in this process on a free port instead.
+
+    Returns:
+        dict: "moves", "seconds", "moves_per_second", "p50" and "p99" (in seconds).
+    """
+    server = None
+    if local:
+        server = GameServer(host, 0)
+        port = await server.start()
+    latencies = []
+    streams = RandomStreams(seed)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            bot(host, port, size, games, streams.stream(index), latencies)
+            for index in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.close()
+    latencies.sort()
+    return {
+        "moves": len(latencies),
+        "seconds": elapsed,
+        "moves_per_second": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main(argv=None):
+    """Run the load generator and print its measurements."""
+    parser = argparse.ArgumentParser(description="Load-test a Tic-Tac-Toe game server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--local", action="store_true", help="run the server in this process")
+    args = parser.parse_args(argv)
+    if args.clients % 2:
+        parser.error("--clients must be even so every bot gets an opponent")
+    stats = asyncio.run(
+        run_load(
+            args.host, args.port, args.clients, args.games, args.size, args.seed, args.local
+        )
+    )
+    print(
+        f"{args.clients} clients, {stats['moves']} moves in {stats['seconds']:.2f}s "
+        f"({stats['moves_per_second']:,.0f} moves/s)"
+    )
+    print(f"move latency p50 {stats['p50'] * 1000:.2f} ms, p99 {stats['p99'] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""An asyncio server that hosts many networked Tic-Tac-Toe games in one process.
+
+Clients talk to the server in ASCII lines of space-separated words.
+
+Client to server:
+    PLAY [size]      Ask for an opponent on a size x size board (default 3).
+    MOVE row col     Play a move in the current game.
+    QUIT             Leave the current game and disconnect.
+
+Server to client:
+    WAIT             No opponent yet; the next player asking for this size is paired.
+    START label size A game has started and you play label (X moves first).
+    TURN             It is your move.
+    MOVED label row col
+                     A move was played, by either player.
+    WIN label | TIE  The game is over. Send PLAY to play again.
+    LEFT             Your opponent disconnected; the game is over.
+    ERROR message    The last line was not accepted.
+
+Every game is a TicTacToeEngine, and the per-connection and per-game state is kept
+in slotted objects, so thousands of games cost little memory.
+"""
+
+import argparse
+import asyncio
+
+from TicTacToe import BOARD_SIZE, DEFAULT_PLAYERS, TicTacToeEngine
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BOARD_SIZE = 15
+
+
+class Player:
+    __slots__ = ("writer", "label", "match")
+
+    def __init__(self, writer):
+        """Initialize the state of one connection."""
+        self.writer = writer
+        self.label = None
+        self.match = None
+
+    def send(self, *words):
+        """Queue one protocol line for this client."""
+        self.writer.write(" ".join(map(str, words)).encode("ascii") + b"\n")
+
+
+class Match:
+    __slots__ = ("engine", "players")
+
+    def __init__(self, size, first, second):
+        """Start a game between two waiting players; first plays X."""
+        self.engine = TicTacToeEngine(size)
+        self.players = {}
+        for player, seat in zip((first, second), DEFAULT_PLAYERS):
+            player.label = seat.label
+            player.match = self
+            self.players[seat.label] = player
+
+    def to_move(self):
+        """Return the player whose turn it is."""
+        return self.players[self.engine.game.current_player.label]
+
+    def broadcast(self, *words):
+        """Send one line to both players."""
+        for player in self.players.values():
+            player.send(*words)
+
+    def finish(self):
+        """Detach both players so they can ask for a new game."""
+        for player in self.players.values():
+            player.match = None
+            player.label = None
+
+
+class GameServer:
+    def __init__(self, host=HOST, port=PORT):
+        """
+        Initialize a server; call start() or serve_forever() to accept connections.
+
+        Parameters:
+            host (str): The address to listen on.
+            port (int): The port to listen on; 0 picks a free one.
+
+        Returns:
+            None
+        """
+        self.host = host
+        self.port = port
+        self.games_played = 0
+        self.moves_played = 0
+        self._waiting = {}
+        self._server = None
+
+    async def start(self):
+        """Start listening and return the port in use."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """Start listening if needed, then serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        """Stop accepting connections."""
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle(self, reader, writer):
+        """Serve one client until it quits or disconnects."""
+        player = Player(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or not self._dispatch(player, line.split()):
+                    break
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError is raised for a line longer than the stream's buffer limit.
+            pass
+        finally:
+            self._leave(player)
+            writer.close()
+
+    def _dispatch(self, player, words):
+        """Handle one line from a client; return False if the client quit."""
+        command = words[0].upper() if words else b""
+        if command == b"PLAY":
+            self._play(player, words[1:])
+        elif command == b"MOVE":
+            self._move(player, words[1:])
+        elif command == b"QUIT":
+            return False
+        else:
+            player.send("ERROR", "unknown command")
+        return True
+
+    def _play(self, player, args):
+        """Pair the player with someone waiting for the same board size, or make it wait."""
+        if player.match is not None or player in self._waiting.values():
+            player.send("ERROR", "already playing")
+            return
+        try:
+            size = int(args[0]) if args else BOARD_SIZE
+        except ValueError:
+            size = 0
+        if not 1 <= size <= MAX_BOARD_SIZE:
+            player.send("ERROR", f"size must be between 1 and {MAX_BOARD_SIZE}")
+            return
+        opponent = self._waiting.pop(size, None)
+        if opponent is None:
+            self._waiting[size] = player
+            player.send("WAIT")
+            return
+        match = Match(size, opponent, player)
+        for seat in match.players.values():
+            seat.send("START", seat.label, size)
+        match.to_move().send("TURN")
+
+    def _move(self, player, args):
+        """Play a move for the player and tell both players what happened."""
+        match = player.match
+        if match is None:
+            player.send("ERROR", "not in a game")
+            return
+        if match.to_move() is not player:
+            player.send("ERROR", "not your turn")
+            return
+        try:
+            row, col = map(int, args)
+            result = match.engine.step((row, col))
+        except ValueError:
+            player.send("ERROR", "illegal move")
+            return
+        self.moves_played += 1
+        match.broadcast("MOVED", player.label, row, col)
+        if not result.done:
+            match.to_move().send("TURN")
+            return
+        if match.engine.game.has_winner():
+            match.broadcast("WIN", player.label)
+        else:
+            match.broadcast("TIE")
+        self.games_played += 1
+        match.finish()
+
+    def _leave(self, player):
+        """Drop a disconnected player from matchmaking and end its game."""
+        for size, waiting in list(self._waiting.items()):
+            if waiting is player:
+                del self._waiting[size]
+        match = player.match
+        if match is not None:
+            for other in match.players.values():
+                if other is not player:
+                    other.send("LEFT")
+            match.finish()
+
+
+def main(argv=None):
+    """Run the game server until interrupted."""
+    parser = argparse.ArgumentParser(description="Host networked Tic-Tac-Toe games.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args(argv)
+    server = GameServer(args.host, args.port)
+
+    async def serve():
+        port = await server.start()
+        print(f"Serving Tic-Tac-Toe on {args.host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"Stopped after {server.games_played} games and {server.moves_played} moves.")
+
+
+if __name__ == "__main__":
+    main()
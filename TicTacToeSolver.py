@@ -0,0 +1,600 @@
+"""Solve small Tic-Tac-Toe variants completely and keep the results in an on-disk cache.
+
+Every position reachable from the empty board is visited and given its exact value
+under perfect play. Positions are keyed by their smallest bitmask encoding over the
+8 rotations and reflections of the board, so symmetric positions are solved and stored
+once. The canonical opening moves are solved in parallel, one worker process each, and
+the merged table is written to SQLite, where TicTacToeAI and the board's hint look
+positions up instead of searching.
+
+    python TicTacToeSolver.py solve --size 3
+    python TicTacToeSolver.py solve --size 4 --win-length 3
+    python TicTacToeSolver.py list
+
+A value is from the point of view of the player to move: n > 0 wins in n plies,
+n < 0 loses in -n plies and 0 is a draw.
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from multiprocessing import Queue
+from queue import Empty
+from typing import NamedTuple
+from urllib.request import pathname2url
+
+from TicTacToeAI import get_symmetries, get_windows
+
+# Where solved variants are kept; set GAMEHUB_SOLUTIONS to use another file.
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solutions.db")
+# 5x5 has about 3 ** 25 positions, far beyond an exhaustive search in Python.
+MAX_SOLVE_SIZE = 4
+# How often workers report how many positions they have solved.
+PROGRESS_EVERY = 1 << 15
+PROGRESS_SECONDS = 1.0
+BATCH_SIZE = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS variants (
+    id INTEGER PRIMARY KEY,
+    board_size INTEGER NOT NULL,
+    win_length INTEGER NOT NULL,
+    positions INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    UNIQUE (board_size, win_length)
+);
+CREATE TABLE IF NOT EXISTS solutions (
+    variant INTEGER NOT NULL REFERENCES variants (id),
+    position INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (variant, position)
+) WITHOUT ROWID;
+"""
+
+
+class Variant(NamedTuple):
+    board_size: int
+    win_length: int
+    positions: int
+    value: int
+    seconds: float
+
+
+def describe_value(value):
+    """Return a value as words, e.g. "wins in 5"."""
+    if value > 0:
+        return f"wins in {value}"
+    if value < 0:
+        return f"loses in {-value}"
+    return "draws"
+
+
+class PositionCodec:
+    def __init__(self, board_size):
+        """
+        Initialize the tables that turn boards into canonical keys.
+
+        A board is a pair of bitmasks, bit row * board_size + col set for each stone:
+        one for the player to move and one for the other player. The key of a position
+        is (mover << cells) | other, minimised over the board's 8 symmetries, which are
+        applied with one table lookup per mask.
+
+        Parameters:
+            board_size (int): The size of the game board, at most MAX_SOLVE_SIZE.
+
+        Returns:
+            None
+        """
+        self.board_size = board_size
+        self.cell_count = board_size * board_size
+        self.symmetries = get_symmetries(board_size)
+        low_bits = min(self.cell_count, 8)
+        self._tables = []
+        for permutation in self.symmetries:
+            low = [0] * (1 << low_bits)
+            high = [0] * (1 << (self.cell_count - low_bits))
+            for cell, image in enumerate(permutation):
+                part, bit = (low, cell) if cell < low_bits else (high, cell - low_bits)
+                for mask in range(len(part)):
+                    if mask >> bit & 1:
+                        part[mask] |= 1 << image
+            self._tables.append(
+                [
+                    low[mask & (len(low) - 1)] | high[mask >> low_bits]
+                    for mask in range(1 << self.cell_count)
+                ]
+            )
+
+    def key(self, mover, other):
+        """Return the canonical key of a position given as two bitmasks."""
+        shift = self.cell_count
+        t0, t1, t2, t3, t4, t5, t6, t7 = self._tables
+        return min(
+            t0[mover] << shift | t0[other],
+            t1[mover] << shift | t1[other],
+            t2[mover] << shift | t2[other],
+            t3[mover] << shift | t3[other],
+            t4[mover] << shift | t4[other],
+            t5[mover] << shift | t5[other],
+            t6[mover] << shift | t6[other],
+            t7[mover] << shift | t7[other],
+        )
+
+    def key_for(self, labels, label):
+        """Return the canonical key of a board snapshot with label to move."""
+        mover = other = 0
+        for cell, cell_label in enumerate(labels):
+            if cell_label == label:
+                mover |= 1 << cell
+            elif cell_label:
+                other |= 1 << cell
+        return self.key(mover, other)
+
+    def openings(self):
+        """Return one cell from each class of symmetric opening moves."""
+        seen = set()
+        openings = []
+        for cell in range(self.cell_count):
+            key = self.key(0, 1 << cell)
+            if key not in seen:
+                seen.add(key)
+                openings.append(cell)
+        return openings
+
+
+class Solver:
+    def __init__(self, board_size, win_length=None, progress=None):
+        """
+        Initialize an exhaustive solver for one variant.
+
+        Parameters:
+            board_size (int): The size of the game board, at most MAX_SOLVE_SIZE.
+            win_length (int): How many stones in a row win. Defaults to board_size.
+            progress (callable, optional): Called with the number of positions solved
+                so far, every PROGRESS_EVERY positions.
+
+        Returns:
+            None
+        """
+        self.board_size = board_size
+        self.win_length = board_size if win_length is None else win_length
+        self.table = {}
+        self._progress = progress
+        self._codec = PositionCodec(board_size)
+        self._key = self._codec.key
+        self._full = (1 << self._codec.cell_count) - 1
+        self._cells = [1 << cell for cell in range(self._codec.cell_count)]
+        # The masks of the winning windows through each cell.
+        self._windows = [[] for _ in self._cells]
+        for window in get_windows(board_size, self.win_length):
+            mask = sum(1 << cell for cell in window)
+            for cell in window:
+                self._windows[cell].append(mask)
+
+    def solve(self, opening=None):
+        """
+        Solve the empty board, or the position after the first player's opening move.
+
+        Parameters:
+            opening (int, optional): A row-major cell for the first move.
+
+        Returns:
+            int: The value of the position for the player to move.
+        """
+        if opening is None:
+            return self._solve(0, 0)
+        if any(window == 1 << opening for window in self._windows[opening]):
+            return -1
+        return self._solve(0, 1 << opening)
+
+    def _solve(self, mover, other):
+        """Return the value of a position for the player to move, solving every reply."""
+        key = self._key(mover, other)
+        best = self.table.get(key)
+        if best is not None:
+            return best
+        taken = mover | other
+        full = self._full
+        best_rank = -2000
+        for cell, bit in enumerate(self._cells):
+            if taken & bit:
+                continue
+            after = mover | bit
+            for window in self._windows[cell]:
+                if after & window == window:
+                    value, rank = 1, 999
+                    break
+            else:
+                if taken | bit == full:
+                    value, rank = 0, 0
+                else:
+                    # _before and _rank, inlined: this loop runs for every move searched.
+                    reply = self._solve(other, after)
+                    if reply > 0:
+                        value = -reply - 1
+                        rank = -1000 - value
+                    elif reply < 0:
+                        value = 1 - reply
+                        rank = 1000 - value
+                    else:
+                        value, rank = 0, 0
+            if rank > best_rank:
+                best, best_rank = value, rank
+        self.table[key] = best
+        if self._progress is not None and not len(self.table) % PROGRESS_EVERY:
+            self._progress(len(self.table))
+        return best
+
+
+def _rank(value):
+    """Order values for the mover: quick wins, then draws, then slow losses."""
+    if value > 0:
+        return 1000 - value
+    if value < 0:
+        return -1000 - value
+    return 0
+
+
+def _before(reply):
+    """Return the value of a move for its player, given the value of the reply position."""
+    if reply > 0:
+        return -reply - 1
+    if reply < 0:
+        return 1 - reply
+    return 0
+
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    """Keep the queue a worker reports its progress on."""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _solve_opening(board_size, win_length, opening):
+    """Solve one opening in a worker process and return (value, table)."""
+
+    def report(positions):
+        _progress_queue.put((opening, positions))
+
+    solver = Solver(board_size, win_length, report)
+    return solver.solve(opening), solver.table
+
+
+def solve_variant(board_size, win_length=None, workers=None, progress=None):
+    """
+    Solve a variant from the empty board, one task per canonical opening move.
+
+    Positions reachable from more than one opening are solved by every worker that
+    reaches them; the tables are merged here, so each is stored once.
+
+    Parameters:
+        board_size (int): The size of the game board, at most MAX_SOLVE_SIZE.
+        win_length (int): How many stones in a row win. Defaults to board_size.
+        workers (int, optional): The number of worker processes. Defaults to the CPU
+            count; 1 solves in this process.
+        progress (callable, optional): Called at most every PROGRESS_SECONDS with
+            (openings done, openings, positions solved, seconds). Until the tables are
+            merged, a position solved by two workers is counted twice.
+
+    Returns:
+        tuple: The value of the empty board for the first player and the merged
+            {key: value} table.
+    """
+    win_length = board_size if win_length is None else win_length
+    if not 1 <= board_size <= MAX_SOLVE_SIZE:
+        raise ValueError(f"board_size must be between 1 and {MAX_SOLVE_SIZE}")
+    if not 1 <= win_length <= board_size:
+        raise ValueError("win_length must be between 1 and board_size")
+    openings = PositionCodec(board_size).openings()
+    workers = min(workers or os.cpu_count() or 1, len(openings))
+    start = time.perf_counter()
+    last_report = start
+    # Positions solved per opening so far; these overlap until the tables are merged.
+    counts = dict.fromkeys(openings, 0)
+    values = []
+    table = {}
+
+    def report(done):
+        nonlocal last_report
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_SECONDS:
+            last_report = now
+            progress(done, len(openings), sum(counts.values()), now - start)
+
+    if workers == 1:
+        for done, opening in enumerate(openings):
+
+            def count(positions, opening=opening, done=done):
+                counts[opening] = positions
+                report(done)
+
+            solver = Solver(board_size, win_length, count)
+            values.append(solver.solve(opening))
+            counts[opening] = len(solver.table)
+            table.update(solver.table)
+    else:
+        progress_queue = Queue()
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(progress_queue,)
+        ) as executor:
+            pending = {
+                executor.submit(_solve_opening, board_size, win_length, opening): opening
+                for opening in openings
+            }
+            while pending:
+                finished, _ = wait(pending, PROGRESS_SECONDS, FIRST_COMPLETED)
+                try:
+                    while True:
+                        opening, positions = progress_queue.get_nowait()
+                        counts[opening] = max(counts[opening], positions)
+                except Empty:
+                    pass
+                for future in finished:
+                    value, solved = future.result()
+                    counts[pending.pop(future)] = len(solved)
+                    values.append(value)
+                    table.update(solved)
+                report(len(openings) - len(pending))
+    # The first player picks the opening whose reply position is worst for the opponent.
+    value = _before(min(values, key=_rank))
+    table[PositionCodec(board_size).key(0, 0)] = value
+    return value, table
+
+
+class SolutionCache:
+    def __init__(self, path=DEFAULT_CACHE):
+        """
+        Open (and if needed create) a cache of solved variants.
+
+        Parameters:
+            path (str): The SQLite database file.
+
+        Returns:
+            None
+        """
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def store(self, board_size, win_length, value, table, seconds=0.0):
+        """
+        Save a solved variant, replacing any earlier solution of it, in one transaction.
+
+        Parameters:
+            board_size (int): The size of the game board.
+            win_length (int): How many stones in a row win.
+            value (int): The value of the empty board for the first player.
+            table (dict): Maps canonical keys to values, as returned by solve_variant.
+            seconds (float): How long solving took, kept for reference.
+
+        Returns:
+            None
+        """
+        with self._db:
+            old = self.variant_id(board_size, win_length)
+            if old is not None:
+                self._db.execute("DELETE FROM solutions WHERE variant = ?", (old,))
+                self._db.execute("DELETE FROM variants WHERE id = ?", (old,))
+            variant = self._db.execute(
+                "INSERT INTO variants (board_size, win_length, positions, value, seconds) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (board_size, win_length, len(table), value, seconds),
+            ).lastrowid
+            items = iter(table.items())
+            while True:
+                batch = [(variant, key, value) for key, value in islice(items, BATCH_SIZE)]
+                if not batch:
+                    break
+                self._db.executemany(
+                    "INSERT INTO solutions (variant, position, value) VALUES (?, ?, ?)", batch
+                )
+
+    def variant_id(self, board_size, win_length):
+        """Return the id a variant's positions are stored under, or None if it is not solved."""
+        row = self._db.execute(
+            "SELECT id FROM variants WHERE board_size = ? AND win_length = ?",
+            (board_size, win_length),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def variants(self):
+        """Return every solved variant, smallest board first."""
+        return [
+            Variant(*row)
+            for row in self._db.execute(
+                "SELECT board_size, win_length, positions, value, seconds FROM variants "
+                "ORDER BY board_size, win_length"
+            )
+        ]
+
+
+class Solution:
+    def __init__(self, path, variant, board_size, win_length):
+        """Wrap a solved variant in a cache file; use load_solution to open one."""
+        self.board_size = board_size
+        self.win_length = win_length
+        self._variant = variant
+        self._codec = PositionCodec(board_size)
+        self._full = (1 << self._codec.cell_count) - 1
+        self._windows = [
+            sum(1 << cell for cell in window) for window in get_windows(board_size, win_length)
+        ]
+        # Read-only, and shared between the UI thread and the computer player's thread.
+        uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the cache file."""
+        self._db.close()
+
+    def _lookup(self, keys):
+        """Return {key: value} for the given canonical keys that are in the cache."""
+        marks = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT position, value FROM solutions "
+                f"WHERE variant = ? AND position IN ({marks})",
+                (self._variant, *keys),
+            ).fetchall()
+        return dict(rows)
+
+    def _masks(self, labels, label):
+        """Return the stones of the player to move and of the other player as bitmasks."""
+        mover = other = 0
+        for cell, cell_label in enumerate(labels):
+            if cell_label == label:
+                mover |= 1 << cell
+            elif cell_label:
+                other |= 1 << cell
+        return mover, other
+
+    def value(self, labels, label):
+        """
+        Return the value of a position for the player to move.
+
+        Parameters:
+            labels (tuple): The cell labels in row-major order, "" for empty cells.
+            label (str): The label of the player to move.
+
+        Returns:
+            int: The value (see the module docstring), or None if it is not cached.
+        """
+        key = self._codec.key(*self._masks(labels, label))
+        return self._lookup([key]).get(key)
+
+    def best_move(self, labels, label, rng=None):
+        """
+        Return a perfect move for the player to move, from the cached values.
+
+        Parameters:
+            labels (tuple): The cell labels in row-major order, "" for empty cells.
+            label (str): The label of the player to move.
+            rng (random.Random, optional): Picks between equally good moves; without
+                one the first is taken.
+
+        Returns:
+            tuple: The (row, col) of the move, or None if there is no move or some
+                position after it is not cached.
+        """
+        mover, other = self._masks(labels, label)
+        taken = mover | other
+        moves = {}
+        replies = {}
+        for cell in range(self._codec.cell_count):
+            bit = 1 << cell
+            if taken & bit:
+                continue
+            after = mover | bit
+            if any(after & window == window for window in self._windows):
+                moves[cell] = 1
+            elif taken | bit == self._full:
+                moves[cell] = 0
+            else:
+                replies[cell] = self._codec.key(other, after)
+        values = self._lookup(list(replies.values())) if replies else {}
+        for cell, key in replies.items():
+            if key not in values:
+                return None
+            moves[cell] = _before(values[key])
+        if not moves:
+            return None
+        best = max(_rank(value) for value in moves.values())
+        cells = [cell for cell, value in moves.items() if _rank(value) == best]
+        cell = rng.choice(cells) if rng is not None else cells[0]
+        return divmod(cell, self.board_size)
+
+    def choose_move(self, game):
+        """Return a perfect move for a TicTacToeGame's current player, or None."""
+        return self.best_move(game.snapshot(), game.current_player.label)
+
+
+def load_solution(board_size, win_length=None, path=None):
+    """
+    Open the cached solution of a variant, if it has been solved.
+
+    Parameters:
+        board_size (int): The size of the game board.
+        win_length (int): How many stones in a row win. Defaults to board_size.
+        path (str, optional): The cache file. Defaults to $GAMEHUB_SOLUTIONS, or
+            DEFAULT_CACHE.
+
+    Returns:
+        Solution: The solution, or None if the variant is not in the cache.
+    """
+    win_length = board_size if win_length is None else win_length
+    path = path or os.environ.get("GAMEHUB_SOLUTIONS") or DEFAULT_CACHE
+    if board_size > MAX_SOLVE_SIZE or not os.path.exists(path):
+        return None
+    with SolutionCache(path) as cache:
+        variant = cache.variant_id(board_size, win_length)
+    if variant is None:
+        return None
+    return Solution(path, variant, board_size, win_length)
+
+
+def format_progress(done, openings, positions, seconds):
+    """Return one progress line for solve_variant."""
+    rate = positions / seconds if seconds else 0.0
+    return (
+        f"{done}/{openings} openings, {positions:,} positions in {seconds:.1f}s "
+        f"({rate:,.0f} positions/s)"
+    )
+
+
+def main(argv=None):
+    """Solve variants into the cache, or list the solved ones."""
+    parser = argparse.ArgumentParser(description="Solve small Tic-Tac-Toe variants.")
+    parser.add_argument("command", choices=("solve", "list"))
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--cache", default=os.environ.get("GAMEHUB_SOLUTIONS") or DEFAULT_CACHE
+    )
+    args = parser.parse_args(argv)
+    with SolutionCache(args.cache) as cache:
+        if args.command == "solve":
+            win_length = args.win_length or args.size
+            start = time.perf_counter()
+            value, table = solve_variant(
+                args.size,
+                win_length,
+                args.workers,
+                lambda *state: print(format_progress(*state), flush=True),
+            )
+            seconds = time.perf_counter() - start
+            cache.store(args.size, win_length, value, table, seconds)
+            print(
+                f"{args.size}x{args.size}, {win_length} in a row: the first player "
+                f"{describe_value(value)} ({len(table):,} distinct positions, {seconds:.1f}s)"
+            )
+        else:
+            for variant in cache.variants():
+                print(
+                    f"{variant.board_size}x{variant.board_size}, {variant.win_length} in a "
+                    f"row: first player {describe_value(variant.value)}, "
+                    f"{variant.positions:,} positions, solved in {variant.seconds:.1f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
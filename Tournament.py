@@ -0,0 +1,605 @@
+"""Round-robin and Swiss tournaments between bots, rated with Elo or Glicko.
+
+Bots play the headless engines (see GameEngine.py). In Rock-Paper-Scissors and
+Tic-Tac-Toe they play each other directly; in Hangman and Mastermind both bots play the
+same secret and the one needing fewer misses or guesses wins.
+
+Games are played in chunks on a process pool with a bounded number of chunks in flight.
+Results are applied in schedule order as they come back, so ratings are the same
+whatever the number of workers. Only ratings, standings and pairing counts are kept,
+never the games themselves, and they are checkpointed to a JSON file so an interrupted
+run carries on where it stopped:
+
+    python Tournament.py rps --format swiss --rounds 50 --games 20 --checkpoint rps.json
+    python Tournament.py tictactoe --rating glicko
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+from typing import NamedTuple
+
+from RandomStreams import RandomStreams
+
+FORMATS = ("round-robin", "swiss")
+RATING_SYSTEMS = ("elo", "glicko")
+# Games sent to a worker at a time, so cheap games are not swamped by messaging.
+CHUNK_GAMES = 64
+CHECKPOINT_SECONDS = 5.0
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+# Glicko's rating deviation never drops below this, so ratings keep following form.
+MIN_RD = 30.0
+ELO_K = 32.0
+GLICKO_Q = math.log(10) / 400
+# Letters in order of how often they appear in English text.
+LETTER_FREQUENCY = "etaoinshrdlcumwfgypbvkjxqz"
+
+
+def _score(first, second):
+    """Return 1, 0.5 or 0 as first is higher than, equal to or lower than second."""
+    return 1.0 if first > second else 0.5 if first == second else 0.0
+
+
+class StrategyPlayer:
+    def __init__(self, strategy, rng):
+        """Initialize an RPS player that follows one of RPS.PLAYER_STRATEGIES."""
+        self._choose = strategy(rng)
+        self._history = deque(maxlen=1)
+        self._last = None
+
+    def choose(self):
+        """Return the choice for the next round."""
+        self._last = self._choose(self._history)
+        return self._last
+
+    def update(self, opponent_choice):
+        """Remember the round just played."""
+        self._history.append((self._last, opponent_choice))
+
+
+def _rps_bot(name, rng, options):
+    """Create an RPS bot: a computer player from RPS.OPPONENTS or a simulated player."""
+    from RPS import OPPONENTS, PLAYER_STRATEGIES, RULES
+
+    if name in OPPONENTS:
+        return OPPONENTS[name](rules=RULES[options["variant"]], rng=rng)
+    return StrategyPlayer(PLAYER_STRATEGIES[name], rng)
+
+
+def _play_rps(first, second, streams, options):
+    """Play a match of options["rounds"] rounds; the bot that wins more rounds wins."""
+    from RPS import RULES, RPSEngine
+
+    computer = _rps_bot(second, streams.stream("second"), options)
+    engine = RPSEngine(RULES[options["variant"]], computer=computer, rounds=options["rounds"])
+    player = _rps_bot(first, streams.stream("first"), options)
+    while not engine.is_terminal():
+        engine.step(player.choose())
+        player.update(engine.last_round.computer)
+    wins, _, losses = engine.tally
+    return _score(wins, losses)
+
+
+def _play_tictactoe(first, second, streams, options):
+    """Play one game of Tic-Tac-Toe with the first bot moving first."""
+    from GameEngine import make_engine
+    from SelfPlay import AGENTS, play_game
+    from TicTacToe import DEFAULT_PLAYERS
+
+    size = options["board_size"]
+    length = options["win_length"] or size
+    game = make_engine("tictactoe", board_size=size, win_length=length).game
+    labels = [player.label for player in DEFAULT_PLAYERS]
+    seats = {
+        labels[0]: AGENTS[first](size, length, streams.stream("first")),
+        labels[1]: AGENTS[second](size, length, streams.stream("second")),
+    }
+    winner, _ = play_game(game, seats)
+    return 0.5 if winner is None else 1.0 if winner == labels[0] else 0.0
+
+
+@functools.lru_cache(maxsize=None)
+def _hangman_words(path):
+    """Return the word list and a WordIndex over it, built once per process."""
+    from Hangman import getWordList
+    from HangmanSolver import WordIndex
+
+    wordList = getWordList(path)
+    return wordList, wordList if isinstance(wordList, WordIndex) else WordIndex(wordList)
+
+
+def _hangman_guess(name, observation, legal, rng, index):
+    """Return a Hangman bot's next letter."""
+    if name == "random":
+        return rng.choice(legal)
+    if name == "solver":
+        letter, _ = index.best_letter(observation.blanks, observation.missedLetters)
+        if letter in legal:
+            return letter
+    return next(letter for letter in LETTER_FREQUENCY if letter in legal)
+
+
+def _play_hangman(first, second, streams, options):
+    """
+    Both bots guess the same word; the one with fewer misses wins.
+
+    When both are hanged, they have the same misses; the one that revealed more of the
+    word wins instead.
+    """
+    from Hangman import HangmanEngine
+
+    wordList, index = _hangman_words(options["words"])
+    engine = HangmanEngine(wordList)
+    results = []
+    for seat, name in (("first", first), ("second", second)):
+        engine.reset(seed=streams.key("secret"))
+        rng = streams.stream(seat)
+        while not engine.is_terminal():
+            legal = engine.legal_actions()
+            engine.step(_hangman_guess(name, engine.observation(), legal, rng, index))
+        revealed = sum(letter in engine.correctLetters for letter in engine.secretWord)
+        results.append((len(engine.missedLetters), -revealed))
+    return _score(results[1], results[0])
+
+
+@functools.lru_cache(maxsize=None)
+def _mastermind_codes(length, symbols):
+    """Return every code as a list of tuples, built once per process."""
+    from Mastermind import CodeSpace
+
+    return list(CodeSpace(length, symbols))
+
+
+@functools.lru_cache(maxsize=None)
+def _mastermind_solver(length, symbols, strategy):
+    """Return a MastermindSolver, kept for the process so its decision tree is reused."""
+    from MastermindSolver import FeedbackTable, MastermindSolver
+
+    return MastermindSolver(FeedbackTable(length, symbols), strategy)
+
+
+def _mastermind_guess(name, engine, rng):
+    """Return a Mastermind bot's next guess."""
+    from Mastermind import score_batch
+
+    codes = _mastermind_codes(engine.length, engine.symbols)
+    if name == "random":
+        return list(rng.choice(codes))
+    if name == "consistent":
+        candidates = codes
+        for guess, (black, white) in engine.history:
+            blacks, whites = score_batch(guess, candidates)
+            candidates = [
+                code for code, b, w in zip(candidates, blacks, whites) if b == black and w == white
+            ]
+        return list(rng.choice(candidates))
+    solver = _mastermind_solver(engine.length, engine.symbols, name)
+    table = solver.table
+    history = tuple(
+        (table.index_of(list(guess)), table.encode(*feedback)) for guess, feedback in engine.history
+    )
+    return table.code_at(solver.next_guess(history))
+
+
+def _play_mastermind(first, second, streams, options):
+    """Both bots crack the same code; the one needing fewer guesses wins."""
+    from Mastermind import MastermindEngine
+
+    limit = options["max_guesses"]
+    engine = MastermindEngine(options["length"], options["symbols"], limit)
+    guesses = []
+    for seat, name in (("first", first), ("second", second)):
+        engine.reset(seed=streams.key("secret"))
+        rng = streams.stream(seat)
+        while not engine.is_terminal():
+            engine.step(_mastermind_guess(name, engine, rng))
+        guesses.append(len(engine.history) if engine.solved() else limit + 1)
+    return _score(guesses[1], guesses[0])
+
+
+class TournamentGame(NamedTuple):
+    bots: tuple
+    # play(first, second, streams, options) returns the first bot's score: 1, 0.5 or 0.
+    play: object
+    options: dict
+
+
+GAMES = {
+    "hangman": TournamentGame(("random", "frequency", "solver"), _play_hangman, {"words": None}),
+    "mastermind": TournamentGame(
+        ("random", "consistent", "minimax", "entropy"),
+        _play_mastermind,
+        {"length": 4, "symbols": 6, "max_guesses": 10},
+    ),
+    "rps": TournamentGame(
+        ("random", "adaptive", "uniform", "biased", "cycler", "repeat-winner"),
+        _play_rps,
+        {"variant": "classic", "rounds": 100},
+    ),
+    "tictactoe": TournamentGame(
+        ("random", "heuristic", "search"), _play_tictactoe, {"board_size": 3, "win_length": None}
+    ),
+}
+
+
+class TournamentConfig(NamedTuple):
+    game: str = "rps"
+    # The bots entered; empty enters every bot the game has.
+    bots: tuple = ()
+    format: str = "round-robin"
+    # Swiss rounds, or round-robin cycles in which every pair meets.
+    rounds: int = 10
+    # Games per pairing per round, alternating which bot goes first.
+    games: int = 2
+    rating: str = "elo"
+    seed: int = 0
+    # (name, value) pairs overriding the game's options, e.g. (("rounds", 20),).
+    options: tuple = ()
+
+
+def elo_update(first, second, score, k=ELO_K):
+    """
+    Update two Elo ratings after one game.
+
+    Parameters:
+        first (float): The first player's rating.
+        second (float): The second player's rating.
+        score (float): The first player's score: 1, 0.5 or 0.
+        k (float): The largest change one game can make.
+
+    Returns:
+        tuple: The new ratings of the first and second players.
+    """
+    expected = 1 / (1 + 10 ** ((second - first) / 400))
+    change = k * (score - expected)
+    return first + change, second - change
+
+
+def glicko_update(rating, rd, opponent, opponent_rd, score):
+    """
+    Update a Glicko rating after one game, treating the game as its own rating period.
+
+    Parameters:
+        rating (float): The player's rating.
+        rd (float): The player's rating deviation.
+        opponent (float): The opponent's rating.
+        opponent_rd (float): The opponent's rating deviation.
+        score (float): The player's score: 1, 0.5 or 0.
+
+    Returns:
+        tuple: The player's new rating and rating deviation.
+    """
+    g = 1 / math.sqrt(1 + 3 * (GLICKO_Q * opponent_rd / math.pi) ** 2)
+    expected = 1 / (1 + 10 ** (-g * (rating - opponent) / 400))
+    d_squared = 1 / (GLICKO_Q**2 * g**2 * expected * (1 - expected))
+    precision = 1 / rd**2 + 1 / d_squared
+    rating += GLICKO_Q / precision * g * (score - expected)
+    return rating, max(MIN_RD, math.sqrt(1 / precision))
+
+
+class TournamentState:
+    def __init__(self, config, bots):
+        """
+        Initialize the state of a tournament that has not started.
+
+        Everything here is sized by the number of bots, not the number of games, and
+        converts to and from JSON for checkpoints.
+
+        Parameters:
+            config (TournamentConfig): The tournament.
+            bots (tuple): The bots entered.
+
+        Returns:
+            None
+        """
+        self.config = config
+        self.bots = bots
+        self.ratings = {bot: [INITIAL_RATING, INITIAL_RD] for bot in bots}
+        # Points, wins, draws and losses per bot.
+        self.standings = {bot: [0.0, 0, 0, 0] for bot in bots}
+        self.byes = {bot: 0 for bot in bots}
+        # How many rounds each pair of bots has been paired in, keyed "first\tsecond".
+        self.met = {}
+        self.round = 0
+        # The current round's pairings, or None between rounds.
+        self.pairs = None
+        # Games of the current round whose results have been applied.
+        self.applied = 0
+        self.played = 0
+
+    def start_round(self):
+        """Pair the bots for the next round."""
+        config = self.config
+        if config.format == "round-robin":
+            pairs = list(combinations(self.bots, 2))
+            if self.round % 2:
+                pairs = [(second, first) for first, second in pairs]
+        else:
+            pairs = self._swiss_pairs()
+        for first, second in pairs:
+            key = "\t".join(sorted((first, second)))
+            self.met[key] = self.met.get(key, 0) + 1
+        self.pairs = pairs
+        self.applied = 0
+
+    def _swiss_pairs(self):
+        """
+        Pair bots with similar scores, preferring opponents they have met least.
+
+        With an odd number of bots, the lowest-ranked bot with the fewest byes sits the
+        round out and scores as if it had won every game.
+        """
+        ranked = sorted(
+            self.bots, key=lambda bot: (-self.standings[bot][0], -self.ratings[bot][0], bot)
+        )
+        if len(ranked) % 2:
+            bye = min(reversed(ranked), key=lambda bot: self.byes[bot])
+            ranked.remove(bye)
+            self.byes[bye] += 1
+            self.standings[bye][0] += self.config.games
+        pairs = []
+        while ranked:
+            first = ranked.pop(0)
+            second = min(ranked, key=lambda bot: self.met.get("\t".join(sorted((first, bot))), 0))
+            ranked.remove(second)
+            pairs.append((first, second) if self.round % 2 else (second, first))
+        return pairs
+
+    def games_in_round(self):
+        """Return the number of games in the current round."""
+        return len(self.pairs) * self.config.games
+
+    def match(self, index):
+        """Return the (first, second) bots of a game of the current round."""
+        first, second = self.pairs[index % len(self.pairs)]
+        return (second, first) if index // len(self.pairs) % 2 else (first, second)
+
+    def record(self, first, second, score):
+        """Apply one game's result to the standings and ratings."""
+        for bot, points in ((first, score), (second, 1 - score)):
+            standing = self.standings[bot]
+            standing[0] += points
+            standing[1 if points == 1 else 2 if points == 0.5 else 3] += 1
+        a, b = self.ratings[first], self.ratings[second]
+        if self.config.rating == "elo":
+            a[0], b[0] = elo_update(a[0], b[0], score)
+        else:
+            a[:], b[:] = glicko_update(*a, *b, score), glicko_update(*b, *a, 1 - score)
+        self.played += 1
+
+    def to_json(self):
+        """Return the state as plain data for a checkpoint."""
+        return {
+            "config": self.config._asdict(),
+            "bots": list(self.bots),
+            "ratings": self.ratings,
+            "standings": self.standings,
+            "byes": self.byes,
+            "met": self.met,
+            "round": self.round,
+            "pairs": self.pairs,
+            "applied": self.applied,
+            "played": self.played,
+        }
+
+    @classmethod
+    def from_json(cls, data, config):
+        """
+        Return the state saved by to_json().
+
+        The config must match the one saved, except that it may ask for more rounds.
+        """
+        saved = dict(data["config"], rounds=None)
+        if saved != json.loads(json.dumps(config._replace(rounds=None)._asdict())):
+            raise ValueError("The checkpoint is for a different tournament")
+        state = cls(config, tuple(data["bots"]))
+        state.ratings = data["ratings"]
+        state.standings = data["standings"]
+        state.byes = data["byes"]
+        state.met = data["met"]
+        state.round = data["round"]
+        state.pairs = None if data["pairs"] is None else [tuple(pair) for pair in data["pairs"]]
+        state.applied = data["applied"]
+        state.played = data["played"]
+        return state
+
+
+def save_checkpoint(state, path):
+    """Write the state to a checkpoint, replacing it in one step so it is never half-written."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(state.to_json(), file)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path, config):
+    """Return the state saved in a checkpoint, or None if there is none yet."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    return TournamentState.from_json(data, config)
+
+
+def run_chunk(game, options, seed, round_number, start, matches):
+    """
+    Play a chunk of games in a worker.
+
+    Each game's randomness comes from its round and index, so results do not depend on
+    which worker plays it.
+
+    Parameters:
+        game (str): A key of GAMES.
+        options (dict): The game's options.
+        seed: The tournament's seed.
+        round_number (int): The round being played.
+        start (int): The index of the chunk's first game in the round.
+        matches (list): The (first, second) bots of each game.
+
+    Returns:
+        list: The first bot's score in each game.
+    """
+    play = GAMES[game].play
+    streams = RandomStreams(seed)
+    return [
+        play(first, second, streams.child("round", round_number, "game", start + offset), options)
+        for offset, (first, second) in enumerate(matches)
+    ]
+
+
+def run_tournament(config, checkpoint=None, workers=None, progress=None):
+    """
+    Run a tournament, or carry on with one from its checkpoint.
+
+    Parameters:
+        config (TournamentConfig): The tournament.
+        checkpoint (str, optional): A JSON file to resume from if it exists and to save
+            to every CHECKPOINT_SECONDS, after every round and when interrupted.
+        workers (int, optional): The number of worker processes. Defaults to the CPU count;
+            1 plays every game in this process.
+        progress (callable, optional): Called with the state after every round.
+
+    Returns:
+        TournamentState: The final ratings and standings.
+    """
+    game = GAMES.get(config.game)
+    if game is None:
+        raise ValueError(f"Unknown game {config.game!r}, choose from {sorted(GAMES)}")
+    bots = config.bots or game.bots
+    unknown = [bot for bot in bots if bot not in game.bots]
+    if unknown or len(set(bots)) < 2:
+        raise ValueError(f"Enter two or more different bots from {game.bots}, not {bots}")
+    if config.format not in FORMATS or config.rating not in RATING_SYSTEMS:
+        raise ValueError(f"format must be one of {FORMATS} and rating one of {RATING_SYSTEMS}")
+    options = dict(game.options, **dict(config.options))
+    state = (checkpoint and load_checkpoint(checkpoint, config)) or TournamentState(
+        config, tuple(bots)
+    )
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    saved = time.monotonic()
+
+    def apply(scores):
+        nonlocal saved
+        for score in scores:
+            state.record(*state.match(state.applied), score)
+            state.applied += 1
+        if checkpoint and time.monotonic() - saved >= CHECKPOINT_SECONDS:
+            save_checkpoint(state, checkpoint)
+            saved = time.monotonic()
+
+    try:
+        while state.round < config.rounds:
+            if state.pairs is None:
+                state.start_round()
+            total = state.games_in_round()
+            chunks = (
+                (start, [state.match(i) for i in range(start, min(start + CHUNK_GAMES, total))])
+                for start in range(state.applied, total, CHUNK_GAMES)
+            )
+            args = (config.game, options, config.seed, state.round)
+            if executor is None:
+                for start, matches in chunks:
+                    apply(run_chunk(*args, start, matches))
+            else:
+                pending = {}
+                # Chunks that finished before an earlier one, held until it is applied.
+                ready = {}
+
+                def collect():
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        ready[pending.pop(future)] = future.result()
+                    while state.applied in ready:
+                        apply(ready.pop(state.applied))
+
+                for start, matches in chunks:
+                    pending[executor.submit(run_chunk, *args, start, matches)] = start
+                    if len(pending) >= workers * 2:
+                        collect()
+                while pending:
+                    collect()
+            state.round += 1
+            state.pairs = None
+            state.applied = 0
+            if checkpoint:
+                save_checkpoint(state, checkpoint)
+                saved = time.monotonic()
+            if progress:
+                progress(state)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if checkpoint:
+            save_checkpoint(state, checkpoint)
+    return state
+
+
+def format_standings(state):
+    """Return the bots ranked by rating as a table."""
+    glicko = state.config.rating == "glicko"
+    lines = [f"{'bot':<15}{'rating':>10}{'points':>10}{'wins':>8}{'draws':>8}{'losses':>8}"]
+    ranked = sorted(state.bots, key=lambda bot: -state.ratings[bot][0])
+    for bot in ranked:
+        rating, rd = state.ratings[bot]
+        points, wins, draws, losses = state.standings[bot]
+        shown = f"{rating:.0f}±{rd:.0f}" if glicko else f"{rating:.0f}"
+        lines.append(f"{bot:<15}{shown:>10}{points:>10g}{wins:>8}{draws:>8}{losses:>8}")
+    return "\n".join(lines)
+
+
+def _option(text):
+    """Parse a NAME=VALUE option, reading the value as JSON if it is valid JSON."""
+    name, _, value = text.partition("=")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def main(argv=None):
+    """Run a tournament from the command line and print the final standings."""
+    parser = argparse.ArgumentParser(description="Run a tournament between bots.")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--bots", nargs="+", default=())
+    parser.add_argument("--format", choices=FORMATS, default="round-robin")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--games", type=int, default=2)
+    parser.add_argument("--rating", choices=RATING_SYSTEMS, default="elo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--option", type=_option, action="append", default=[], metavar="NAME=VALUE"
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint")
+    args = parser.parse_args(argv)
+    config = TournamentConfig(
+        args.game,
+        tuple(args.bots),
+        args.format,
+        args.rounds,
+        args.games,
+        args.rating,
+        args.seed,
+        tuple(args.option),
+    )
+    start = time.perf_counter()
+
+    def progress(state):
+        elapsed = time.perf_counter() - start
+        print(f"round {state.round}/{config.rounds}: {state.played} games, {elapsed:.1f}s")
+
+    state = run_tournament(config, args.checkpoint, args.workers, progress)
+    print(format_standings(state))
+
+
+if __name__ == "__main__":
+    main()
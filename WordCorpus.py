@@ -0,0 +1,122 @@
+"""A binary word corpus that is memory-mapped instead of loaded into a list.
+
+The file is a 16-byte header (magic, version, word count), a table of count + 1
+little-endian uint32 offsets into the blob, and then the words packed back to back
+as UTF-8. Looking up word i reads two offsets and one slice, so picking a random
+word is O(1) and only touches the pages it needs.
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+from array import array
+
+MAGIC = b"WCRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxQ")
+OFFSET = struct.Struct("<I")
+SUFFIX = ".bin"
+
+
+def build_corpus(words, path):
+    """
+    Write words to path in the corpus format.
+
+    Parameters:
+        words: An iterable of words. Words are stripped and lowercased, and anything
+            that is not purely a-z is skipped, as WordIndex does, so every secret word
+            can be guessed and hints cover the same words.
+        path (str): The file to write.
+
+    Returns:
+        int: The number of words written, not counting the ones skipped.
+    """
+    offsets = array("I", [0])
+    blob = bytearray()
+    for word in words:
+        word = word.strip().lower()
+        if word and word.isascii() and word.isalpha():
+            blob += word.encode("ascii")
+            offsets.append(len(blob))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(offsets) - 1))
+        file.write(offsets.tobytes())
+        file.write(blob)
+    return len(offsets) - 1
+
+
+def is_corpus(path):
+    """Return True if path starts with the corpus magic bytes."""
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+class WordCorpus:
+    def __init__(self, path):
+        """
+        Memory-map a corpus file written by build_corpus.
+
+        Parameters:
+            path (str): The corpus file.
+
+        Returns:
+            None
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} word corpus")
+        self._count = count
+        self._words_start = HEADER.size + (count + 1) * OFFSET.size
+
+    def __len__(self):
+        """Return the number of words in the corpus."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Return word number index without reading any other word."""
+        if not 0 <= index < self._count:
+            raise IndexError("word index out of range")
+        position = HEADER.size + index * OFFSET.size
+        start, end = struct.unpack_from("<II", self._map, position)
+        return self._map[self._words_start + start : self._words_start + end].decode("utf-8")
+
+    def __iter__(self):
+        """Yield every word in file order."""
+        for index in range(self._count):
+            yield self[index]
+
+    def random_word(self, rng=random):
+        """Return a uniformly random word."""
+        return self[rng.randrange(self._count)]
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    """Build a corpus file from a text file with one word per line."""
+    parser = argparse.ArgumentParser(description="Build a binary Hangman word corpus.")
+    parser.add_argument("source", help="a text file with one word per line")
+    parser.add_argument("corpus", help=f"the corpus file to write, e.g. words{SUFFIX}")
+    args = parser.parse_args(argv)
+    with open(args.source, encoding="utf-8") as file:
+        count = build_corpus(file, args.corpus)
+    print(f"Wrote {count} words to {args.corpus}")
+
+
+if __name__ == "__main__":
+    main()